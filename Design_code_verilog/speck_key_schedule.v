@@ -1,7 +1,10 @@
 // speck_key_schedule.v (Model B, with rk_flat output)
+// KEY_WORDS = m key words: 4 for SPECK64/128 (K0-K3), 2 for SPECK128/128
+// (K0-K1; K2/K3 are ignored)
 module speck_key_schedule #(
-    parameter W      = 32,
-    parameter ROUNDS = 27
+    parameter W         = 32,
+    parameter ROUNDS    = 27,
+    parameter KEY_WORDS = 4
 )(
     input  wire             clk,
     input  wire             rst,     // synchronous reset
@@ -19,7 +22,7 @@ module speck_key_schedule #(
 
     // round-key memory
     reg [W-1:0] rk_mem [0:ROUNDS-1];
-    reg [W-1:0] l_mem [0:ROUNDS+1];
+    reg [W-1:0] l_mem [0:ROUNDS+KEY_WORDS-2];
 
     reg [4:0] i;
 
@@ -44,7 +47,7 @@ module speck_key_schedule #(
             rk_flat <= 0;
 
             for (j = 0; j < ROUNDS; j = j + 1) rk_mem[j] <= 0;
-            for (j = 0; j < ROUNDS + 2; j = j + 1) l_mem[j] <= 0;
+            for (j = 0; j < ROUNDS + KEY_WORDS - 1; j = j + 1) l_mem[j] <= 0;
 
             x_in_r <= 0;
             y_in_r <= 0;
@@ -59,8 +62,8 @@ module speck_key_schedule #(
 
                 rk_mem[0] <= K0;
                 l_mem[0]  <= K1;
-                l_mem[1]  <= K2;
-                l_mem[2]  <= K3;
+                if (KEY_WORDS > 2) l_mem[1] <= K2;
+                if (KEY_WORDS > 3) l_mem[2] <= K3;
 
                 x_in_r <= K1;
                 y_in_r <= K0;
@@ -68,7 +71,7 @@ module speck_key_schedule #(
 
             end else if (busy) begin
                 // Write round results
-                l_mem[i + 3]     <= x_out_w;
+                l_mem[i + KEY_WORDS - 1] <= x_out_w;
                 rk_mem[i + 1]    <= y_out_w;
 
                 if (i == ROUNDS - 1) begin
@@ -81,7 +84,9 @@ module speck_key_schedule #(
 
                 end else begin
                     i      <= i + 1;
-                    x_in_r <= l_mem[i + 1];
+                    // With two key words l[i+1] is the value computed
+                    // this round, not yet in l_mem
+                    x_in_r <= (KEY_WORDS == 2) ? x_out_w : l_mem[i + 1];
                     y_in_r <= y_out_w;
                     k_in_r <= {{(W-5){1'b0}}, i + 1};
                 end
@@ -0,0 +1,185 @@
+// speck_lanes.v
+// LANES parallel iterative SPECK cores behind one in-order block stream
+//
+// Each lane holds one speck_encryptor and one speck_decryptor. Blocks are
+// dispatched round-robin to the lanes; a lane keeps its result until it is
+// collected, and results are collected round-robin in the same order. The
+// per-lane result registers therefore act as the reorder buffer: blocks
+// leave in exactly the order they entered, whatever mix of E/D is in flight.
+//
+// Throughput: up to LANES blocks per lane period (ROUNDS + 4 cycles),
+// at most one block per cycle on either stream.
+
+module speck_lanes #(
+    parameter W      = 32,
+    parameter ROUNDS = 27,
+    parameter LANES  = 4
+)(
+    input  wire                 clk,
+    input  wire                 rst,
+    input  wire [W*ROUNDS-1:0]  rk_flat,
+
+    // Input stream (accepted when in_valid && in_ready)
+    input  wire                 in_valid,
+    output wire                 in_ready,
+    input  wire                 in_decrypt,   // 0 = encrypt, 1 = decrypt
+    input  wire [W-1:0]         in_x,
+    input  wire [W-1:0]         in_y,
+
+    // Output stream, in input order (taken when out_valid && out_ready)
+    output wire                 out_valid,
+    input  wire                 out_ready,
+    output wire [W-1:0]         out_x,
+    output wire [W-1:0]         out_y,
+
+    // High while any lane is still computing (round keys must not change)
+    output wire                 computing
+);
+
+    // Lane states
+    localparam L_FREE  = 2'd0,   // ready for a block
+               L_START = 2'd1,   // start pulsed, waiting for old done to clear
+               L_RUN   = 2'd2,   // rounds in progress
+               L_FULL  = 2'd3;   // result held until collected
+
+    // Round-robin pointers
+    reg [7:0] in_lane;   // next lane to dispatch to
+    reg [7:0] out_lane;  // next lane to collect from
+
+    // Per-lane status, flattened so the pointers can index them
+    wire [LANES-1:0]   lane_free;
+    wire [LANES-1:0]   lane_full;
+    wire [LANES-1:0]   lane_busy;
+    wire [W*LANES-1:0] res_x_flat;
+    wire [W*LANES-1:0] res_y_flat;
+
+    wire dispatch = in_valid  && in_ready;
+    wire collect  = out_valid && out_ready;
+
+    assign in_ready  = lane_free[in_lane];
+    assign out_valid = lane_full[out_lane];
+    assign out_x     = res_x_flat[out_lane*W +: W];
+    assign out_y     = res_y_flat[out_lane*W +: W];
+    assign computing = |lane_busy;
+
+    always @(posedge clk or posedge rst) begin
+        if (rst) begin
+            in_lane  <= 0;
+            out_lane <= 0;
+        end else begin
+            if (dispatch)
+                in_lane <= (in_lane == LANES-1) ? 0 : in_lane + 1;
+            if (collect)
+                out_lane <= (out_lane == LANES-1) ? 0 : out_lane + 1;
+        end
+    end
+
+    // ========================================================================
+    // Lanes
+    // ========================================================================
+
+    genvar g;
+    generate
+        for (g = 0; g < LANES; g = g + 1) begin : lane
+
+            reg  [1:0]   st;
+            reg          dec;          // current block is a decrypt
+            reg          enc_start;
+            reg          dec_start;
+            reg  [W-1:0] blk_x, blk_y; // block being processed
+            reg  [W-1:0] r_x, r_y;     // result (reorder buffer slot)
+
+            wire [W-1:0] enc_x, enc_y, dec_x, dec_y;
+            wire         enc_done, dec_done;
+            wire         core_done = dec ? dec_done : enc_done;
+
+            speck_encryptor #(
+                .W(W),
+                .ROUNDS(ROUNDS)
+            ) u_encryptor (
+                .clk(clk),
+                .rst(rst),
+                .start(enc_start),
+                .pt_x(blk_x),
+                .pt_y(blk_y),
+                .rk_flat(rk_flat),
+                .ct_x(enc_x),
+                .ct_y(enc_y),
+                .done(enc_done)
+            );
+
+            speck_decryptor #(
+                .W(W),
+                .ROUNDS(ROUNDS)
+            ) u_decryptor (
+                .clk(clk),
+                .rst(rst),
+                .start(dec_start),
+                .ct_x(blk_x),
+                .ct_y(blk_y),
+                .rk_flat(rk_flat),
+                .pt_x(dec_x),
+                .pt_y(dec_y),
+                .done(dec_done)
+            );
+
+            always @(posedge clk or posedge rst) begin
+                if (rst) begin
+                    st        <= L_FREE;
+                    dec       <= 0;
+                    enc_start <= 0;
+                    dec_start <= 0;
+                    blk_x     <= 0;
+                    blk_y     <= 0;
+                    r_x       <= 0;
+                    r_y       <= 0;
+                end else begin
+                    // Default: clear one-cycle pulses
+                    enc_start <= 0;
+                    dec_start <= 0;
+
+                    case (st)
+                        L_FREE: begin
+                            if (dispatch && in_lane == g) begin
+                                blk_x     <= in_x;
+                                blk_y     <= in_y;
+                                dec       <= in_decrypt;
+                                enc_start <= !in_decrypt;
+                                dec_start <= in_decrypt;
+                                st        <= L_START;
+                            end
+                        end
+
+                        L_START: begin
+                            // Same fix as controller v3: done from the previous
+                            // block stays high until the core accepts start
+                            if (!core_done)
+                                st <= L_RUN;
+                        end
+
+                        L_RUN: begin
+                            if (core_done) begin
+                                r_x <= dec ? dec_x : enc_x;
+                                r_y <= dec ? dec_y : enc_y;
+                                st  <= L_FULL;
+                            end
+                        end
+
+                        L_FULL: begin
+                            if (collect && out_lane == g)
+                                st <= L_FREE;
+                        end
+                    endcase
+                end
+            end
+
+            assign lane_free[g] = (st == L_FREE);
+            assign lane_full[g] = (st == L_FULL);
+            assign lane_busy[g] = (st == L_START) || (st == L_RUN);
+            assign res_x_flat[g*W +: W] = r_x;
+            assign res_y_flat[g*W +: W] = r_y;
+
+        end
+    endgenerate
+
+endmodule
@@ -0,0 +1,266 @@
+// speck_uart_controller_lanes.v
+// Controller for the multi-lane SPECK engine (speck_lanes.v) via UART
+// Same command protocol as speck_uart_controller_v3:
+//   'K' (0x4B) + 16 bytes: Load key → run key schedule → store round keys
+//   'E' (0x45) + 8 bytes:  Encrypt using stored keys → return 8 bytes
+//   'D' (0x44) + 8 bytes:  Decrypt using stored keys → return 8 bytes
+//   'R' (0x52):            Reset: pulses reset_request for the top (only as a
+//                          command byte - 0x52 inside a key or block is data)
+//
+// RX and TX run as two independent state machines. A received block is
+// pushed into the lane engine and the RX side is immediately ready for the
+// next command, while the TX side drains results in order. The host may
+// therefore keep up to LANES blocks in flight (window = LANES); v3 needs
+// window = 1 because it ignores RX while computing and transmitting.
+//
+// 'K' waits for blocks still computing under the old key to finish before
+// the round keys change. Results already computed are unaffected.
+
+module speck_uart_controller_lanes #(
+    parameter W = 32,
+    parameter ROUNDS = 27
+)(
+    input  wire clk,
+    input  wire rst,
+
+    // UART RX interface
+    input  wire [7:0]  rx_data,
+    input  wire        rx_valid,
+
+    // UART TX interface
+    output reg  [7:0]  tx_data,
+    output reg         tx_valid,
+    input  wire        tx_busy,
+
+    // Key schedule interface
+    output reg  [W-1:0]       ks_K0,
+    output reg  [W-1:0]       ks_K1,
+    output reg  [W-1:0]       ks_K2,
+    output reg  [W-1:0]       ks_K3,
+    output reg                ks_start,
+    input  wire               ks_done,
+    input  wire [W*ROUNDS-1:0] rk_flat,
+    output wire [W*ROUNDS-1:0] rk_flat_out,  // Stored round keys for the lanes
+
+    // Lane engine input stream
+    output wire               blk_valid,
+    input  wire               blk_ready,
+    output wire               blk_decrypt,
+    output wire [W-1:0]       blk_x,
+    output wire [W-1:0]       blk_y,
+
+    // Lane engine output stream (in order)
+    input  wire               res_valid,
+    output wire               res_ready,
+    input  wire [W-1:0]       res_x,
+    input  wire [W-1:0]       res_y,
+    input  wire               computing,
+
+    // Status outputs (optional, for debugging)
+    output wire [3:0]         state_out,
+    output wire               busy,
+    output reg                reset_request  // Pulse: 'R' taken as a command
+);
+
+    // RX state machine
+    reg [2:0] rx_state;
+    localparam RX_IDLE      = 0,
+               RX_BYTES     = 1,
+               PUSH_BLOCK   = 2,   // Hand the block to the lane engine
+               KEY_DRAIN    = 3,   // Wait for in-flight blocks on the old key
+               KEY_SCHEDULE = 4,
+               WAIT_KEY     = 5;
+
+    // TX state machine
+    reg [1:0] tx_state;
+    localparam TX_IDLE  = 0,
+               TX_BYTES = 1,
+               WAIT_TX  = 2;
+
+    // Command and byte counter
+    reg [7:0]  command;          // 'K', 'E', or 'D'
+    reg [4:0]  rx_count;         // Byte counter
+    reg [4:0]  rx_target;        // Target byte count (16 for key, 8 for data)
+    reg [7:0]  rx_buffer [0:15]; // Storage for incoming bytes (max 16 for key)
+
+    reg [3:0]  tx_count;         // 0-8 (needs to count to 8 to detect completion)
+    reg [7:0]  tx_buffer [0:7];  // Result being transmitted
+
+    // Stored round keys (persistent across commands)
+    reg [W*ROUNDS-1:0] rk_flat_stored;
+    reg                keys_loaded;  // Flag: have we loaded keys yet?
+
+    assign rk_flat_out = rk_flat_stored;
+
+    // Word assembly from received bytes (little endian)
+    wire [W-1:0] word0 = {rx_buffer[3],  rx_buffer[2],  rx_buffer[1],  rx_buffer[0]};
+    wire [W-1:0] word1 = {rx_buffer[7],  rx_buffer[6],  rx_buffer[5],  rx_buffer[4]};
+    wire [W-1:0] word2 = {rx_buffer[11], rx_buffer[10], rx_buffer[9],  rx_buffer[8]};
+    wire [W-1:0] word3 = {rx_buffer[15], rx_buffer[14], rx_buffer[13], rx_buffer[12]};
+
+    // Block handoff (SPECK convention: x is upper word, y is lower word)
+    assign blk_valid   = (rx_state == PUSH_BLOCK);
+    assign blk_decrypt = (command == 8'h44);
+    assign blk_x       = word1;  // bytes 4-7
+    assign blk_y       = word0;  // bytes 0-3
+
+    // Take a result whenever the transmitter is free
+    assign res_ready = (tx_state == TX_IDLE);
+
+    assign state_out = {tx_state != TX_IDLE, rx_state};
+    assign busy      = (rx_state != RX_IDLE) || (tx_state != TX_IDLE) || computing;
+
+    integer i, j;
+
+    // ========================================================================
+    // RX: parse commands, push blocks, load keys
+    // ========================================================================
+
+    always @(posedge clk or posedge rst) begin
+        if (rst) begin
+            rx_state       <= RX_IDLE;
+            command        <= 0;
+            rx_count       <= 0;
+            rx_target      <= 0;
+            ks_start       <= 0;
+            keys_loaded    <= 0;
+            rk_flat_stored <= 0;
+            reset_request  <= 0;
+
+            for (i = 0; i < 16; i = i + 1)
+                rx_buffer[i] <= 0;
+
+        end else begin
+            // Default: clear one-cycle pulses
+            ks_start      <= 0;
+            reset_request <= 0;
+
+            case (rx_state)
+                RX_IDLE: begin
+                    if (rx_valid) begin
+                        command  <= rx_data;
+                        rx_count <= 0;
+                        case (rx_data)
+                            8'h4B: begin  // 'K' - Load Key
+                                rx_target <= 16;
+                                rx_state  <= RX_BYTES;
+                            end
+
+                            8'h45, 8'h44: begin  // 'E' / 'D'
+                                if (keys_loaded) begin
+                                    rx_target <= 8;
+                                    rx_state  <= RX_BYTES;
+                                end
+                                // Else: no key loaded yet, ignore command
+                            end
+
+                            8'h52: reset_request <= 1;  // 'R' - Reset
+
+                            default: ;  // Unknown command, ignore
+                        endcase
+                    end
+                end
+
+                RX_BYTES: begin
+                    if (rx_valid) begin
+                        rx_buffer[rx_count] <= rx_data;
+
+                        if (rx_count == rx_target - 1) begin
+                            if (command == 8'h4B)
+                                rx_state <= KEY_DRAIN;
+                            else
+                                rx_state <= PUSH_BLOCK;
+                        end else begin
+                            rx_count <= rx_count + 1;
+                        end
+                    end
+                end
+
+                PUSH_BLOCK: begin
+                    // blk_valid is high in this state; the engine takes the
+                    // block as soon as the next lane in rotation is free
+                    if (blk_ready)
+                        rx_state <= RX_IDLE;
+                end
+
+                KEY_DRAIN: begin
+                    if (!computing)
+                        rx_state <= KEY_SCHEDULE;
+                end
+
+                KEY_SCHEDULE: begin
+                    // Load key and trigger key schedule (one cycle only)
+                    ks_K0 <= word0;  // bytes 0-3
+                    ks_K1 <= word1;  // bytes 4-7
+                    ks_K2 <= word2;  // bytes 8-11
+                    ks_K3 <= word3;  // bytes 12-15
+                    ks_start <= 1;
+                    rx_state <= WAIT_KEY;
+                end
+
+                WAIT_KEY: begin
+                    if (ks_done) begin
+                        rk_flat_stored <= rk_flat;
+                        keys_loaded <= 1;
+                        rx_state <= RX_IDLE;  // 'K' command done, no output to send
+                    end
+                end
+
+                default: rx_state <= RX_IDLE;
+            endcase
+        end
+    end
+
+    // ========================================================================
+    // TX: send results in order
+    // ========================================================================
+
+    always @(posedge clk or posedge rst) begin
+        if (rst) begin
+            tx_state <= TX_IDLE;
+            tx_count <= 0;
+            tx_valid <= 0;
+            tx_data  <= 0;
+
+            for (j = 0; j < 8; j = j + 1)
+                tx_buffer[j] <= 0;
+
+        end else begin
+            tx_valid <= 0;
+
+            case (tx_state)
+                TX_IDLE: begin
+                    // res_ready is high here, so the engine releases this result
+                    if (res_valid) begin
+                        {tx_buffer[3], tx_buffer[2], tx_buffer[1], tx_buffer[0]} <= res_y;  // Lower word
+                        {tx_buffer[7], tx_buffer[6], tx_buffer[5], tx_buffer[4]} <= res_x;  // Upper word
+                        tx_count <= 0;
+                        tx_state <= TX_BYTES;
+                    end
+                end
+
+                TX_BYTES: begin
+                    if (!tx_busy && !tx_valid) begin
+                        if (tx_count < 8) begin
+                            tx_data  <= tx_buffer[tx_count];
+                            tx_valid <= 1;
+                            tx_count <= tx_count + 1;
+                            tx_state <= WAIT_TX;
+                        end else begin
+                            tx_state <= TX_IDLE;
+                        end
+                    end
+                end
+
+                WAIT_TX: begin
+                    // Wait for TX to become busy, then return to TX_BYTES
+                    if (tx_busy)
+                        tx_state <= TX_BYTES;
+                end
+
+                default: tx_state <= TX_IDLE;
+            endcase
+        end
+    end
+
+endmodule
@@ -4,9 +4,39 @@
 //   'K' (0x4B) + 16 bytes: Load key → run key schedule → store round keys
 //   'E' (0x45) + 8 bytes:  Encrypt using stored keys → return 8 bytes
 //   'D' (0x44) + 8 bytes:  Decrypt using stored keys → return 8 bytes
+//   (W = 64, ROUNDS = 32 builds SPECK128/128: 'E'/'D' frames carry 16 bytes,
+//    the key is still 16 bytes = K0-K1)
+//   'P' (0x50) + 16 bytes: Prefetch key → key schedule runs in the background
+//                          while 'E'/'D' keep using the stored keys
+//   'S' (0x53):            Swap: prefetched round keys become the stored keys
+//   'Q' (0x51):            Query: dump the performance counters
+//                          → 'Q', NUM_COUNTERS, then NUM_COUNTERS x 32-bit LE
+//   'R' (0x52):            Reset: pulses reset_request for the top to turn
+//                          into a board reset. Only a command byte counts, so
+//                          0x52 inside a key or block is just data.
 //
 // VERSION 3: Fixed done signal not clearing between consecutive operations
 // BUG FIX: Wait for done signal to clear in CRYPTO state before proceeding to WAIT_CRYPTO
+//
+// Shadow round keys: after 'P' the key schedule module's own rk_flat register
+// is the shadow copy. The controller returns to IDLE at once; 'S' copies the
+// shadow into rk_flat_stored at a command boundary, so a rotation costs no
+// cycles as long as 'S' arrives after the ~30-cycle schedule has finished
+// (always true at UART speed). An early 'S' waits in RX_COMMAND for it.
+//
+// Performance counters: free-running 32-bit counters (wrap after ~43 s of
+// cycles at 100 MHz; the host diffs two dumps modulo 2^32), cleared only by
+// reset. Order in the 'Q' record:
+//   0-10  cycles spent in each state, IDLE .. PREFETCH (state encoding order)
+//   11    blocks encrypted          12  blocks decrypted
+//   13    key loads ('K')           14  key prefetches ('P')
+//   15    key swaps ('S')
+//   16    rejected commands (unknown, 'E'/'D' before a key, 'S' with nothing
+//         prefetched)
+//   17    RX overruns (bytes that arrived while rx_ready was low, plus any
+//         the top reports lost on rx_overrun, e.g. a full RX FIFO)
+// The counters are copied when 'Q' is parsed, so the record is one
+// consistent snapshot; its own transmission shows up in the next one.
 
 module speck_uart_controller_v3 #(
     parameter W = 32,
@@ -18,6 +48,8 @@ module speck_uart_controller_v3 #(
     // UART RX interface
     input  wire [7:0]  rx_data,
     input  wire        rx_valid,
+    output wire        rx_ready,     // High in states that take an RX byte (for an RX FIFO)
+    input  wire        rx_overrun,   // Pulse: a byte was lost before reaching us (counted)
     
     // UART TX interface
     output reg  [7:0]  tx_data,
@@ -52,7 +84,8 @@ module speck_uart_controller_v3 #(
     
     // Status outputs (optional, for debugging)
     output reg  [3:0]         state_out,
-    output reg                busy
+    output reg                busy,
+    output reg                reset_request  // Pulse: 'R' taken as a command
 );
 
     // State machine
@@ -66,32 +99,85 @@ module speck_uart_controller_v3 #(
                WAIT_CRYPTO      = 6,
                TX_BYTES         = 7,
                WAIT_TX          = 8,
-               DONE_STATE       = 9;
+               DONE_STATE       = 9,
+               PREFETCH         = 10;
     
     // Command and byte counter
     reg [7:0]  command;          // 'K', 'E', or 'D'
     reg [4:0]  rx_count;         // Byte counter
-    reg [4:0]  rx_target;        // Target byte count (16 for key, 8 for data)
-    reg [7:0]  rx_buffer [0:15]; // Storage for incoming bytes (max 16 for key)
+    localparam WB          = W / 8;   // Bytes per word
+    localparam BLOCK_BYTES = 2 * WB;  // 8 (SPECK64) or 16 (SPECK128)
+    
+    reg [4:0]  rx_target;        // Target byte count (16 for key, BLOCK_BYTES for data)
+    reg [7:0]  rx_buffer [0:15]; // Storage for incoming bytes (max 16 for key or block)
+    
+    reg [6:0]  tx_count;         // 0-tx_length (counts to tx_length to detect completion)
+    reg [7:0]  tx_buffer [0:BLOCK_BYTES-1];  // Store result bytes
     
-    reg [3:0]  tx_count;         // 0-8 (needs to count to 8 to detect completion)
-    reg [7:0]  tx_buffer [0:7];  // Store result bytes
+    // Performance counters (see header for the record layout)
+    localparam NUM_STATES      = 11;
+    localparam CNT_ENCRYPTED   = NUM_STATES;
+    localparam CNT_DECRYPTED   = NUM_STATES + 1;
+    localparam CNT_KEY_LOADS   = NUM_STATES + 2;
+    localparam CNT_PREFETCHES  = NUM_STATES + 3;
+    localparam CNT_SWAPS       = NUM_STATES + 4;
+    localparam CNT_REJECTED    = NUM_STATES + 5;
+    localparam CNT_RX_OVERRUNS = NUM_STATES + 6;
+    localparam NUM_COUNTERS    = NUM_STATES + 7;
+    localparam STATS_BYTES     = 2 + 4 * NUM_COUNTERS;   // 74
+    
+    reg [31:0] perf [0:NUM_COUNTERS-1];
+    reg [32*NUM_COUNTERS-1:0] perf_snapshot;  // Copy being sent for 'Q'
+    
+    // Result bytes sent for the current command: a block, or the 'Q' record
+    wire [6:0] tx_length = (command == 8'h51) ? STATS_BYTES : BLOCK_BYTES;
+    reg  [7:0] stats_byte;
+    
+    always @(*) begin
+        if (tx_count == 0)
+            stats_byte = 8'h51;          // 'Q'
+        else if (tx_count == 1)
+            stats_byte = NUM_COUNTERS;
+        else
+            stats_byte = perf_snapshot[8*(tx_count-2) +: 8];
+    end
     
     // Stored round keys (persistent across commands)
     reg [W*ROUNDS-1:0] rk_flat_stored;
     reg                keys_loaded;  // Flag: have we loaded keys yet?
     
+    // Shadow round keys (held in the key schedule's rk_flat register)
+    reg                prefetch_busy;  // 'P' schedule running in the background
+    reg                shadow_ready;   // rk_flat holds a prefetched key for 'S'
+    
     // Flag to track if we've already started the crypto operation
     reg                crypto_started;
     
     // Output stored round keys to crypto modules
     assign rk_flat_out = rk_flat_stored;
     
-    // Word assembly from received bytes (little endian)
-    wire [W-1:0] word0 = {rx_buffer[3],  rx_buffer[2],  rx_buffer[1],  rx_buffer[0]};
-    wire [W-1:0] word1 = {rx_buffer[7],  rx_buffer[6],  rx_buffer[5],  rx_buffer[4]};
-    wire [W-1:0] word2 = {rx_buffer[11], rx_buffer[10], rx_buffer[9],  rx_buffer[8]};
-    wire [W-1:0] word3 = {rx_buffer[15], rx_buffer[14], rx_buffer[13], rx_buffer[12]};
+    // Bytes arriving in any other state are dropped
+    assign rx_ready = (state == IDLE) || (state == RX_BYTES);
+    
+    // Word assembly from received bytes (little endian): word n is bytes
+    // n*WB .. n*WB+WB-1. With W = 64 only word0/word1 exist (word2/3 = 0).
+    reg [W-1:0] word0, word1, word2, word3;
+    integer b;
+    
+    always @(*) begin
+        word0 = 0;
+        word1 = 0;
+        word2 = 0;
+        word3 = 0;
+        for (b = 0; b < WB; b = b + 1) begin
+            word0[b*8 +: 8] = rx_buffer[b];
+            word1[b*8 +: 8] = rx_buffer[WB + b];
+            if (3 * WB <= 16) begin
+                word2[b*8 +: 8] = rx_buffer[(2 * WB + b) % 16];
+                word3[b*8 +: 8] = rx_buffer[(3 * WB + b) % 16];
+            end
+        end
+    end
     
     integer i;
     
@@ -107,15 +193,21 @@ module speck_uart_controller_v3 #(
             dec_start      <= 0;
             tx_valid       <= 0;
             busy           <= 0;
+            reset_request  <= 0;
             state_out      <= 0;
             keys_loaded    <= 0;
+            prefetch_busy  <= 0;
+            shadow_ready   <= 0;
             rk_flat_stored <= 0;
             crypto_started <= 0;
             
             for (i = 0; i < 16; i = i + 1)
                 rx_buffer[i] <= 0;
-            for (i = 0; i < 8; i = i + 1)
+            for (i = 0; i < BLOCK_BYTES; i = i + 1)
                 tx_buffer[i] <= 0;
+            for (i = 0; i < NUM_COUNTERS; i = i + 1)
+                perf[i] <= 0;
+            perf_snapshot <= 0;
                 
         end else begin
             // Default: clear one-cycle pulses
@@ -123,9 +215,15 @@ module speck_uart_controller_v3 #(
             enc_start <= 0;
             dec_start <= 0;
             tx_valid  <= 0;
+            reset_request <= 0;
             
             state_out <= state;
             
+            // Cycles per state, and bytes nobody took
+            perf[state] <= perf[state] + 1;
+            if ((rx_valid && !rx_ready) || rx_overrun)
+                perf[CNT_RX_OVERRUNS] <= perf[CNT_RX_OVERRUNS] + 1;
+            
             case (state)
                 IDLE: begin
                     busy <= 0;
@@ -133,23 +231,40 @@ module speck_uart_controller_v3 #(
                         command <= rx_data;
                         state <= RX_COMMAND;
                         busy <= 1;
+                        if (rx_data == 8'h52)
+                            reset_request <= 1;  // 'R' at a command boundary
                     end
                 end
                 
                 RX_COMMAND: begin
                     // Parse command and determine how many bytes to receive
                     case (command)
-                        8'h4B: begin  // 'K' - Load Key
+                        8'h4B, 8'h50: begin  // 'K' - Load Key, 'P' - Prefetch Key
                             rx_target <= 16;  // Expect 16 bytes (K0-K3)
                             rx_count <= 0;
                             state <= RX_BYTES;
                         end
                         
+                        8'h53: begin  // 'S' - Swap in the prefetched keys
+                            if (shadow_ready) begin
+                                rk_flat_stored <= rk_flat;
+                                keys_loaded <= 1;
+                                shadow_ready <= 0;
+                                perf[CNT_SWAPS] <= perf[CNT_SWAPS] + 1;
+                                state <= DONE_STATE;
+                            end else if (!prefetch_busy) begin
+                                perf[CNT_REJECTED] <= perf[CNT_REJECTED] + 1;
+                                state <= DONE_STATE;  // Error: nothing prefetched
+                            end
+                            // else: schedule still running, stay here
+                        end
+                        
                         8'h45: begin  // 'E' - Encrypt
                             if (!keys_loaded) begin
+                                perf[CNT_REJECTED] <= perf[CNT_REJECTED] + 1;
                                 state <= DONE_STATE;  // Error: no key loaded yet
                             end else begin
-                                rx_target <= 8;   // Expect 8 bytes (PT)
+                                rx_target <= BLOCK_BYTES;   // Expect one block (PT)
                                 rx_count <= 0;
                                 state <= RX_BYTES;
                             end
@@ -157,15 +272,28 @@ module speck_uart_controller_v3 #(
                         
                         8'h44: begin  // 'D' - Decrypt
                             if (!keys_loaded) begin
+                                perf[CNT_REJECTED] <= perf[CNT_REJECTED] + 1;
                                 state <= DONE_STATE;  // Error: no key loaded yet
                             end else begin
-                                rx_target <= 8;   // Expect 8 bytes (CT)
+                                rx_target <= BLOCK_BYTES;   // Expect one block (CT)
                                 rx_count <= 0;
                                 state <= RX_BYTES;
                             end
                         end
                         
+                        8'h52: begin  // 'R' - Reset (the top is already resetting us)
+                            state <= DONE_STATE;
+                        end
+                        
+                        8'h51: begin  // 'Q' - Dump performance counters
+                            for (i = 0; i < NUM_COUNTERS; i = i + 1)
+                                perf_snapshot[32*i +: 32] <= perf[i];
+                            tx_count <= 0;
+                            state <= TX_BYTES;
+                        end
+                        
                         default: begin
+                            perf[CNT_REJECTED] <= perf[CNT_REJECTED] + 1;
                             state <= DONE_STATE;  // Unknown command, go back to idle
                         end
                     endcase
@@ -179,6 +307,7 @@ module speck_uart_controller_v3 #(
                             // Route to next state based on command
                             case (command)
                                 8'h4B: state <= KEY_SCHEDULE;  // 'K' → run key schedule
+                                8'h50: state <= PREFETCH;      // 'P' → background schedule
                                 8'h45: state <= CRYPTO;        // 'E' → encrypt
                                 8'h44: state <= CRYPTO;        // 'D' → decrypt
                                 default: state <= DONE_STATE;
@@ -190,13 +319,16 @@ module speck_uart_controller_v3 #(
                 end
                 
                 KEY_SCHEDULE: begin
-                    // Load key and trigger key schedule (one cycle only)
-                    ks_K0 <= word0;  // bytes 0-3
-                    ks_K1 <= word1;  // bytes 4-7
-                    ks_K2 <= word2;  // bytes 8-11
-                    ks_K3 <= word3;  // bytes 12-15
-                    ks_start <= 1;
-                    state <= WAIT_KEY;
+                    // Load key and trigger key schedule (one cycle only), once
+                    // any background prefetch has finished with the module
+                    if (!prefetch_busy) begin
+                        ks_K0 <= word0;  // bytes 0-3 (0-7 for W = 64)
+                        ks_K1 <= word1;  // bytes 4-7 (8-15 for W = 64)
+                        ks_K2 <= word2;  // bytes 8-11
+                        ks_K3 <= word3;  // bytes 12-15
+                        ks_start <= 1;
+                        state <= WAIT_KEY;
+                    end
                 end
                 
                 WAIT_KEY: begin
@@ -204,10 +336,28 @@ module speck_uart_controller_v3 #(
                     if (ks_done) begin
                         rk_flat_stored <= rk_flat;  // Store the round keys!
                         keys_loaded <= 1;
+                        perf[CNT_KEY_LOADS] <= perf[CNT_KEY_LOADS] + 1;
+                        shadow_ready <= 0;    // rk_flat no longer holds the prefetch
                         state <= DONE_STATE;  // 'K' command done, no output to send
                     end
                 end
                 
+                PREFETCH: begin
+                    // Start the schedule and go straight back to IDLE; the
+                    // stored keys stay in use until 'S'
+                    if (!prefetch_busy) begin
+                        ks_K0 <= word0;
+                        ks_K1 <= word1;
+                        ks_K2 <= word2;
+                        ks_K3 <= word3;
+                        ks_start <= 1;
+                        prefetch_busy <= 1;
+                        perf[CNT_PREFETCHES] <= perf[CNT_PREFETCHES] + 1;
+                        shadow_ready <= 0;
+                        state <= DONE_STATE;
+                    end
+                end
+                
                 CRYPTO: begin
                     // CRITICAL FIX: Load data once, pulse start once, wait for done to clear
                     if (!crypto_started) begin
@@ -251,8 +401,11 @@ module speck_uart_controller_v3 #(
                     if (command == 8'h45) begin  // Encrypt
                         if (enc_done) begin
                             // Store result bytes (little endian) - swap back to match input order
-                            {tx_buffer[3], tx_buffer[2], tx_buffer[1], tx_buffer[0]} <= enc_ct_y;  // Lower word
-                            {tx_buffer[7], tx_buffer[6], tx_buffer[5], tx_buffer[4]} <= enc_ct_x;  // Upper word
+                            for (i = 0; i < WB; i = i + 1) begin
+                                tx_buffer[i]      <= enc_ct_y[i*8 +: 8];  // Lower word
+                                tx_buffer[WB + i] <= enc_ct_x[i*8 +: 8];  // Upper word
+                            end
+                            perf[CNT_ENCRYPTED] <= perf[CNT_ENCRYPTED] + 1;
                             
                             tx_count <= 0;
                             state <= TX_BYTES;
@@ -260,8 +413,11 @@ module speck_uart_controller_v3 #(
                     end else begin  // Decrypt
                         if (dec_done) begin
                             // Store result bytes (little endian) - swap back to match input order
-                            {tx_buffer[3], tx_buffer[2], tx_buffer[1], tx_buffer[0]} <= dec_pt_y;  // Lower word
-                            {tx_buffer[7], tx_buffer[6], tx_buffer[5], tx_buffer[4]} <= dec_pt_x;  // Upper word
+                            for (i = 0; i < WB; i = i + 1) begin
+                                tx_buffer[i]      <= dec_pt_y[i*8 +: 8];  // Lower word
+                                tx_buffer[WB + i] <= dec_pt_x[i*8 +: 8];  // Upper word
+                            end
+                            perf[CNT_DECRYPTED] <= perf[CNT_DECRYPTED] + 1;
                             
                             tx_count <= 0;
                             state <= TX_BYTES;
@@ -271,8 +427,8 @@ module speck_uart_controller_v3 #(
                 
                 TX_BYTES: begin
                     if (!tx_busy && !tx_valid) begin
-                        if (tx_count < 8) begin
-                            tx_data <= tx_buffer[tx_count];
+                        if (tx_count < tx_length) begin
+                            tx_data <= (command == 8'h51) ? stats_byte : tx_buffer[tx_count];
                             tx_valid <= 1;
                             tx_count <= tx_count + 1;
                             state <= WAIT_TX;
@@ -296,6 +452,12 @@ module speck_uart_controller_v3 #(
                 end
                 
             endcase
+            
+            // Background key schedule finished: shadow keys ready for 'S'
+            if (prefetch_busy && ks_done) begin
+                prefetch_busy <= 0;
+                shadow_ready <= 1;
+            end
         end
     end
 
@@ -0,0 +1,345 @@
+// speck_uart_top_fifo.v
+// Top-level module for SPECK64/128 cipher with UART interface
+// Target: Basys 3 FPGA (Artix-7)
+//
+// FIFO VERSION: speck_uart_top_v3 with block-RAM FIFOs between the UARTs and
+// the controller. Bytes that arrive while the controller is running the key
+// schedule, a block or a transmission wait in the RX FIFO instead of being
+// lost, and results queue in the TX FIFO, so the host can stream commands
+// back to back with no gaps on the wire (window > 1).
+// Only FIFO handshake glue here - the rest is instantiations and wiring
+
+module speck_uart_top_fifo #(
+    parameter W = 32,
+    parameter ROUNDS = 27,
+    parameter CLK_FREQ = 100_000_000,
+    parameter BAUD_RATE = 115200,
+    parameter FIFO_DEPTH_LOG2 = 11      // 2048 bytes each way (one RAMB18)
+)(
+    // Clock and Reset
+    input  wire clk,           // 100 MHz system clock
+    input  wire rst,           // Active-high reset (from button)
+    
+    // UART Interface
+    input  wire uart_rxd,      // UART receive line (from PC)
+    output wire uart_txd,      // UART transmit line (to PC)
+    
+    // Status LEDs (16 available on Basys 3)
+    output wire [15:0] led     // Status indicators
+);
+
+    // ========================================================================
+    // Internal Signal Declarations
+    // ========================================================================
+    
+    // UART RX signals
+    wire [7:0] rx_data;
+    wire       rx_valid;
+    
+    // UART TX signals
+    wire [7:0] tx_data;
+    wire       tx_valid;
+    wire       tx_busy;
+    
+    // RX FIFO (UART RX -> controller)
+    wire [7:0] rx_fifo_dout;
+    wire       rx_fifo_empty, rx_fifo_full;
+    wire       rx_fifo_rd;
+    reg        rx_fifo_rd_q;       // dout valid this cycle
+    wire       ctrl_rx_ready;
+    
+    // TX FIFO (controller -> UART TX)
+    wire [7:0] ctrl_tx_data;
+    wire       ctrl_tx_valid;
+    wire       ctrl_tx_busy;
+    wire       tx_fifo_empty, tx_fifo_full;
+    wire       tx_fifo_rd;
+    reg        tx_fifo_rd_q;       // dout valid this cycle
+    reg        ctrl_tx_ack;        // Write handshake back to the controller
+    reg        rx_overflow;        // Sticky: a byte was lost
+    
+    // Key Schedule signals
+    wire [W-1:0]       ks_K0, ks_K1, ks_K2, ks_K3;
+    wire               ks_start;
+    wire               ks_done;
+    wire [W*ROUNDS-1:0] rk_flat;       // Fresh round keys from key schedule
+    wire [W*ROUNDS-1:0] rk_flat_out;   // Stored round keys from controller
+    
+    // Encryptor signals
+    wire [W-1:0] enc_pt_x, enc_pt_y;
+    wire         enc_start;
+    wire [W-1:0] enc_ct_x, enc_ct_y;
+    wire         enc_done;
+    
+    // Decryptor signals
+    wire [W-1:0] dec_ct_x, dec_ct_y;
+    wire         dec_start;
+    wire [W-1:0] dec_pt_x, dec_pt_y;
+    wire         dec_done;
+    
+    // Controller status
+    wire [3:0]   state;
+    wire         busy;
+    wire         ctrl_reset_request;  // 'R' taken as a command
+    
+    // ========================================================================
+    // UART-Triggered Hardware Reset
+    // ========================================================================
+    // 'R' (0x52) command triggers a hardware reset (just like button). The
+    // controller flags it when it takes 'R' as a command byte: with the host
+    // streaming, a raw 0x52 on the wire is as likely to be key or block data,
+    // and the reset would also flush the frames queued behind it.
+    
+    reg       uart_reset_trigger;
+    reg [15:0] uart_reset_counter;
+    
+    always @(posedge clk or posedge rst) begin
+        if (rst) begin
+            // Button reset pressed - clear UART reset logic
+            uart_reset_trigger <= 1'b0;
+            uart_reset_counter <= 16'd0;
+        end else begin
+            // 'R' command (0x52) reached the controller
+            if (ctrl_reset_request) begin
+                uart_reset_trigger <= 1'b1;
+                uart_reset_counter <= 16'd1000;  // Hold reset for 1000 cycles (~10us)
+            end 
+            // Count down reset pulse
+            else if (uart_reset_counter > 0) begin
+                uart_reset_counter <= uart_reset_counter - 1;
+                uart_reset_trigger <= 1'b1;
+            end else begin
+                uart_reset_trigger <= 1'b0;
+            end
+        end
+    end
+    
+    // Combine button reset with UART reset
+    wire rst_combined = rst | uart_reset_trigger;
+    
+    // ========================================================================
+    // FIFO Handshake Glue
+    // ========================================================================
+    // RX: pop one byte only when the controller is in a state that takes it,
+    // and not again until it has seen that byte (one byte per two cycles max).
+    // TX: the controller's TX_BYTES/WAIT_TX handshake waits for busy to go
+    // high after each byte, so acknowledge every write with a one-cycle busy;
+    // busy also stays high while the FIFO is full.
+    
+    assign rx_fifo_rd   = !rx_fifo_empty && ctrl_rx_ready && !rx_fifo_rd_q;
+    assign tx_fifo_rd   = !tx_fifo_empty && !tx_busy && !tx_fifo_rd_q;
+    assign tx_valid     = tx_fifo_rd_q;
+    assign ctrl_tx_busy = ctrl_tx_ack || tx_fifo_full;
+    
+    always @(posedge clk or posedge rst_combined) begin
+        if (rst_combined) begin
+            rx_fifo_rd_q <= 1'b0;
+            tx_fifo_rd_q <= 1'b0;
+            ctrl_tx_ack  <= 1'b0;
+            rx_overflow  <= 1'b0;
+        end else begin
+            rx_fifo_rd_q <= rx_fifo_rd;
+            tx_fifo_rd_q <= tx_fifo_rd;
+            ctrl_tx_ack  <= ctrl_tx_valid;
+            if (rx_valid && rx_fifo_full)
+                rx_overflow <= 1'b1;
+        end
+    end
+    
+    // ========================================================================
+    // Module Instantiations
+    // ========================================================================
+    
+    // ------------------------------------------------------------------------
+    // UART Receiver
+    // ------------------------------------------------------------------------
+    uart_rx #(
+        .CLK_FREQ(CLK_FREQ),
+        .BAUD_RATE(BAUD_RATE)
+    ) u_uart_rx (
+        .clk(clk),
+        .rst(rst_combined),
+        .rx(uart_rxd),
+        .data_out(rx_data),
+        .data_valid(rx_valid)
+    );
+    
+    // ------------------------------------------------------------------------
+    // UART Transmitter
+    // ------------------------------------------------------------------------
+    uart_tx #(
+        .CLK_FREQ(CLK_FREQ),
+        .BAUD_RATE(BAUD_RATE)
+    ) u_uart_tx (
+        .clk(clk),
+        .rst(rst_combined),
+        .data_in(tx_data),
+        .data_valid(tx_valid),
+        .tx(uart_txd),
+        .busy(tx_busy)
+    );
+    
+    // ------------------------------------------------------------------------
+    // RX FIFO
+    // ------------------------------------------------------------------------
+    sync_fifo #(
+        .WIDTH(8),
+        .DEPTH_LOG2(FIFO_DEPTH_LOG2)
+    ) u_rx_fifo (
+        .clk(clk),
+        .rst(rst_combined),
+        .wr_en(rx_valid),
+        .din(rx_data),
+        .full(rx_fifo_full),
+        .rd_en(rx_fifo_rd),
+        .dout(rx_fifo_dout),
+        .empty(rx_fifo_empty),
+        .count()
+    );
+    
+    // ------------------------------------------------------------------------
+    // TX FIFO
+    // ------------------------------------------------------------------------
+    sync_fifo #(
+        .WIDTH(8),
+        .DEPTH_LOG2(FIFO_DEPTH_LOG2)
+    ) u_tx_fifo (
+        .clk(clk),
+        .rst(rst_combined),
+        .wr_en(ctrl_tx_valid),
+        .din(ctrl_tx_data),
+        .full(tx_fifo_full),
+        .rd_en(tx_fifo_rd),
+        .dout(tx_data),
+        .empty(tx_fifo_empty),
+        .count()
+    );
+    
+    // ------------------------------------------------------------------------
+    // SPECK Key Schedule
+    // ------------------------------------------------------------------------
+    speck_key_schedule #(
+        .W(W),
+        .ROUNDS(ROUNDS),
+        .KEY_WORDS(128 / W)  // 128-bit key: 4 words (SPECK64), 2 (SPECK128)
+    ) u_key_schedule (
+        .clk(clk),
+        .rst(rst_combined),
+        .start(ks_start),
+        .K0(ks_K0),
+        .K1(ks_K1),
+        .K2(ks_K2),
+        .K3(ks_K3),
+        .rk_flat(rk_flat),
+        .busy(),              // Not used
+        .done(ks_done)
+    );
+    
+    // ------------------------------------------------------------------------
+    // SPECK Encryptor
+    // ------------------------------------------------------------------------
+    speck_encryptor #(
+        .W(W),
+        .ROUNDS(ROUNDS)
+    ) u_encryptor (
+        .clk(clk),
+        .rst(rst_combined),
+        .start(enc_start),
+        .pt_x(enc_pt_x),
+        .pt_y(enc_pt_y),
+        .rk_flat(rk_flat_out),  // Use stored keys from controller
+        .ct_x(enc_ct_x),
+        .ct_y(enc_ct_y),
+        .done(enc_done)
+    );
+    
+    // ------------------------------------------------------------------------
+    // SPECK Decryptor
+    // ------------------------------------------------------------------------
+    speck_decryptor #(
+        .W(W),
+        .ROUNDS(ROUNDS)
+    ) u_decryptor (
+        .clk(clk),
+        .rst(rst_combined),
+        .start(dec_start),
+        .ct_x(dec_ct_x),
+        .ct_y(dec_ct_y),
+        .rk_flat(rk_flat_out),  // Use stored keys from controller
+        .pt_x(dec_pt_x),
+        .pt_y(dec_pt_y),
+        .done(dec_done)
+    );
+    
+    // ------------------------------------------------------------------------
+    // System Controller (VERSION 3 - FIXED DONE SIGNAL BUG)
+    // ------------------------------------------------------------------------
+    speck_uart_controller_v3 #(
+        .W(W),
+        .ROUNDS(ROUNDS)
+    ) u_controller (
+        .clk(clk),
+        .rst(rst_combined),
+        
+        // UART RX interface (through RX FIFO)
+        .rx_data(rx_fifo_dout),
+        .rx_valid(rx_fifo_rd_q),
+        .rx_ready(ctrl_rx_ready),
+        .rx_overrun(rx_valid && rx_fifo_full),  // Byte lost to a full RX FIFO
+        
+        // UART TX interface (through TX FIFO)
+        .tx_data(ctrl_tx_data),
+        .tx_valid(ctrl_tx_valid),
+        .tx_busy(ctrl_tx_busy),
+        
+        // Key schedule interface
+        .ks_K0(ks_K0),
+        .ks_K1(ks_K1),
+        .ks_K2(ks_K2),
+        .ks_K3(ks_K3),
+        .ks_start(ks_start),
+        .ks_done(ks_done),
+        .rk_flat(rk_flat),
+        .rk_flat_out(rk_flat_out),  // Stored round keys output
+        
+        // Encryptor interface
+        .enc_pt_x(enc_pt_x),
+        .enc_pt_y(enc_pt_y),
+        .enc_start(enc_start),
+        .enc_ct_x(enc_ct_x),
+        .enc_ct_y(enc_ct_y),
+        .enc_done(enc_done),
+        
+        // Decryptor interface
+        .dec_ct_x(dec_ct_x),
+        .dec_ct_y(dec_ct_y),
+        .dec_start(dec_start),
+        .dec_pt_x(dec_pt_x),
+        .dec_pt_y(dec_pt_y),
+        .dec_done(dec_done),
+        
+        // Status outputs
+        .state_out(state),
+        .busy(busy),
+        .reset_request(ctrl_reset_request)
+    );
+    
+    // ========================================================================
+    // LED Status Assignment
+    // ========================================================================
+    
+    assign led[0]   = busy;              // LED 0: System busy
+    assign led[1]   = rx_valid;          // LED 1: Receiving data
+    assign led[2]   = tx_busy;           // LED 2: Transmitting data
+    assign led[3]   = ks_done;           // LED 3: Key schedule complete
+    assign led[7:4] = state[3:0];        // LED 7-4: State machine position
+    assign led[8]   = enc_start;         // LED 8: Encryption active
+    assign led[9]   = dec_start;         // LED 9: Decryption active
+    assign led[10]  = enc_done;          // LED 10: Encryption done
+    assign led[11]  = dec_done;          // LED 11: Decryption done
+    assign led[12]  = !rx_fifo_empty;    // LED 12: RX FIFO holds bytes
+    assign led[13]  = !tx_fifo_empty;    // LED 13: TX FIFO holds bytes
+    assign led[14]  = rx_overflow;       // LED 14: RX FIFO overflowed (sticky)
+    assign led[15]  = 1'b0;              // LED 15: Reserved/unused
+
+endmodule
@@ -0,0 +1,234 @@
+// speck_uart_top_lanes.v
+// Top-level module for SPECK64/128 cipher with UART interface
+// Target: Basys 3 FPGA (Artix-7)
+//
+// MULTI-LANE: LANES parallel encryptor/decryptor pairs behind one controller
+// (speck_lanes.v). Same UART protocol as v3, but the host may keep up to
+// LANES blocks in flight. Drop-in replacement for speck_uart_top_v3.
+// This module contains NO logic - only instantiations and wiring
+
+module speck_uart_top_lanes #(
+    parameter W = 32,
+    parameter ROUNDS = 27,
+    parameter LANES = 4,
+    parameter CLK_FREQ = 100_000_000,
+    parameter BAUD_RATE = 115200
+)(
+    // Clock and Reset
+    input  wire clk,           // 100 MHz system clock
+    input  wire rst,           // Active-high reset (from button)
+    
+    // UART Interface
+    input  wire uart_rxd,      // UART receive line (from PC)
+    output wire uart_txd,      // UART transmit line (to PC)
+    
+    // Status LEDs (16 available on Basys 3)
+    output wire [15:0] led     // Status indicators
+);
+
+    // ========================================================================
+    // Internal Signal Declarations
+    // ========================================================================
+    
+    // UART RX signals
+    wire [7:0] rx_data;
+    wire       rx_valid;
+    
+    // UART TX signals
+    wire [7:0] tx_data;
+    wire       tx_valid;
+    wire       tx_busy;
+    
+    // Key Schedule signals
+    wire [W-1:0]       ks_K0, ks_K1, ks_K2, ks_K3;
+    wire               ks_start;
+    wire               ks_done;
+    wire [W*ROUNDS-1:0] rk_flat;       // Fresh round keys from key schedule
+    wire [W*ROUNDS-1:0] rk_flat_out;   // Stored round keys from controller
+    
+    // Lane engine input stream
+    wire         blk_valid, blk_ready, blk_decrypt;
+    wire [W-1:0] blk_x, blk_y;
+    
+    // Lane engine output stream
+    wire         res_valid, res_ready;
+    wire [W-1:0] res_x, res_y;
+    wire         computing;
+    
+    // Controller status
+    wire [3:0]   state;
+    wire         busy;
+    wire         ctrl_reset_request;  // 'R' taken as a command
+    
+    // ========================================================================
+    // UART-Triggered Hardware Reset
+    // ========================================================================
+    // 'R' (0x52) command triggers a hardware reset (just like button). The
+    // controller flags it when it takes 'R' as a command byte: with blocks in
+    // flight, a raw 0x52 on the wire is as likely to be key or block data.
+    
+    reg       uart_reset_trigger;
+    reg [15:0] uart_reset_counter;
+    
+    always @(posedge clk or posedge rst) begin
+        if (rst) begin
+            // Button reset pressed - clear UART reset logic
+            uart_reset_trigger <= 1'b0;
+            uart_reset_counter <= 16'd0;
+        end else begin
+            // 'R' command (0x52) reached the controller
+            if (ctrl_reset_request) begin
+                uart_reset_trigger <= 1'b1;
+                uart_reset_counter <= 16'd1000;  // Hold reset for 1000 cycles (~10us)
+            end 
+            // Count down reset pulse
+            else if (uart_reset_counter > 0) begin
+                uart_reset_counter <= uart_reset_counter - 1;
+                uart_reset_trigger <= 1'b1;
+            end else begin
+                uart_reset_trigger <= 1'b0;
+            end
+        end
+    end
+    
+    // Combine button reset with UART reset
+    wire rst_combined = rst | uart_reset_trigger;
+    
+    // ========================================================================
+    // Module Instantiations
+    // ========================================================================
+    
+    // ------------------------------------------------------------------------
+    // UART Receiver
+    // ------------------------------------------------------------------------
+    uart_rx #(
+        .CLK_FREQ(CLK_FREQ),
+        .BAUD_RATE(BAUD_RATE)
+    ) u_uart_rx (
+        .clk(clk),
+        .rst(rst_combined),
+        .rx(uart_rxd),
+        .data_out(rx_data),
+        .data_valid(rx_valid)
+    );
+    
+    // ------------------------------------------------------------------------
+    // UART Transmitter
+    // ------------------------------------------------------------------------
+    uart_tx #(
+        .CLK_FREQ(CLK_FREQ),
+        .BAUD_RATE(BAUD_RATE)
+    ) u_uart_tx (
+        .clk(clk),
+        .rst(rst_combined),
+        .data_in(tx_data),
+        .data_valid(tx_valid),
+        .tx(uart_txd),
+        .busy(tx_busy)
+    );
+    
+    // ------------------------------------------------------------------------
+    // SPECK Key Schedule
+    // ------------------------------------------------------------------------
+    speck_key_schedule #(
+        .W(W),
+        .ROUNDS(ROUNDS)
+    ) u_key_schedule (
+        .clk(clk),
+        .rst(rst_combined),
+        .start(ks_start),
+        .K0(ks_K0),
+        .K1(ks_K1),
+        .K2(ks_K2),
+        .K3(ks_K3),
+        .rk_flat(rk_flat),
+        .busy(),              // Not used
+        .done(ks_done)
+    );
+    
+    // ------------------------------------------------------------------------
+    // SPECK Lanes (LANES encryptor/decryptor pairs, in-order results)
+    // ------------------------------------------------------------------------
+    speck_lanes #(
+        .W(W),
+        .ROUNDS(ROUNDS),
+        .LANES(LANES)
+    ) u_lanes (
+        .clk(clk),
+        .rst(rst_combined),
+        .rk_flat(rk_flat_out),  // Use stored keys from controller
+        .in_valid(blk_valid),
+        .in_ready(blk_ready),
+        .in_decrypt(blk_decrypt),
+        .in_x(blk_x),
+        .in_y(blk_y),
+        .out_valid(res_valid),
+        .out_ready(res_ready),
+        .out_x(res_x),
+        .out_y(res_y),
+        .computing(computing)
+    );
+    
+    // ------------------------------------------------------------------------
+    // System Controller (independent RX and TX paths)
+    // ------------------------------------------------------------------------
+    speck_uart_controller_lanes #(
+        .W(W),
+        .ROUNDS(ROUNDS)
+    ) u_controller (
+        .clk(clk),
+        .rst(rst_combined),
+        
+        // UART RX interface
+        .rx_data(rx_data),
+        .rx_valid(rx_valid),
+        
+        // UART TX interface
+        .tx_data(tx_data),
+        .tx_valid(tx_valid),
+        .tx_busy(tx_busy),
+        
+        // Key schedule interface
+        .ks_K0(ks_K0),
+        .ks_K1(ks_K1),
+        .ks_K2(ks_K2),
+        .ks_K3(ks_K3),
+        .ks_start(ks_start),
+        .ks_done(ks_done),
+        .rk_flat(rk_flat),
+        .rk_flat_out(rk_flat_out),  // Stored round keys output
+        
+        // Lane engine interface
+        .blk_valid(blk_valid),
+        .blk_ready(blk_ready),
+        .blk_decrypt(blk_decrypt),
+        .blk_x(blk_x),
+        .blk_y(blk_y),
+        .res_valid(res_valid),
+        .res_ready(res_ready),
+        .res_x(res_x),
+        .res_y(res_y),
+        .computing(computing),
+        
+        // Status outputs
+        .state_out(state),
+        .busy(busy),
+        .reset_request(ctrl_reset_request)
+    );
+    
+    // ========================================================================
+    // LED Status Assignment
+    // ========================================================================
+    
+    assign led[0]   = busy;              // LED 0: System busy
+    assign led[1]   = rx_valid;          // LED 1: Receiving data
+    assign led[2]   = tx_busy;           // LED 2: Transmitting data
+    assign led[3]   = ks_done;           // LED 3: Key schedule complete
+    assign led[7:4] = state[3:0];        // LED 7-4: State machine position
+    assign led[8]   = blk_valid;         // LED 8: Block waiting for a lane
+    assign led[9]   = computing;         // LED 9: Lanes computing
+    assign led[10]  = res_valid;         // LED 10: Result waiting for TX
+    assign led[11]  = blk_decrypt;       // LED 11: Last command was decrypt
+    assign led[15:12] = 4'b0000;         // LED 15-12: Reserved/unused
+
+endmodule
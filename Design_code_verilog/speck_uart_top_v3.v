@@ -3,6 +3,7 @@
 // Target: Basys 3 FPGA (Artix-7)
 // 
 // VERSION 3: Uses fixed controller that waits for done signal to clear
+// W = 64, ROUNDS = 32 builds SPECK128/128 (16-byte 'E'/'D' frames)
 // This module contains NO logic - only instantiations and wiring
 
 module speck_uart_top_v3 #(
@@ -129,7 +130,8 @@ module speck_uart_top_v3 #(
     // ------------------------------------------------------------------------
     speck_key_schedule #(
         .W(W),
-        .ROUNDS(ROUNDS)
+        .ROUNDS(ROUNDS),
+        .KEY_WORDS(128 / W)  // 128-bit key: 4 words (SPECK64), 2 (SPECK128)
     ) u_key_schedule (
         .clk(clk),
         .rst(rst_combined),
@@ -192,6 +194,7 @@ module speck_uart_top_v3 #(
         // UART RX interface
         .rx_data(rx_data),
         .rx_valid(rx_valid),
+        .rx_overrun(1'b0),          // Drops while busy are counted inside
         
         // UART TX interface
         .tx_data(tx_data),
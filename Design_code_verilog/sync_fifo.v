@@ -0,0 +1,57 @@
+// sync_fifo.v
+// Single-clock FIFO, 2**DEPTH_LOG2 entries of WIDTH bits
+// Storage is written and read on the clock edge only (no reset on the array
+// or dout), so synthesis maps it to block RAM. Read data appears on dout the
+// cycle after rd_en. Writes when full and reads when empty are ignored.
+
+module sync_fifo #(
+    parameter WIDTH      = 8,
+    parameter DEPTH_LOG2 = 11     // 2048 x 8 = one RAMB18
+)(
+    input  wire                  clk,
+    input  wire                  rst,
+
+    input  wire                  wr_en,
+    input  wire [WIDTH-1:0]      din,
+    output wire                  full,
+
+    input  wire                  rd_en,
+    output reg  [WIDTH-1:0]      dout,
+    output wire                  empty,
+
+    output wire [DEPTH_LOG2:0]   count
+);
+
+    localparam DEPTH = 1 << DEPTH_LOG2;
+
+    (* ram_style = "block" *)
+    reg [WIDTH-1:0] mem [0:DEPTH-1];
+
+    // One extra pointer bit tells full from empty
+    reg [DEPTH_LOG2:0] wr_ptr;
+    reg [DEPTH_LOG2:0] rd_ptr;
+
+    assign count = wr_ptr - rd_ptr;
+    assign empty = (wr_ptr == rd_ptr);
+    assign full  = (count == DEPTH);
+
+    always @(posedge clk) begin
+        if (wr_en && !full)
+            mem[wr_ptr[DEPTH_LOG2-1:0]] <= din;
+        if (rd_en && !empty)
+            dout <= mem[rd_ptr[DEPTH_LOG2-1:0]];
+    end
+
+    always @(posedge clk or posedge rst) begin
+        if (rst) begin
+            wr_ptr <= 0;
+            rd_ptr <= 0;
+        end else begin
+            if (wr_en && !full)
+                wr_ptr <= wr_ptr + 1;
+            if (rd_en && !empty)
+                rd_ptr <= rd_ptr + 1;
+        end
+    end
+
+endmodule
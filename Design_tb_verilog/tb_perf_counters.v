@@ -0,0 +1,235 @@
+`timescale 1ns / 1ps
+
+// PERFORMANCE COUNTERS: 'Q' dumps the controller's free-running counters
+// Runs K, 3 x E, 2 x D, an unknown command byte, and one extra byte sent
+// while the v3 controller is transmitting (dropped = RX overrun), then reads
+// the 74-byte 'Q' record and checks the event counters and that the state
+// cycle counters add up to the cycles since reset.
+module tb_perf_counters;
+
+    // Parameters
+    parameter CLK_FREQ = 100_000_000;
+    parameter BAUD_RATE = 115200;
+    parameter CLK_PERIOD = 10;  // 100 MHz = 10ns
+    parameter NUM_COUNTERS = 18;
+    parameter STATS_BYTES = 2 + 4 * NUM_COUNTERS;
+
+    // DUT signals
+    reg clk;
+    reg rst;
+    reg uart_rxd;
+    wire uart_txd;
+    wire [15:0] led;
+
+    // UART bit timing
+    localparam BIT_TIME = 1_000_000_000 / BAUD_RATE;  // in ns
+
+    // Real UART RX for capturing responses
+    wire [7:0] rx_data;
+    wire rx_valid;
+
+    uart_rx #(
+        .CLK_FREQ(CLK_FREQ),
+        .BAUD_RATE(BAUD_RATE)
+    ) u_testbench_rx (
+        .clk(clk),
+        .rst(rst),
+        .rx(uart_txd),
+        .data_out(rx_data),
+        .data_valid(rx_valid)
+    );
+
+    // DUT - Top-level module (VERSION 3)
+    speck_uart_top_v3 #(
+        .W(32),
+        .ROUNDS(27),
+        .CLK_FREQ(CLK_FREQ),
+        .BAUD_RATE(BAUD_RATE)
+    ) dut (
+        .clk(clk),
+        .rst(rst),
+        .uart_rxd(uart_rxd),
+        .uart_txd(uart_txd),
+        .led(led)
+    );
+
+    // Clock generation
+    initial begin
+        clk = 0;
+        forever #(CLK_PERIOD/2) clk = ~clk;
+    end
+
+    // Cycles since reset was released
+    reg [31:0] cycles;
+    always @(posedge clk) begin
+        if (rst) cycles <= 0;
+        else     cycles <= cycles + 1;
+    end
+
+    reg [7:0]  record [0:STATS_BYTES-1];
+    reg [31:0] counter [0:NUM_COUNTERS-1];
+    reg [31:0] state_sum;
+    reg [31:0] cycles_at_dump;
+    reg [7:0]  temp_byte;
+    integer i, errors;
+
+    // Task: Capture byte from UART
+    task capture_tx_byte;
+        output [7:0] byte_val;
+        begin
+            wait(rx_valid == 1);
+            byte_val = rx_data;
+            wait(rx_valid == 0);
+        end
+    endtask
+
+    // Task: Send byte via UART
+    task send_uart_byte;
+        input [7:0] byte;
+        integer i;
+        begin
+            uart_rxd = 0;  // Start bit
+            #BIT_TIME;
+            for (i = 0; i < 8; i = i + 1) begin
+                uart_rxd = byte[i];
+                #BIT_TIME;
+            end
+            uart_rxd = 1;  // Stop bit
+            #BIT_TIME;
+        end
+    endtask
+
+    // Task: one 8-byte 'E'/'D' frame and its response
+    task run_block;
+        input [7:0] command;
+        input [7:0] fill;
+        integer i;
+        begin
+            wait(led[0] == 0);
+            #(BIT_TIME * 5);
+            send_uart_byte(command);
+            for (i = 0; i < 8; i = i + 1)
+                send_uart_byte(fill + i);
+            for (i = 0; i < 8; i = i + 1)
+                capture_tx_byte(temp_byte);
+        end
+    endtask
+
+    // Task: compare one counter from the record
+    task check;
+        input integer index;
+        input [31:0] expected;
+        begin
+            if (counter[index] !== expected) begin
+                $display("  counter %0d = %0d, expected %0d  FAIL", index, counter[index], expected);
+                errors = errors + 1;
+            end else begin
+                $display("  counter %0d = %0d  OK", index, counter[index]);
+            end
+        end
+    endtask
+
+    initial begin
+        $display("========================================================");
+        $display("Performance Counters Test - 'Q' record");
+        $display("========================================================");
+
+        // Initialize
+        rst = 1;
+        uart_rxd = 1;
+        errors = 0;
+
+        // Release reset
+        #(CLK_PERIOD * 10);
+        rst = 0;
+        #(CLK_PERIOD * 10);
+
+        // Key load (NSA test vector key)
+        send_uart_byte(8'h4B);  // 'K'
+        for (i = 0; i < 16; i = i + 1)
+            send_uart_byte((i / 4) * 8 + i % 4);
+        wait(led[0] == 0);
+        #(BIT_TIME * 20);
+
+        // 3 x E, 2 x D
+        run_block(8'h45, 8'h10);
+        run_block(8'h45, 8'h20);
+        run_block(8'h44, 8'h30);
+        run_block(8'h44, 8'h40);
+
+        // Last 'E': a byte sent right behind the frame arrives while the
+        // controller is transmitting and is dropped
+        wait(led[0] == 0);
+        #(BIT_TIME * 5);
+        send_uart_byte(8'h45);
+        for (i = 0; i < 8; i = i + 1)
+            send_uart_byte(8'h60 + i);
+        fork
+            send_uart_byte(8'h00);
+            for (i = 0; i < 8; i = i + 1)
+                capture_tx_byte(temp_byte);
+        join
+
+        // Unknown command
+        wait(led[0] == 0);
+        #(BIT_TIME * 5);
+        send_uart_byte(8'h5A);
+        #(BIT_TIME * 5);
+
+        // Dump the counters
+        send_uart_byte(8'h51);  // 'Q'
+        cycles_at_dump = cycles;
+        for (i = 0; i < STATS_BYTES; i = i + 1)
+            capture_tx_byte(record[i]);
+
+        for (i = 0; i < NUM_COUNTERS; i = i + 1)
+            counter[i] = {record[2+4*i+3], record[2+4*i+2], record[2+4*i+1], record[2+4*i]};
+
+        $display("");
+        if (record[0] !== 8'h51 || record[1] !== NUM_COUNTERS) begin
+            $display("  Bad header %02h %02h  FAIL", record[0], record[1]);
+            errors = errors + 1;
+        end
+        check(11, 3);  // blocks encrypted
+        check(12, 2);  // blocks decrypted
+        check(13, 1);  // key loads
+        check(14, 0);  // key prefetches
+        check(15, 0);  // key swaps
+        check(16, 1);  // rejected commands
+        check(17, 1);  // RX overruns
+
+        // The snapshot is taken a fraction of a bit time after the 'Q'
+        // stop bit, before cycles_at_dump was sampled
+        state_sum = 0;
+        for (i = 0; i < 11; i = i + 1)
+            state_sum = state_sum + counter[i];
+        $display("  state cycles %0d, testbench cycles %0d", state_sum, cycles_at_dump);
+        $display("  IDLE %0d, RX_BYTES %0d, WAIT_CRYPTO %0d, TX_BYTES %0d",
+                 counter[0], counter[2], counter[6], counter[7]);
+        if (state_sum > cycles_at_dump || cycles_at_dump - state_sum > 20000) begin
+            $display("  State cycles do not add up  FAIL");
+            errors = errors + 1;
+        end
+        if (counter[6] < 5 * 27) begin
+            $display("  Too few WAIT_CRYPTO cycles for 5 blocks  FAIL");
+            errors = errors + 1;
+        end
+
+        $display("");
+        $display("========================================================");
+        if (errors == 0)
+            $display("  RESULT: *** PASS ***");
+        else
+            $display("  RESULT: *** FAIL *** (%0d errors)", errors);
+        $display("========================================================");
+        $finish;
+    end
+
+    // Timeout
+    initial begin
+        #(BIT_TIME * 5000);
+        $display("  RESULT: *** FAIL *** (timeout)");
+        $finish;
+    end
+
+endmodule
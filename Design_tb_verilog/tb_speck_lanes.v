@@ -0,0 +1,182 @@
+`timescale 1ns / 1ps
+
+// tb_speck_lanes.v
+// Throughput of the multi-lane engine (speck_lanes.v) for LANES = 1, 2, 4, 8
+//
+// Every engine gets the same back-to-back stream of NUM_BLOCKS blocks,
+// alternating E(PT) and D(CT) with the NSA SPECK64/128 test vector, and a
+// consumer that is always ready. Results must come back in input order
+// (CT, PT, CT, PT, ...). Reports blocks per cycle for each lane count.
+
+module tb_speck_lanes;
+
+    parameter W          = 32;
+    parameter ROUNDS     = 27;
+    parameter NUM_BLOCKS = 256;
+    parameter CONFIGS    = 4;     // LANES = 1 << g for g = 0..CONFIGS-1
+
+    // NSA test vector
+    localparam [W-1:0] PT_X = 32'h3b726574, PT_Y = 32'h7475432d;
+    localparam [W-1:0] CT_X = 32'h8c6fa548, CT_Y = 32'h454e028b;
+
+    reg clk = 0;
+    always #5 clk = ~clk; // 100 MHz
+
+    reg rst;
+    reg ks_start;
+    reg go;                       // Start streaming into every engine
+
+    wire [W*ROUNDS-1:0] rk_flat;
+    wire ks_done;
+
+    reg [31:0] cycle;
+    always @(posedge clk) cycle <= rst ? 0 : cycle + 1;
+
+    // ------------------------------------------------------------------------
+    // Key schedule (key bytes 00 01 02 03 08 09 0a 0b 10 11 12 13 18 19 1a 1b)
+    // ------------------------------------------------------------------------
+    speck_key_schedule #(
+        .W(W),
+        .ROUNDS(ROUNDS)
+    ) u_key_schedule (
+        .clk(clk),
+        .rst(rst),
+        .start(ks_start),
+        .K0(32'h03020100),
+        .K1(32'h0b0a0908),
+        .K2(32'h13121110),
+        .K3(32'h1b1a1918),
+        .rk_flat(rk_flat),
+        .busy(),
+        .done(ks_done)
+    );
+
+    // ------------------------------------------------------------------------
+    // One engine + driver + checker per lane count
+    // ------------------------------------------------------------------------
+    wire [CONFIGS-1:0] finished;
+
+    genvar g;
+    generate
+        for (g = 0; g < CONFIGS; g = g + 1) begin : cfg
+
+            localparam LANES = 1 << g;
+
+            reg  [31:0]  sent, received, errors;
+            reg  [31:0]  start_cycle, end_cycle;
+
+            wire         in_valid   = go && (sent < NUM_BLOCKS);
+            wire         in_decrypt = sent[0];          // E, D, E, D, ...
+            wire [W-1:0] in_x       = sent[0] ? CT_X : PT_X;
+            wire [W-1:0] in_y       = sent[0] ? CT_Y : PT_Y;
+            wire         in_ready;
+
+            wire         out_valid;
+            wire [W-1:0] out_x, out_y;
+
+            speck_lanes #(
+                .W(W),
+                .ROUNDS(ROUNDS),
+                .LANES(LANES)
+            ) dut (
+                .clk(clk),
+                .rst(rst),
+                .rk_flat(rk_flat),
+                .in_valid(in_valid),
+                .in_ready(in_ready),
+                .in_decrypt(in_decrypt),
+                .in_x(in_x),
+                .in_y(in_y),
+                .out_valid(out_valid),
+                .out_ready(1'b1),
+                .out_x(out_x),
+                .out_y(out_y),
+                .computing()
+            );
+
+            always @(posedge clk) begin
+                if (rst) begin
+                    sent        <= 0;
+                    received    <= 0;
+                    errors      <= 0;
+                    start_cycle <= 0;
+                    end_cycle   <= 0;
+                end else begin
+                    if (in_valid && in_ready) begin
+                        if (sent == 0)
+                            start_cycle <= cycle;
+                        sent <= sent + 1;
+                    end
+
+                    if (out_valid) begin
+                        // Even results are ciphertexts, odd ones plaintexts
+                        if (received[0] ? (out_x !== PT_X || out_y !== PT_Y)
+                                        : (out_x !== CT_X || out_y !== CT_Y)) begin
+                            if (errors < 4)
+                                $display("  LANES=%0d block %0d: got %h %h", LANES, received, out_x, out_y);
+                            errors <= errors + 1;
+                        end
+                        if (received == NUM_BLOCKS - 1)
+                            end_cycle <= cycle;
+                        received <= received + 1;
+                    end
+                end
+            end
+
+            assign finished[g] = (received == NUM_BLOCKS);
+
+        end
+    endgenerate
+
+    // ------------------------------------------------------------------------
+    // Stimulus and report
+    // ------------------------------------------------------------------------
+    integer total_errors;
+    integer cycles;
+
+    initial begin
+        rst      = 1;
+        ks_start = 0;
+        go       = 0;
+        #40;
+        rst = 0;
+
+        // Round keys
+        @(posedge clk);
+        ks_start <= 1;
+        @(posedge clk);
+        ks_start <= 0;
+        wait (ks_done);
+        @(posedge clk);
+
+        // Stream blocks into all engines at once
+        go <= 1;
+        wait (&finished);
+        @(posedge clk);
+
+        $display("========================================");
+        $display("SPECK lanes: %0d back-to-back blocks (E/D alternating)", NUM_BLOCKS);
+        $display("========================================");
+        total_errors = 0;
+
+        `define REPORT(G) \
+            cycles = cfg[G].end_cycle - cfg[G].start_cycle + 1; \
+            $display("  LANES=%0d: %0d cycles, %0.3f blocks/cycle (%0.1f Mblocks/s @ 100 MHz), %0d errors", \
+                     1 << G, cycles, NUM_BLOCKS * 1.0 / cycles, NUM_BLOCKS * 100.0 / cycles, cfg[G].errors); \
+            total_errors = total_errors + cfg[G].errors;
+
+        `REPORT(0)
+        `REPORT(1)
+        `REPORT(2)
+        `REPORT(3)
+
+        if (total_errors == 0)
+            $display("PASS: all results correct and in order");
+        else
+            $display("FAIL: %0d wrong or out-of-order results", total_errors);
+
+        #50;
+        $finish;
+    end
+
+endmodule
@@ -0,0 +1,202 @@
+`timescale 1ns / 1ps
+
+// MULTI-LANE top: 0x52 ('R') bytes inside frames are data, not a reset
+// One continuous stream: 'K' + key, E(NSA PT), an 'E' and a 'D' frame whose
+// payload is 0x52 bytes, D(NSA CT). Every response must match the software
+// model and no UART reset may fire. A real 'R' command afterwards must
+// reset the board exactly once.
+module tb_uart_top_lanes;
+
+    // Parameters
+    parameter CLK_FREQ = 100_000_000;
+    parameter BAUD_RATE = 115200;
+    parameter CLK_PERIOD = 10;  // 100 MHz = 10ns
+    parameter LANES = 4;
+    localparam NUM_COMMANDS = 4;
+
+    // DUT signals
+    reg clk;
+    reg rst;
+    reg uart_rxd;
+    wire uart_txd;
+    wire [15:0] led;
+
+    // UART bit timing
+    localparam BIT_TIME = 1_000_000_000 / BAUD_RATE;  // in ns
+
+    // Real UART RX for capturing responses
+    wire [7:0] rx_data;
+    wire rx_valid;
+
+    uart_rx #(
+        .CLK_FREQ(CLK_FREQ),
+        .BAUD_RATE(BAUD_RATE)
+    ) u_testbench_rx (
+        .clk(clk),
+        .rst(rst),
+        .rx(uart_txd),
+        .data_out(rx_data),
+        .data_valid(rx_valid)
+    );
+
+    // DUT - Top-level module (MULTI-LANE)
+    speck_uart_top_lanes #(
+        .W(32),
+        .ROUNDS(27),
+        .LANES(LANES),
+        .CLK_FREQ(CLK_FREQ),
+        .BAUD_RATE(BAUD_RATE)
+    ) dut (
+        .clk(clk),
+        .rst(rst),
+        .uart_rxd(uart_rxd),
+        .uart_txd(uart_txd),
+        .led(led)
+    );
+
+    // Clock generation
+    initial begin
+        clk = 0;
+        forever #(CLK_PERIOD/2) clk = ~clk;
+    end
+
+    // Task: Send byte via UART (no gap after the stop bit)
+    task send_uart_byte;
+        input [7:0] byte;
+        integer i;
+        begin
+            uart_rxd = 0;  // Start bit
+            #BIT_TIME;
+            for (i = 0; i < 8; i = i + 1) begin
+                uart_rxd = byte[i];
+                #BIT_TIME;
+            end
+            uart_rxd = 1;  // Stop bit
+            #BIT_TIME;
+        end
+    endtask
+
+    // NSA test vector: key 00 01 02 03 08 09 0a 0b 10 11 12 13 18 19 1a 1b
+    reg [7:0] test_key [0:15];
+    reg [7:0] nsa_pt   [0:7];
+    reg [7:0] nsa_ct   [0:7];
+    reg [7:0] r_pt     [0:7];   // 52 52 52 52 52 52 52 52
+    reg [7:0] r_ct     [0:7];   // Its ciphertext under the NSA key
+
+    // ========================================================================
+    // Response checker: E(NSA PT), E(r_pt), D(r_ct), D(NSA CT)
+    // ========================================================================
+    integer rx_bytes = 0;
+    integer errors = 0;
+    reg [7:0] expected;
+
+    always @(posedge clk) begin
+        if (rx_valid) begin
+            case (rx_bytes / 8)
+                0: expected = nsa_ct[rx_bytes % 8];
+                1: expected = r_ct[rx_bytes % 8];
+                2: expected = r_pt[rx_bytes % 8];
+                default: expected = nsa_pt[rx_bytes % 8];
+            endcase
+            if (rx_data !== expected) begin
+                $display("  [%0t] Command %0d byte %0d: got %02h, expected %02h",
+                         $time, rx_bytes / 8, rx_bytes % 8, rx_data, expected);
+                errors = errors + 1;
+            end
+            rx_bytes = rx_bytes + 1;
+        end
+    end
+
+    // UART-triggered resets (rising edges of the reset pulse)
+    integer uart_resets = 0;
+    reg     reset_q = 0;
+    always @(posedge clk) begin
+        reset_q <= dut.uart_reset_trigger;
+        if (dut.uart_reset_trigger && !reset_q)
+            uart_resets = uart_resets + 1;
+    end
+
+    integer i, j;
+
+    initial begin
+        $display("========================================================");
+        $display("SPECK64/128 Lanes Top - 0x52 Data vs 'R' Command");
+        $display("========================================================");
+        $display("");
+
+        // Initialize
+        rst = 1;
+        uart_rxd = 1;
+
+        test_key[0]  = 8'h00; test_key[1]  = 8'h01; test_key[2]  = 8'h02; test_key[3]  = 8'h03;
+        test_key[4]  = 8'h08; test_key[5]  = 8'h09; test_key[6]  = 8'h0a; test_key[7]  = 8'h0b;
+        test_key[8]  = 8'h10; test_key[9]  = 8'h11; test_key[10] = 8'h12; test_key[11] = 8'h13;
+        test_key[12] = 8'h18; test_key[13] = 8'h19; test_key[14] = 8'h1a; test_key[15] = 8'h1b;
+
+        nsa_pt[0] = 8'h2d; nsa_pt[1] = 8'h43; nsa_pt[2] = 8'h75; nsa_pt[3] = 8'h74;
+        nsa_pt[4] = 8'h74; nsa_pt[5] = 8'h65; nsa_pt[6] = 8'h72; nsa_pt[7] = 8'h3b;
+
+        nsa_ct[0] = 8'h8b; nsa_ct[1] = 8'h02; nsa_ct[2] = 8'h4e; nsa_ct[3] = 8'h45;
+        nsa_ct[4] = 8'h48; nsa_ct[5] = 8'ha5; nsa_ct[6] = 8'h6f; nsa_ct[7] = 8'h8c;
+
+        for (i = 0; i < 8; i = i + 1) r_pt[i] = 8'h52;
+        r_ct[0] = 8'h5c; r_ct[1] = 8'h11; r_ct[2] = 8'h88; r_ct[3] = 8'hc7;
+        r_ct[4] = 8'he9; r_ct[5] = 8'h47; r_ct[6] = 8'hb2; r_ct[7] = 8'heb;
+
+        // Release reset
+        #(CLK_PERIOD * 10);
+        rst = 0;
+        #(CLK_PERIOD * 10);
+
+        // ================================================================
+        // One continuous stream, never waiting for a response
+        // ================================================================
+        send_uart_byte(8'h4B);  // 'K'
+        for (i = 0; i < 16; i = i + 1) send_uart_byte(test_key[i]);
+        send_uart_byte(8'h45);  // 'E'
+        for (j = 0; j < 8; j = j + 1) send_uart_byte(nsa_pt[j]);
+        send_uart_byte(8'h45);  // 'E' of 0x52 bytes
+        for (j = 0; j < 8; j = j + 1) send_uart_byte(r_pt[j]);
+        send_uart_byte(8'h44);  // 'D' back to 0x52 bytes
+        for (j = 0; j < 8; j = j + 1) send_uart_byte(r_ct[j]);
+        send_uart_byte(8'h44);  // 'D'
+        for (j = 0; j < 8; j = j + 1) send_uart_byte(nsa_ct[j]);
+
+        wait (rx_bytes == NUM_COMMANDS * 8);
+        #(BIT_TIME * 20);
+        $display("[%0t] %0d response bytes, UART resets so far: %0d (expected 0)",
+                 $time, rx_bytes, uart_resets);
+
+        // A real 'R' command resets the board: the key is gone
+        send_uart_byte(8'h52);
+        #(BIT_TIME * 2);
+        $display("[%0t] After 'R': %0d UART reset(s), keys_loaded = %0b", $time,
+                 uart_resets, dut.u_controller.keys_loaded);
+
+        $display("");
+        $display("========================================================");
+        $display("SUMMARY:");
+        $display("  Response bytes:       %0d (expected %0d)", rx_bytes, NUM_COMMANDS * 8);
+        $display("  Byte errors:          %0d", errors);
+        $display("  UART resets:          %0d (expected 1, from the 'R' command)", uart_resets);
+        if (errors == 0 && rx_bytes == NUM_COMMANDS * 8 && uart_resets == 1
+            && !dut.u_controller.keys_loaded) begin
+            $display("  OVERALL: *** ALL TESTS PASSED ***");
+        end else begin
+            $display("  OVERALL: *** SOME TESTS FAILED ***");
+        end
+        $display("========================================================");
+
+        #1000;
+        $stop;
+    end
+
+    // Timeout watchdog
+    initial begin
+        #(BIT_TIME * 10 * (17 + NUM_COMMANDS * 9 + 1) * 4);
+        $display("\n*** TIMEOUT - %0d of %0d response bytes ***", rx_bytes, NUM_COMMANDS * 8);
+        $display("  OVERALL: *** SOME TESTS FAILED ***");
+        $stop;
+    end
+
+endmodule
@@ -0,0 +1,206 @@
+`timescale 1ns / 1ps
+
+// SPECK128/128: speck_uart_top_v3 built with W=64, ROUNDS=32
+// Loads the published SPECK128/128 key with 'K', encrypts the published
+// plaintext with one 16-byte 'E' frame, decrypts the result with 'D', and
+// checks both against the vector. Also reports the 'E' round-trip time and
+// the payload bytes/s it implies at window 1 (compare with 8 bytes per
+// frame in tb_uart_top_10blocks_v3).
+module tb_uart_top_speck128;
+
+    // Parameters
+    parameter CLK_FREQ = 100_000_000;
+    parameter BAUD_RATE = 115200;
+    parameter CLK_PERIOD = 10;  // 100 MHz = 10ns
+    parameter BLOCK_BYTES = 16;
+
+    // DUT signals
+    reg clk;
+    reg rst;
+    reg uart_rxd;
+    wire uart_txd;
+    wire [15:0] led;
+
+    // UART bit timing
+    localparam BIT_TIME = 1_000_000_000 / BAUD_RATE;  // in ns
+
+    // Real UART RX for capturing responses
+    wire [7:0] rx_data;
+    wire rx_valid;
+
+    uart_rx #(
+        .CLK_FREQ(CLK_FREQ),
+        .BAUD_RATE(BAUD_RATE)
+    ) u_testbench_rx (
+        .clk(clk),
+        .rst(rst),
+        .rx(uart_txd),
+        .data_out(rx_data),
+        .data_valid(rx_valid)
+    );
+
+    // DUT - Top-level module (VERSION 3, SPECK128/128 build)
+    speck_uart_top_v3 #(
+        .W(64),
+        .ROUNDS(32),
+        .CLK_FREQ(CLK_FREQ),
+        .BAUD_RATE(BAUD_RATE)
+    ) dut (
+        .clk(clk),
+        .rst(rst),
+        .uart_rxd(uart_rxd),
+        .uart_txd(uart_txd),
+        .led(led)
+    );
+
+    // Clock generation
+    initial begin
+        clk = 0;
+        forever #(CLK_PERIOD/2) clk = ~clk;
+    end
+
+    // Task: Capture byte from UART
+    task capture_tx_byte;
+        output [7:0] byte_val;
+        begin
+            wait(rx_valid == 1);
+            byte_val = rx_data;
+            wait(rx_valid == 0);
+        end
+    endtask
+
+    // Task: Send byte via UART
+    task send_uart_byte;
+        input [7:0] byte;
+        integer i;
+        begin
+            uart_rxd = 0;  // Start bit
+            #BIT_TIME;
+            for (i = 0; i < 8; i = i + 1) begin
+                uart_rxd = byte[i];
+                #BIT_TIME;
+            end
+            uart_rxd = 1;  // Stop bit
+            #BIT_TIME;
+        end
+    endtask
+
+    // Published vector in wire order: bytes 0-7 = y (low word first),
+    // bytes 8-15 = x. No 0x52 ('R') bytes, which the top treats as reset.
+    reg [7:0] test_key  [0:15];
+    reg [7:0] plaintext [0:BLOCK_BYTES-1];
+    reg [7:0] expected  [0:BLOCK_BYTES-1];
+    reg [7:0] ciphertext[0:BLOCK_BYTES-1];
+    reg [7:0] decrypted [0:BLOCK_BYTES-1];
+
+    integer i;
+    reg [7:0] temp_byte;
+    integer errors;
+    time t_start, t_end;
+
+    initial begin
+        $display("========================================================");
+        $display("SPECK128/128 Test - W=64, ROUNDS=32, 16-byte frames");
+        $display("========================================================");
+        $display("");
+
+        // Initialize
+        rst = 1;
+        uart_rxd = 1;
+        errors = 0;
+
+        // Key 00 01 .. 0f (K0 = 0706050403020100, K1 = 0f0e0d0c0b0a0908)
+        for (i = 0; i < 16; i = i + 1)
+            test_key[i] = i;
+
+        // PT y = 7469206564616d20, x = 6c61766975716520
+        plaintext[0]  = 8'h20; plaintext[1]  = 8'h6d; plaintext[2]  = 8'h61; plaintext[3]  = 8'h64;
+        plaintext[4]  = 8'h65; plaintext[5]  = 8'h20; plaintext[6]  = 8'h69; plaintext[7]  = 8'h74;
+        plaintext[8]  = 8'h20; plaintext[9]  = 8'h65; plaintext[10] = 8'h71; plaintext[11] = 8'h75;
+        plaintext[12] = 8'h69; plaintext[13] = 8'h76; plaintext[14] = 8'h61; plaintext[15] = 8'h6c;
+
+        // CT y = 7860fedf5c570d18, x = a65d985179783265
+        expected[0]  = 8'h18; expected[1]  = 8'h0d; expected[2]  = 8'h57; expected[3]  = 8'h5c;
+        expected[4]  = 8'hdf; expected[5]  = 8'hfe; expected[6]  = 8'h60; expected[7]  = 8'h78;
+        expected[8]  = 8'h65; expected[9]  = 8'h32; expected[10] = 8'h78; expected[11] = 8'h79;
+        expected[12] = 8'h51; expected[13] = 8'h98; expected[14] = 8'h5d; expected[15] = 8'ha6;
+
+        // Release reset
+        #(CLK_PERIOD * 10);
+        rst = 0;
+        #(CLK_PERIOD * 10);
+
+        // ================================================================
+        // STEP 1: Load Key
+        // ================================================================
+        $display("[%0t] STEP 1: Loading Key...", $time);
+        send_uart_byte(8'h4B);  // 'K'
+        for (i = 0; i < 16; i = i + 1)
+            send_uart_byte(test_key[i]);
+        wait(led[0] == 0);
+        #(BIT_TIME * 50);
+
+        // ================================================================
+        // STEP 2: Encrypt one 16-byte block
+        // ================================================================
+        $display("[%0t] STEP 2: Encrypting...", $time);
+        t_start = $time;
+        send_uart_byte(8'h45);  // 'E'
+        for (i = 0; i < BLOCK_BYTES; i = i + 1)
+            send_uart_byte(plaintext[i]);
+        for (i = 0; i < BLOCK_BYTES; i = i + 1) begin
+            capture_tx_byte(temp_byte);
+            ciphertext[i] = temp_byte;
+        end
+        t_end = $time;
+
+        $write("  CT: ");
+        for (i = 0; i < BLOCK_BYTES; i = i + 1) begin
+            $write("%02h ", ciphertext[i]);
+            if (ciphertext[i] !== expected[i]) errors = errors + 1;
+        end
+        $write("\n");
+        $display("  'E' round trip: %0t ns for %0d payload bytes (%0d bytes/s at window 1)",
+                 t_end - t_start, BLOCK_BYTES,
+                 (BLOCK_BYTES * 64'd1_000_000_000) / (t_end - t_start));
+
+        wait(led[0] == 0);
+        #(BIT_TIME * 50);
+
+        // ================================================================
+        // STEP 3: Decrypt it back
+        // ================================================================
+        $display("[%0t] STEP 3: Decrypting...", $time);
+        send_uart_byte(8'h44);  // 'D'
+        for (i = 0; i < BLOCK_BYTES; i = i + 1)
+            send_uart_byte(ciphertext[i]);
+        for (i = 0; i < BLOCK_BYTES; i = i + 1) begin
+            capture_tx_byte(temp_byte);
+            decrypted[i] = temp_byte;
+        end
+
+        $write("  PT: ");
+        for (i = 0; i < BLOCK_BYTES; i = i + 1) begin
+            $write("%02h ", decrypted[i]);
+            if (decrypted[i] !== plaintext[i]) errors = errors + 1;
+        end
+        $write("\n");
+
+        $display("");
+        $display("========================================================");
+        if (errors == 0)
+            $display("  RESULT: *** PASS *** (published SPECK128/128 vector)");
+        else
+            $display("  RESULT: *** FAIL *** (%0d byte mismatches)", errors);
+        $display("========================================================");
+        $finish;
+    end
+
+    // Timeout
+    initial begin
+        #(BIT_TIME * 2000);
+        $display("  RESULT: *** FAIL *** (timeout)");
+        $finish;
+    end
+
+endmodule
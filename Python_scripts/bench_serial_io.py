@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Serial I/O Benchmark: per-block writes vs coalesced batches
+Counts write/read syscalls on the port and blocks/s for each transfer
+strategy, across USB latency-timer settings (emulated FTDI bridge).
+
+    python bench_serial_io.py            # pty emulator, no board needed
+    python bench_serial_io.py COM10      # real board (latency as configured)
+"""
+
+import os
+import sys
+import time
+
+from speck_tool_final import SPECKCrypto
+
+NUM_BLOCKS = 200
+BAUD_RATE = 115200
+LATENCY_TIMERS = [0.016, 0.001, None]  # FT2232 default, tuned, ideal
+KEY = bytes(range(16))
+
+
+class SyscallCounter:
+    """Counts os.read/os.write calls on one file descriptor"""
+
+    def __init__(self, fd):
+        self.fd = fd
+        self.reads = 0
+        self.writes = 0
+
+    def __enter__(self):
+        self._read, self._write = os.read, os.write
+
+        def read(fd, n):
+            if fd == self.fd:
+                self.reads += 1
+            return self._read(fd, n)
+
+        def write(fd, data):
+            if fd == self.fd:
+                self.writes += 1
+            return self._write(fd, data)
+
+        os.read, os.write = read, write
+        return self
+
+    def __exit__(self, *exc):
+        os.read, os.write = self._read, self._write
+
+
+def legacy_blocks(crypto, command, data):
+    """The pre-coalescing transfer: 'E', block and read(8) as separate calls"""
+    out = bytearray()
+    for i in range(0, len(data), 8):
+        crypto.ser.write(command)
+        crypto.ser.write(data[i:i+8])
+        out.extend(crypto.ser.read(8))
+    return bytes(out)
+
+
+STRATEGIES = [
+    ("per-block writes", lambda c, d: legacy_blocks(c, b'E', d)),
+    ("coalesced, window=1", lambda c, d: c.process_blocks(b'E', d, window=1)),
+    ("coalesced, window=16", lambda c, d: c.process_blocks(b'E', d, window=16)),
+]
+
+
+def run(crypto, fn, data):
+    crypto.load_key_bytes(KEY)
+    fd = getattr(crypto.ser, 'fd', None)
+    with SyscallCounter(fd) as sc:
+        start = time.perf_counter()
+        result = fn(crypto, data)
+        elapsed = time.perf_counter() - start
+    if len(result) != len(data):
+        raise Exception(f"Short result: {len(result)} of {len(data)} bytes")
+    return NUM_BLOCKS / elapsed, sc.writes, sc.reads
+
+
+def print_row(name, rate, writes, reads):
+    print(f"  {name:<22} {rate:8.0f} blocks/s   "
+          f"{writes/NUM_BLOCKS:5.2f} writes/block   {reads/NUM_BLOCKS:5.2f} reads/block")
+
+
+def main():
+    print("="*75)
+    print("SPECK64/128 Serial I/O Benchmark")
+    print("="*75)
+
+    data = os.urandom(NUM_BLOCKS * 8)
+
+    if len(sys.argv) > 1:
+        # Real board: window > 1 needs a bitstream with RX/TX FIFOs
+        crypto = SPECKCrypto(sys.argv[1], BAUD_RATE)
+        print(f"\n  Latency timer tuning applied: {crypto.set_latency_timer(1)}\n")
+        for name, fn in STRATEGIES[:2]:
+            print_row(name, *run(crypto, fn, data))
+        crypto.close()
+        print("="*75)
+        return
+
+    from speck_emulator import SPECKEmulator
+
+    for latency in LATENCY_TIMERS:
+        label = f"{latency*1000:.0f} ms" if latency else "none"
+        print(f"\n  USB latency timer: {label}  ({NUM_BLOCKS} blocks @ {BAUD_RATE} baud)")
+        for name, fn in STRATEGIES:
+            with SPECKEmulator(baud=BAUD_RATE, latency_timer=latency) as emu:
+                crypto = SPECKCrypto(emu.port, BAUD_RATE, settle=0, verbose=False)
+                print_row(name, *run(crypto, fn, data))
+                crypto.close()
+    print("="*75)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+# The test_*.py scripts in this folder drive a real board at import time;
+# only the pytest suite under tests/ is collected automatically.
+collect_ignore_glob = ["test_*.py"]
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+SPECK64/128 Block Buffer
+One preallocated bytearray holding many 8-byte blocks. Device responses are
+read straight into their slots, so bulk results create no per-block objects.
+"""
+
+
+class BlockBuffer:
+    def __init__(self, num_blocks):
+        """Allocate room for num_blocks 8-byte blocks (zero-filled)"""
+        self.buf = bytearray(num_blocks * 8)
+        self.view = memoryview(self.buf)
+        self.num_blocks = num_blocks
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Copy whole blocks from bytes-like data"""
+        if len(data) % 8 != 0:
+            raise Exception(f"Data must be multiple of 8 bytes, got {len(data)}")
+        bb = cls(len(data) // 8)
+        bb.buf[:] = data
+        return bb
+
+    @classmethod
+    def padded(cls, data):
+        """Copy data and append PKCS#7 padding (always 1-8 bytes)"""
+        padding_needed = 8 - (len(data) % 8)
+        bb = cls(len(data) // 8 + 1)
+        bb.buf[:len(data)] = data
+        bb.buf[len(data):] = bytes((padding_needed,)) * padding_needed
+        return bb
+
+    def __len__(self):
+        return len(self.buf)
+
+    def block(self, i):
+        """Writable view of block i (no copy)"""
+        return self.view[i*8:(i+1)*8]
+
+    def words(self):
+        """NumPy (num_blocks, 2) uint32 view: column 0 = y, column 1 = x"""
+        import numpy as np  # Only needed for word views; keeps imports light
+        return np.frombuffer(self.buf, dtype='<u4').reshape(-1, 2)
+
+    @property
+    def x(self):
+        """Upper words of every block (SPECK x), as a NumPy view"""
+        return self.words()[:, 1]
+
+    @property
+    def y(self):
+        """Lower words of every block (SPECK y), as a NumPy view"""
+        return self.words()[:, 0]
+
+    def padding_length(self):
+        """Length of valid PKCS#7 padding at the end, or 0 if there is none"""
+        if not self.buf:
+            return 0
+        padding_length = self.buf[-1]
+        if 0 < padding_length <= 8 and \
+                self.view[-padding_length:] == bytes((padding_length,)) * padding_length:
+            return padding_length
+        return 0
+
+    def unpadded(self):
+        """View of the content without its PKCS#7 padding (no copy)
+
+        Like SPECKCrypto.decrypt, data without valid padding is returned whole.
+        """
+        return self.view[:len(self.buf) - self.padding_length()]
+
+    def tobytes(self):
+        return bytes(self.buf)
+
+    def hex(self):
+        return self.buf.hex()
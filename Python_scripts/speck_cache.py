@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+SPECK64/128 Result Cache
+Bounded LRU of (key, block) -> result for the ECB-style block commands.
+Under one key a block always encrypts to the same ciphertext, so repeated
+blocks (fixed headers, padded tails) can be answered locally instead of
+costing a round trip on the wire. Opt-in:
+
+    crypto.cache = BlockCache(max_bytes=1 << 20)
+
+Every device result is stored in both directions: E(pt) = ct also gives
+D(ct) = pt. Entries belong to the key fingerprint they were computed under
+and the cache is wiped as soon as a different key is loaded.
+"""
+
+from collections import OrderedDict
+
+from speck_tool_final import key_id
+
+ENTRY_BYTES = 192  # Measured cost of one entry: 9-byte key, 8-byte value, dict node
+INVERSE = {b'E': b'D', b'D': b'E'}
+
+
+class BlockCache:
+    def __init__(self, max_bytes=1 << 20):
+        """Keep at most about max_bytes of cached results (LRU eviction)"""
+        self.max_bytes = max_bytes
+        self.max_entries = max(1, max_bytes // ENTRY_BYTES)
+        self.key_id = None  # Fingerprint of the key the entries belong to
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.wipes = 0
+
+        self._entries = OrderedDict()  # command + block -> result
+
+    def __len__(self):
+        return len(self._entries)
+
+    def set_key(self, key_bytes):
+        """Switch to key_bytes, wiping all entries if it is a different key"""
+        fingerprint = key_id(key_bytes) if key_bytes is not None else None
+        if fingerprint != self.key_id:
+            if self._entries:
+                self.wipes += 1
+            self._entries.clear()
+            self.key_id = fingerprint
+
+    def clear(self):
+        """Drop every entry (statistics are kept)"""
+        self._entries.clear()
+
+    def get(self, command, block):
+        """Cached result for command ('E'/'D') on an 8-byte block, or None"""
+        result = self._entries.get(command + bytes(block))
+        if result is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(command + bytes(block))
+        self.hits += 1
+        return result
+
+    def fill(self, command, block, slot):
+        """Write a cached result into slot (a writable 8-byte view).
+        Returns True on a hit, False if the block has to go to the device."""
+        result = self.get(command, block)
+        if result is None:
+            return False
+        slot[:] = result
+        return True
+
+    def put(self, command, block, result):
+        """Store a device result, and its inverse, as most recently used"""
+        if self.key_id is None:
+            return
+        block = bytes(block)
+        result = bytes(result)
+        self._store(command + block, result)
+        self._store(INVERSE[command] + result, block)
+
+    def _store(self, entry, result):
+        self._entries[entry] = result
+        self._entries.move_to_end(entry)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'key_id': self.key_id,
+            'entries': len(self._entries),
+            'bytes': len(self._entries) * ENTRY_BYTES,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'evictions': self.evictions,
+            'wipes': self.wipes,
+        }
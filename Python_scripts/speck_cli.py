@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+SPECK64/128 One-Shot Command Line
+Scripted encrypt/decrypt with no banner, no prompts and no GUI imports:
+
+    python speck_cli.py enc --key-file key.bin --in msg.txt --out msg.enc
+    python speck_cli.py dec --key-file key.bin --in msg.enc --out msg.txt
+
+Uses a running speck_daemon.py when its socket exists (no port open, no
+settle delay), otherwise opens the COM port directly. A default socket
+left behind by a crashed daemon is skipped; one named with --socket must
+answer.
+
+Exit status: 0 ok, 1 bad input, 2 usage, 3 device/daemon error, 4 bad padding
+"""
+
+import time
+
+_T0 = time.perf_counter()
+
+import argparse
+import os
+import sys
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_DEVICE = 3
+EXIT_BAD_PADDING = 4
+
+
+def read_key(path):
+    """16 raw bytes, or an ASCII key padded/truncated like load_key"""
+    with open(path, 'rb') as f:
+        key = f.read()
+    if len(key) != 16:
+        key = key.rstrip(b'\r\n').ljust(16, b'\0')[:16]
+    return key
+
+
+def read_input(path):
+    if path == '-':
+        return sys.stdin.buffer.read()
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def write_output(path, data):
+    if path == '-':
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+    else:
+        with open(path, 'wb') as f:
+            f.write(data)
+
+
+def run_blocks(args, command, key, data):
+    """Send blocks through the daemon if it is up, else straight to the port"""
+    socket_path = args.socket
+    if socket_path is None:
+        from speck_daemon import SOCKET_PATH
+        socket_path = os.environ.get('SPECK_SOCKET', SOCKET_PATH)
+
+    if args.port is None and os.path.exists(socket_path):
+        from speck_daemon import SPECKDaemonClient
+        try:
+            client = SPECKDaemonClient(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            if args.socket is not None:
+                raise
+            client = None  # Stale socket file: no daemon behind it
+        if client is not None:
+            with client:
+                if command == b'E':
+                    return client.encrypt_blocks(key, data), 'daemon'
+                return client.decrypt_blocks(key, data), 'daemon'
+
+    from speck_tool_final import SPECKCrypto
+    crypto = SPECKCrypto(args.port or os.environ.get('SPECK_PORT', 'COM10'),
+                         settle=args.settle, verbose=False)
+    try:
+        crypto.load_key_bytes(key)
+        return crypto.process_blocks(command, data), 'direct'
+    finally:
+        crypto.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='speck', description="SPECK64/128 FPGA one-shot tool")
+    parser.add_argument('op', choices=['enc', 'dec'])
+    parser.add_argument('--key-file', required=True, help="16-byte key (raw or ASCII)")
+    parser.add_argument('--in', dest='input', default='-', help="input file (- for stdin)")
+    parser.add_argument('--out', default='-', help="output file (- for stdout)")
+    parser.add_argument('--hex', action='store_true', help="ciphertext is hex text, not raw bytes")
+    parser.add_argument('--socket', help="daemon socket (default $SPECK_SOCKET or /tmp/speck_fpga.sock)")
+    parser.add_argument('--port', help="open this serial port directly, bypassing the daemon")
+    parser.add_argument('--settle', type=float, default=0.2,
+                        help="seconds to wait after opening the port directly")
+    parser.add_argument('--time', action='store_true', help="report wall-clock time on stderr")
+    args = parser.parse_args(argv)
+
+    from speck_tool_final import pkcs7_pad, pkcs7_unpad
+
+    try:
+        key = read_key(args.key_file)
+        data = read_input(args.input)
+        if args.op == 'dec':
+            if args.hex:
+                data = bytes.fromhex(data.decode('ascii').replace(' ', '').strip())
+            if not data or len(data) % 8 != 0:
+                raise ValueError(f"Ciphertext must be a non-empty multiple of 8 bytes, got {len(data)}")
+    except (OSError, ValueError, UnicodeDecodeError) as e:
+        print(f"speck: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    t_op = time.perf_counter()
+    try:
+        if args.op == 'enc':
+            result, path = run_blocks(args, b'E', key, pkcs7_pad(data))
+        else:
+            result, path = run_blocks(args, b'D', key, data)
+    except Exception as e:
+        print(f"speck: device error: {e}", file=sys.stderr)
+        return EXIT_DEVICE
+    t_done = time.perf_counter()
+
+    if args.op == 'enc':
+        if args.hex:
+            result = result.hex().encode('ascii') + b'\n'
+    else:
+        try:
+            result = pkcs7_unpad(result)
+        except Exception as e:
+            print(f"speck: {e} (wrong key?)", file=sys.stderr)
+            return EXIT_BAD_PADDING
+
+    try:
+        write_output(args.out, result)
+    except OSError as e:
+        print(f"speck: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    if args.time:
+        print(f"speck: {args.op} {len(data)} bytes via {path}: "
+              f"startup {(t_op - _T0)*1000:.1f} ms, "
+              f"device {(t_done - t_op)*1000:.1f} ms, "
+              f"total {(time.perf_counter() - _T0)*1000:.1f} ms", file=sys.stderr)
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
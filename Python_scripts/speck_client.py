@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+SPECK64/128 Thread-Safe Client
+SPECKCrypto owns one serial port and no lock: two threads calling it at once
+interleave frames and read each other's results. SPECKClient puts a single
+I/O thread in front of it. Any number of threads submit requests to a
+queue.SimpleQueue (put never takes a Python-level lock or blocks); the I/O
+thread drains everything queued, runs each stretch of same-key, same-op
+requests as one pipelined process_into pass, and completes the per-request
+futures in submission order.
+
+    client = SPECKClient(crypto, window=1)
+    client.load_key_bytes(key)
+    ct = client.process_blocks(b'E', data)        # from any thread
+    future = client.submit(b'D', ct, key=other)   # or asynchronously
+
+Admission control keeps latency bounded when offered load exceeds the link
+(at 115200 baud about 680 blocks/s): the backlog can be capped in blocks or
+bytes, and each request can carry a deadline. A request whose predicted
+completion - everything queued ahead of it at the measured link rate -
+would miss its deadline is rejected at submit; one that falls behind while
+queued is shed before it is sent. Predictions aim `margin` short of the
+deadline to cover what the rate misses (key loads, per-pass overhead, the
+lag of the smoothed rate), and a result that still arrives late fails with
+"Late" rather than being returned, so every successful request met its
+deadline. Either way the caller finds out at once instead of after seconds
+of queueing.
+
+    client = SPECKClient(crypto, max_queue_blocks=256, deadline=0.25)
+
+Admission control is on when the client has a queue limit or a default
+deadline. Without one, submit() stays lock-free; per-request deadlines are
+then enforced by shedding and late failure only.
+"""
+
+import collections
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from speck_tool_final import pkcs7_pad, pkcs7_unpad
+from speck_trace import percentile
+
+_STOP = None  # Queue sentinel
+
+
+class _Request:
+    def __init__(self, op, key, data, submitted, deadline_at, target_at):
+        self.op = op
+        self.key = key
+        self.data = data
+        self.blocks = len(data) // 8
+        self.submitted = submitted      # perf_counter() at submit
+        self.deadline_at = deadline_at  # perf_counter() it must finish by, or None
+        self.target_at = target_at      # deadline_at less the margin: plan to finish by
+        self.future = Future()
+
+
+class SPECKClient:
+    def __init__(self, crypto, window=1, max_batch_blocks=4096, max_queue_blocks=None,
+                 max_queue_bytes=None, deadline=None, link_rate=None, margin=0.25):
+        """Serialize requests from many threads onto `crypto` (a connected
+        SPECKCrypto, used only by the I/O thread from now on)
+
+        window:           frames in flight per device pass (see process_blocks)
+        max_batch_blocks: blocks drained from the queue per I/O round
+        max_queue_blocks: reject submissions once this many blocks are
+                          queued or in flight (None = unbounded)
+        max_queue_bytes:  the same limit in bytes
+        deadline:         default seconds from submit to result (None = none)
+        link_rate:        starting blocks/s estimate for deadline predictions
+                          (default: the port's baud rate, 17 wire bytes per
+                          block); replaced by measured pass rates as they come
+        margin:           fraction of each deadline held back from predictions
+        """
+        if getattr(crypto, 'block_size', 8) != 8:
+            raise Exception(f"SPECKClient supports 8-byte SPECK64/128 blocks only, "
+                            f"got a {crypto.block_size}-byte SPECKCrypto")
+        self.crypto = crypto
+        self.window = window
+        self.max_batch_blocks = max_batch_blocks
+        self.max_queue_blocks = max_queue_blocks
+        self.max_queue_bytes = max_queue_bytes
+        self.deadline = deadline
+        self.margin = margin
+        self.key_bytes = None  # Default key for submissions without one
+        if link_rate is None:
+            link_rate = getattr(crypto.ser, 'baudrate', 115200) / 10 / 17
+        self.link_rate = link_rate  # Blocks/s, smoothed over device passes
+
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._held = None  # Request drained past the batch limit, runs next
+
+        # Admission state (submitting threads and the I/O thread)
+        self._admission = (max_queue_blocks is not None or max_queue_bytes is not None
+                           or deadline is not None)
+        self._admit_lock = threading.Lock()
+        self._queued_blocks = 0  # Admitted and not yet completed
+        self._peak_blocks = 0
+        self._rejected = 0       # Refused at submit (queue full or deadline)
+
+        # Counters (written by the I/O thread only)
+        self._drained_blocks = 0  # Taken off the queue and not yet completed
+        self._peak_drained = 0
+        self._resolved = 0        # Requests completed, failed, shed or late
+        self._shed = 0            # Dropped before sending
+        self._late = 0            # Computed, but after their deadline
+        self._latencies = collections.deque(maxlen=10000)  # Completed, seconds
+        self._requests = 0
+        self._blocks = 0
+        self._rounds = 0
+        self._passes = 0
+        self._key_loads = 0
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Finish queued work and stop the I/O thread"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def load_key_bytes(self, key_bytes):
+        """Set the key used by later submissions that do not name one. The
+        device key only changes when a request under this key runs."""
+        if len(key_bytes) != 16:
+            raise Exception(f"Key must be 16 bytes, got {len(key_bytes)}")
+        self.key_bytes = bytes(key_bytes)
+
+    def submit(self, op, data, key=None, deadline=None):
+        """Queue raw blocks for 'E' or 'D'; returns a Future of the result bytes
+
+        deadline: seconds the caller will wait (default: the client's). Raises
+        at once if the queue is full or the deadline cannot be met; the
+        Future fails with "Shed" if the request falls behind while queued,
+        or "Late" if its result arrives after the deadline.
+        """
+        if op not in (b'E', b'D'):
+            raise Exception(f"Unknown operation {op!r}")
+        if len(data) % 8 != 0:
+            raise Exception(f"Data must be multiple of 8 bytes, got {len(data)}")
+        key = self.key_bytes if key is None else bytes(key)
+        if key is None or len(key) != 16:
+            raise Exception("No 16-byte key loaded")
+        if self._closed:
+            raise Exception("Client is closed")
+
+        now = time.perf_counter()
+        if deadline is None:
+            deadline = self.deadline
+        if deadline is None:
+            req = _Request(op, key, bytes(data), now, None, None)
+        else:
+            req = _Request(op, key, bytes(data), now, now + deadline,
+                           now + deadline * (1 - self.margin))
+        if not self._admission:
+            return self._enqueue(req)
+
+        with self._admit_lock:
+            queued = self._queued_blocks
+            if self.max_queue_blocks is not None and queued + req.blocks > self.max_queue_blocks:
+                self._rejected += 1
+                raise Exception(f"Rejected: queue full ({queued} of "
+                                f"{self.max_queue_blocks} blocks queued)")
+            if self.max_queue_bytes is not None and (queued + req.blocks) * 8 > self.max_queue_bytes:
+                self._rejected += 1
+                raise Exception(f"Rejected: queue full ({queued * 8} of "
+                                f"{self.max_queue_bytes} bytes queued)")
+            if deadline is not None:
+                predicted = (queued + req.blocks) / self.link_rate
+                if predicted > deadline * (1 - self.margin):
+                    self._rejected += 1
+                    raise Exception(f"Rejected: predicted {predicted*1e3:.0f} ms exceeds "
+                                    f"the {deadline*1e3:.0f} ms deadline less its "
+                                    f"{self.margin:.0%} margin")
+            self._queued_blocks = queued + req.blocks
+            self._peak_blocks = max(self._peak_blocks, self._queued_blocks)
+        return self._enqueue(req)
+
+    def _enqueue(self, req):
+        """Queue an admitted request. If close() ran since submit checked,
+        the request may sit behind the stop sentinel: once the I/O thread
+        has exited, fail whatever it left behind."""
+        self._queue.put(req)
+        if self._closed and threading.current_thread() is not self._thread:
+            self._thread.join()
+            self._fail_leftovers()
+        return req.future
+
+    def process_blocks(self, op, data, key=None, deadline=None):
+        """Run raw 8-byte blocks, blocking until the result is ready"""
+        return self.submit(op, data, key, deadline).result()
+
+    def encrypt_blocks(self, key, data):
+        """Encrypt raw 8-byte blocks under key (KeyScheduler-compatible)"""
+        return self.submit(b'E', data, key).result()
+
+    def decrypt_blocks(self, key, data):
+        """Decrypt raw 8-byte blocks under key (KeyScheduler-compatible)"""
+        return self.submit(b'D', data, key).result()
+
+    def encrypt(self, plaintext):
+        """Encrypt ASCII plaintext of any length; returns hex"""
+        return self.process_blocks(b'E', pkcs7_pad(plaintext.encode('ascii'))).hex()
+
+    def decrypt(self, ct_hex):
+        """Decrypt hex ciphertext; returns the unpadded plaintext string"""
+        ct_hex = ct_hex.replace(' ', '').replace('0x', '').strip()
+        if len(ct_hex) % 16 != 0:
+            raise Exception(f"Ciphertext must be multiple of 16 hex chars")
+        return pkcs7_unpad(self.process_blocks(b'D', bytes.fromhex(ct_hex))).decode('ascii')
+
+    def stats(self):
+        """How well submissions were coalesced, and how admission control
+        is holding up (queue depth, rejections, shedding, latency). Without
+        admission control submissions are not counted at submit, so queue
+        depth is what the I/O thread has drained and not yet completed."""
+        with self._admit_lock:
+            latencies = list(self._latencies)
+            if self._admission:
+                queued, peak = self._queued_blocks, self._peak_blocks
+            else:
+                queued, peak = self._drained_blocks, self._peak_drained
+            offered = self._rejected + self._resolved
+            refused = self._rejected + self._shed + self._late
+            return {
+                'requests': self._requests,
+                'blocks': self._blocks,
+                'io_rounds': self._rounds,
+                'device_passes': self._passes,
+                'key_loads': self._key_loads,
+                'requests_per_pass': self._requests / self._passes if self._passes else 0.0,
+                'queue_blocks': queued,
+                'queue_bytes': queued * 8,
+                'peak_queue_blocks': peak,
+                'rejected': self._rejected,
+                'shed': self._shed,
+                'late': self._late,
+                'shed_rate': refused / offered if offered else 0.0,
+                'link_rate': self.link_rate,
+                'latency_p50': percentile(latencies, 50),
+                'latency_p99': percentile(latencies, 99),
+            }
+
+    # ========================================================================
+    # I/O thread
+    # ========================================================================
+
+    def _take_batch(self):
+        """Block for one request, then drain whatever else is already
+        queued, up to max_batch_blocks. Returns (batch, stop)."""
+        req = self._held if self._held is not None else self._queue.get()
+        self._held = None
+        if req is _STOP:
+            return [], True
+
+        batch = [req]
+        blocks = req.blocks
+        stop = False
+        while True:
+            try:
+                req = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if req is _STOP:
+                stop = True
+                break
+            if blocks + req.blocks > self.max_batch_blocks:
+                self._held = req
+                break
+            batch.append(req)
+            blocks += req.blocks
+        self._drained_blocks += blocks
+        self._peak_drained = max(self._peak_drained, self._drained_blocks)
+        return batch, stop
+
+    def _run(self):
+        while True:
+            batch, stop = self._take_batch()
+            if batch:
+                self._execute(batch)
+            if stop:
+                self._fail_leftovers()
+                return
+
+    def _fail_leftovers(self):
+        """Fail requests queued after the stop sentinel"""
+        while True:
+            try:
+                req = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if req is _STOP:
+                continue
+            if self._admission:
+                with self._admit_lock:
+                    self._queued_blocks -= req.blocks
+            req.future.set_exception(Exception("Client is closed"))
+
+    def _execute(self, batch):
+        self._rounds += 1
+        while True:
+            # Re-check deadlines before every pass: earlier passes took time
+            batch = self._shed_late(batch)
+            if not batch:
+                return
+            # Longest stretch under the same key and op: one device pass
+            end = 1
+            while (end < len(batch) and batch[end].key == batch[0].key
+                   and batch[end].op == batch[0].op):
+                end += 1
+            self._pass(batch[:end])
+            batch = batch[end:]
+
+    def _shed_late(self, batch):
+        """Drop requests predicted to finish past their deadline less the
+        margin, counting the blocks ahead of them in this batch"""
+        now = time.perf_counter()
+        ahead = 0
+        live = []
+        for r in batch:
+            if r.target_at is not None and now + (ahead + r.blocks) / self.link_rate > r.target_at:
+                self._shed += 1
+                waited = now - r.submitted
+                self._finish(r, exception=Exception(
+                    f"Shed: would miss its deadline after {waited*1e3:.0f} ms queued"))
+                continue
+            ahead += r.blocks
+            live.append(r)
+        return live
+
+    def _finish(self, req, result=None, exception=None):
+        """Complete one request's future and take it off the backlog. A
+        result past its deadline fails instead: the caller has given up."""
+        now = time.perf_counter()
+        if exception is None and req.deadline_at is not None and now > req.deadline_at:
+            self._late += 1
+            exception = Exception(f"Late: finished {(now - req.deadline_at)*1e3:.1f} ms "
+                                  f"after its deadline")
+        if exception is None:
+            self._latencies.append(now - req.submitted)
+        self._resolved += 1
+        self._drained_blocks -= req.blocks
+        if self._admission:
+            with self._admit_lock:
+                self._queued_blocks -= req.blocks
+        if exception is None:
+            req.future.set_result(result)
+        else:
+            req.future.set_exception(exception)
+
+    def _pass(self, reqs):
+        key = reqs[0].key
+        start = time.perf_counter()
+        try:
+            if self.crypto.key_bytes != key:
+                self.crypto.load_key_bytes(key)
+                self._key_loads += 1
+            data = b''.join(r.data for r in reqs)
+            out = bytearray(len(data))
+            self.crypto.process_into(reqs[0].op, data, out, self.window)
+        except Exception as e:
+            # Device state is unknown after a failure; force a key reload
+            self.crypto.key_bytes = None
+            self.crypto.prefetched = None
+            for r in reqs:
+                self._finish(r, exception=e)
+            return
+
+        # Smoothed link rate for deadline predictions
+        elapsed = time.perf_counter() - start
+        if elapsed > 0:
+            rate = len(data) // 8 / elapsed
+            self.link_rate = rate if not self._passes else self.link_rate + 0.2 * (rate - self.link_rate)
+
+        self._passes += 1
+        offset = 0
+        for r in reqs:
+            self._finish(r, bytes(out[offset:offset + len(r.data)]))
+            offset += len(r.data)
+            self._requests += 1
+            self._blocks += r.blocks
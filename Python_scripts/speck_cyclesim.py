@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+SPECK64/128 Cycle-Level Datapath Model
+Predicts end-to-end blocks/s and per-frame latency of the FPGA design for a
+workload trace, so lane count, FIFOs and baud rate can be compared without
+editing Verilog and resynthesizing:
+
+    python speck_cyclesim.py            # design-space table
+
+Every latency is counted clock edge by clock edge from the RTL: uart_rx /
+uart_tx bit timing, the speck_uart_controller_v3 state machine (or
+speck_uart_controller_lanes when lanes > 1), the ROUNDS-cycle cores and key
+schedule, and the RX/TX FIFO glue of speck_uart_top_fifo. Instead of
+stepping every cycle, each byte and block is given the exact edge at which
+the RTL would handle it, which keeps long traces fast.
+"""
+
+import math
+from collections import deque
+
+TIMEOUT = 2.0  # Host read timeout (SPECKCrypto opens the port with timeout=2)
+
+
+class Design:
+    def __init__(self, clk_freq=100_000_000, baud=115200, lanes=1, fifo_depth=0,
+                 controller=None, rounds=None, host_baud=None, block_bytes=8):
+        """One hardware configuration
+
+        lanes:       parallel encryptor/decryptor pairs (speck_lanes.v)
+        fifo_depth:  RX/TX FIFO bytes (0 = none, as in speck_uart_top_v3)
+        controller:  'v3' or 'lanes' (default: v3 for one lane, else lanes)
+        host_baud:   actual host baud rate, if it differs from the FPGA's
+        block_bytes: 8 for SPECK64/128, 16 for the W=64 SPECK128/128 build
+                     (rounds default to 27 and 32)
+        """
+        if block_bytes not in (8, 16):
+            raise Exception(f"Block size must be 8 or 16 bytes, got {block_bytes}")
+        self.clk_freq = clk_freq
+        self.baud = baud
+        self.lanes = lanes
+        self.fifo_depth = fifo_depth
+        self.controller = controller or ('v3' if lanes == 1 else 'lanes')
+        if self.controller == 'lanes' and block_bytes != 8:
+            raise Exception("speck_uart_controller_lanes is SPECK64/128 only")
+        self.block_bytes = block_bytes
+        self.rounds = rounds or (27 if block_bytes == 8 else 32)
+        self.host_baud = host_baud or baud
+
+        self.bit_ticks = clk_freq // baud        # uart_rx/uart_tx BIT_TICKS
+        self.half_bit_ticks = self.bit_ticks // 2
+
+    def __repr__(self):
+        return (f"Design({self.controller}, lanes={self.lanes}, fifo={self.fifo_depth}, "
+                f"baud={self.baud}, clk={self.clk_freq/1e6:.0f} MHz, "
+                f"block={self.block_bytes})")
+
+    # Derived latencies, in clock edges ---------------------------------------
+
+    @property
+    def rx_latency(self):
+        """First edge that sees the start bit -> edge where the consumer
+        samples data_valid (START waits half a bit, 8 data bits, stop bit)"""
+        return self.half_bit_ticks + 2 + 9 * self.bit_ticks
+
+    @property
+    def tx_byte_period(self):
+        """Edges between two uart_tx starts: 10 bits, DONE, and the two-edge
+        busy/valid handshake"""
+        return 10 * self.bit_ticks + 3
+
+    @property
+    def core_latency(self):
+        """Start pulse set -> done seen by the controller (v3 CRYPTO to
+        WAIT_CRYPTO exit): start edge, ROUNDS edges, done edge"""
+        return self.rounds + 2
+
+
+class Result:
+    def __init__(self, design, window):
+        self.design = design
+        self.window = window
+        self.blocks = 0
+        self.elapsed = 0.0
+        self.latencies = []     # Seconds from submit to last response byte
+        self.dropped_bytes = 0  # Bytes the controller never saw
+        self.overflow = False   # RX FIFO was full when a byte arrived
+        self.timeouts = 0       # Frames whose response never came back
+
+    @property
+    def blocks_per_s(self):
+        return self.blocks / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_s(self):
+        """Payload bytes/s (blocks/s times the design's block size)"""
+        return self.blocks_per_s * self.design.block_bytes
+
+    def percentile(self, p):
+        """Latency percentile in seconds (nearest rank)"""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
+
+    def __repr__(self):
+        return (f"Result({self.blocks_per_s:.0f} blocks/s, p50={self.percentile(50)*1e3:.2f} ms, "
+                f"p99={self.percentile(99)*1e3:.2f} ms, dropped={self.dropped_bytes}, "
+                f"timeouts={self.timeouts})")
+
+
+# ============================================================================
+# FPGA side
+# ============================================================================
+
+class _Fpga:
+    """Edge-exact model of one top level, fed bytes in wire order"""
+
+    def __init__(self, design, result):
+        self.d = design
+        self.result = result
+
+        # Controller RX state machine
+        self.accept_after = 0  # Controller takes a byte at any edge > this
+        self.command = None    # Frame being received, None in IDLE
+        self.count = 0
+        self.keys_loaded = False
+
+        # RX FIFO
+        self.rx_pops = deque()  # Pop edges of bytes still queued
+        self.last_pop = -2
+
+        # TX side
+        self.tx_pops = deque()
+        self.uart_ready = 0     # Edge from which the TX FIFO may pop into uart_tx
+        self.tx_idle = 0        # Lanes controller: TX_IDLE entered at this edge
+
+        # Lanes
+        self.lane_free = [0] * design.lanes  # Edge each lane's result was collected
+        self.next_lane = 0
+        self.computing_until = 0
+
+        self.responses = []  # Edge at which each response block has left the wire
+
+    def rx(self, start, kind):
+        """A byte whose start bit begins at `start` (fractional cycles)"""
+        d = self.d
+        valid = math.floor(start) + 1 + d.rx_latency  # Edge that sees data_valid
+
+        if not d.fifo_depth:
+            if valid > self.accept_after:
+                self._consume(valid, kind)
+            else:
+                self.result.dropped_bytes += 1
+            return
+
+        # RX FIFO: pop only while the controller can take the byte, at most
+        # one pop every two edges; the controller sees it the edge after
+        while self.rx_pops and self.rx_pops[0] < valid:
+            self.rx_pops.popleft()
+        if len(self.rx_pops) >= d.fifo_depth:
+            self.result.dropped_bytes += 1
+            self.result.overflow = True
+            return
+        pop = max(valid + 1, self.accept_after + 1, self.last_pop + 2)
+        self.rx_pops.append(pop)
+        self.last_pop = pop
+        self._consume(pop + 1, kind)
+
+    def _consume(self, c, kind):
+        if self.d.controller == 'v3':
+            self._consume_v3(c, kind)
+        else:
+            self._consume_lanes(c, kind)
+
+    def _consume_v3(self, c, kind):
+        if self.command is None:
+            if kind == 'K' or (kind in ('E', 'D') and self.keys_loaded):
+                self.command = kind
+                self.count = 0
+                self.accept_after = c + 1  # RX_COMMAND, then RX_BYTES
+            else:
+                self.accept_after = c + 2  # RX_COMMAND, DONE_STATE, IDLE
+            return
+
+        self.count += 1
+        if self.count < (16 if self.command == 'K' else self.d.block_bytes):
+            self.accept_after = c
+            return
+
+        if self.command == 'K':
+            # KEY_SCHEDULE, key schedule start + ROUNDS, WAIT_KEY, DONE_STATE
+            self.keys_loaded = True
+            self.accept_after = c + self.d.core_latency + 2
+        else:
+            # CRYPTO, core, WAIT_CRYPTO -> TX_BYTES sends at the next edge
+            done = self._transmit(c + self.d.core_latency + 2)
+            self.accept_after = done + 1  # DONE_STATE -> IDLE
+        self.command = None
+
+    def _consume_lanes(self, c, kind):
+        d = self.d
+        if self.command is None:
+            if kind == 'K' or (kind in ('E', 'D') and self.keys_loaded):
+                self.command = kind
+                self.count = 0
+            self.accept_after = c  # No RX_COMMAND state; unknown bytes ignored
+            return
+
+        self.count += 1
+        if self.count < (16 if self.command == 'K' else 8):
+            self.accept_after = c
+            return
+
+        if self.command == 'K':
+            # KEY_DRAIN until no lane computes, KEY_SCHEDULE, WAIT_KEY
+            drained = max(c + 1, self.computing_until + 1)
+            self.keys_loaded = True
+            self.accept_after = drained + d.core_latency + 1
+        else:
+            # PUSH_BLOCK until the next lane in rotation is free
+            lane = self.next_lane
+            self.next_lane = (lane + 1) % d.lanes
+            dispatch = max(c + 1, self.lane_free[lane] + 1)
+            self.accept_after = dispatch
+
+            full = dispatch + d.rounds + 2       # Lane captures the result
+            self.computing_until = max(self.computing_until, full)
+            collect = max(full + 1, self.tx_idle + 1)
+            self.lane_free[lane] = collect
+            self.tx_idle = self._transmit(collect + 1)
+        self.command = None
+
+    def _transmit(self, first_send):
+        """Send one result block, the first byte at edge `first_send`
+        (TX_BYTES). Returns the edge at which the controller's TX path is
+        done."""
+        d = self.d
+        if not d.fifo_depth:
+            # TX_BYTES/WAIT_TX straight into uart_tx
+            start = first_send + 1
+            for _ in range(d.block_bytes - 1):
+                start += d.tx_byte_period
+            self.responses.append(start + 1 + 10 * d.bit_ticks)
+            return start + 10 * d.bit_ticks + 2
+
+        # TX FIFO: one write every 3 edges (valid, ack, next send) unless full
+        write = first_send + 1
+        for n in range(d.block_bytes):
+            if n:
+                write += 3
+            while self.tx_pops and self.tx_pops[0] < write:
+                self.tx_pops.popleft()
+            if len(self.tx_pops) >= d.fifo_depth:
+                write = self.tx_pops.popleft() + 3  # busy held while full
+            pop = max(write + 1, self.uart_ready)
+            self.tx_pops.append(pop)
+            start = pop + 1                      # uart_tx sees data_valid
+            self.uart_ready = start + 10 * d.bit_ticks + 2
+        self.responses.append(start + 1 + 10 * d.bit_ticks)
+        return write + 2
+
+
+# ============================================================================
+# Host side
+# ============================================================================
+
+def simulate(design, trace, window=1):
+    """Run a workload trace through the design
+
+    trace:  (submit_time_s, command) pairs in submit order, command one of
+            'K', 'E', 'D' (payload values do not affect timing)
+    window: 'E'/'D' frames the host keeps in flight (1 on v3 without FIFOs)
+    """
+    d = design
+    result = Result(design, window)
+    fpga = _Fpga(design, result)
+    clk = d.clk_freq
+    byte_time = 10 * clk / d.host_baud  # Host sends frames with no gaps
+    timeout = TIMEOUT * clk
+
+    line_free = 0.0
+    sent = []          # (submit, send_end) of every 'E'/'D' frame
+    outstanding = deque()
+    first = None
+
+    def completion(n):
+        if n < len(fpga.responses):
+            return fpga.responses[n]
+        result.timeouts += 1
+        return sent[n][1] + timeout
+
+    for submit, command in trace:
+        submit_cycles = submit * clk
+        if first is None:
+            first = submit_cycles
+        start = max(submit_cycles, line_free)
+        if command != 'K':
+            if len(outstanding) >= window:
+                start = max(start, completion(outstanding.popleft()))
+            outstanding.append(len(sent))
+
+        frame_bytes = 17 if command == 'K' else d.block_bytes + 1
+        fpga.rx(start, command)
+        for i in range(1, frame_bytes):
+            fpga.rx(start + i * byte_time, None)
+        line_free = start + frame_bytes * byte_time
+        if command != 'K':
+            sent.append((submit_cycles, line_free))
+
+    end = line_free
+    for n, (submit_cycles, _) in enumerate(sent):
+        done = completion(n)
+        result.latencies.append((done - submit_cycles) / clk)
+        end = max(end, done)
+    result.blocks = len(sent)
+    result.elapsed = (end - first) / clk if sent else 0.0
+    return result
+
+
+def bulk_trace(num_blocks, command='E'):
+    """Key load, then num_blocks blocks all submitted at t=0"""
+    return [(0.0, 'K')] + [(0.0, command)] * num_blocks
+
+
+def poisson_trace(rate, num_blocks, seed=None):
+    """Key load, then blocks arriving at `rate` per second (random gaps)"""
+    import random
+    rng = random.Random(seed)
+    trace = [(0.0, 'K')]
+    t = 0.0
+    for _ in range(num_blocks):
+        t += rng.expovariate(rate)
+        trace.append((t, 'E'))
+    return trace
+
+
+def lanes_engine_cycles(lanes, num_blocks, rounds=27):
+    """Cycles speck_lanes needs for num_blocks back-to-back blocks with an
+    always-ready consumer, first dispatch to last result inclusive (as
+    tb_speck_lanes counts them)"""
+    lane_free = [-1] * lanes
+    dispatch = -1
+    collect = -1
+    first = None
+    for i in range(num_blocks):
+        lane = i % lanes
+        dispatch = max(dispatch + 1, lane_free[lane] + 1)
+        if first is None:
+            first = dispatch
+        collect = max(dispatch + rounds + 3, collect + 1)
+        lane_free[lane] = collect
+    return collect - first + 1
+
+
+# ============================================================================
+# Design-space table
+# ============================================================================
+
+def main():
+    num_blocks = 2000
+    designs = [
+        (Design(), 1),
+        (Design(fifo_depth=2048), 16),
+        (Design(lanes=4), 4),
+        (Design(lanes=4, fifo_depth=2048), 16),
+        (Design(baud=921600), 1),
+        (Design(baud=921600, fifo_depth=2048), 16),
+        (Design(baud=3_000_000, lanes=4, fifo_depth=2048), 16),
+    ]
+
+    print("="*86)
+    print(f"SPECK64/128 Datapath Model - {num_blocks} blocks, bulk encrypt")
+    print("="*86)
+    print(f"  {'controller':<10} {'lanes':>5} {'fifo':>5} {'baud':>8} {'window':>6}"
+          f" {'blocks/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'dropped':>8}")
+    for design, window in designs:
+        r = simulate(design, bulk_trace(num_blocks), window)
+        print(f"  {design.controller:<10} {design.lanes:>5} {design.fifo_depth:>5} {design.baud:>8}"
+              f" {window:>6} {r.blocks_per_s:>10.0f} {r.percentile(50)*1e3:>8.2f}"
+              f" {r.percentile(99)*1e3:>8.2f} {r.dropped_bytes:>8}")
+
+    print(f"\n  Lane engine alone (tb_speck_lanes, 256 blocks):")
+    for lanes in (1, 2, 4, 8, 16, 32):
+        cycles = lanes_engine_cycles(lanes, 256)
+        print(f"    LANES={lanes:<3} {256/cycles:.3f} blocks/cycle")
+    print("="*86)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+SPECK64/128 FPGA Crypto Daemon
+Owns the COM port and serves encrypt/decrypt requests from many local
+clients over a Unix-domain socket. Concurrent requests are coalesced into
+pipelined device batches, grouped by key to minimize 'K' reloads.
+
+Wire format (little-endian):
+  request:  op 'E'/'D' (1) + key (16) + num_blocks (u32) + num_blocks * 8 bytes
+  response: status (u8, 0 = ok) + length (u32) + length bytes
+            (result blocks on success, UTF-8 error message otherwise)
+
+Requests over max_request_blocks get an error response and the connection
+is closed without reading the payload.
+"""
+
+import argparse
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+SOCKET_PATH = "/tmp/speck_fpga.sock"
+
+REQUEST = struct.Struct('<c16sI')
+RESPONSE = struct.Struct('<BI')
+STATUS_OK = 0
+STATUS_ERROR = 1
+MAX_REQUEST_BLOCKS = 1 << 20  # 8 MiB of data per request
+
+
+def _recv_exact(sock, n):
+    """Read exactly n bytes, or None if the peer closed the connection"""
+    buf = bytearray(n)
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        r = sock.recv_into(view[got:])
+        if r == 0:
+            return None
+        got += r
+    return bytes(buf)
+
+
+def _socket_in_use(path):
+    """True if something is accepting connections on the Unix socket at path"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return True
+    except ConnectionRefusedError:
+        return False  # Stale socket file left by a daemon that died
+    finally:
+        sock.close()
+
+
+class _Job:
+    def __init__(self, op, key, data):
+        self.op = op
+        self.key = key
+        self.data = data
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        daemon = self.server.speck_daemon
+        while True:
+            header = _recv_exact(self.request, REQUEST.size)
+            if header is None:
+                return
+            op, key, num_blocks = REQUEST.unpack(header)
+            if num_blocks > daemon.max_request_blocks:
+                # The payload is never read, so the stream can't be resynced
+                msg = (f"Request of {num_blocks} blocks exceeds the "
+                       f"{daemon.max_request_blocks}-block limit").encode('utf-8')
+                self.request.sendall(RESPONSE.pack(STATUS_ERROR, len(msg)) + msg)
+                return
+            data = _recv_exact(self.request, num_blocks * 8) if num_blocks else b''
+            if data is None:
+                return
+
+            job = daemon.submit(op, key, data)
+            job.done.wait()
+
+            if job.error is not None:
+                msg = job.error.encode('utf-8')
+                self.request.sendall(RESPONSE.pack(STATUS_ERROR, len(msg)) + msg)
+            else:
+                self.request.sendall(RESPONSE.pack(STATUS_OK, len(job.result)) + job.result)
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class SPECKDaemon:
+    def __init__(self, crypto, socket_path=SOCKET_PATH, window=1,
+                 linger=0.002, max_batch_blocks=4096, max_request_blocks=MAX_REQUEST_BLOCKS):
+        """Serve `crypto` (a connected SPECKCrypto) on a Unix socket
+
+        window:             frames in flight per device batch (see process_blocks)
+        linger:             seconds to wait for more requests before a batch runs
+        max_batch_blocks:   cap on blocks coalesced into one batch
+        max_request_blocks: largest request accepted from a client
+        """
+        if getattr(crypto, 'block_size', 8) != 8:
+            raise Exception(f"SPECKDaemon supports 8-byte SPECK64/128 blocks only, "
+                            f"got a {crypto.block_size}-byte SPECKCrypto")
+        self.crypto = crypto
+        self.socket_path = socket_path
+        self.window = window
+        self.linger = linger
+        self.max_batch_blocks = max_batch_blocks
+        self.max_request_blocks = max_request_blocks
+
+        self.current_key = None
+        self.stats = {'requests': 0, 'blocks': 0, 'batches': 0, 'key_loads': 0}
+
+        self._queue = queue.Queue()
+        self._running = False
+        self._server = None
+        self._batcher = None
+
+    def submit(self, op, key, data):
+        """Queue a request for the next device batch"""
+        job = _Job(op, key, data)
+        if op not in (b'E', b'D'):
+            job.error = f"Unknown operation {op!r}"
+            job.done.set()
+        else:
+            self._queue.put(job)
+        return job
+
+    def start(self):
+        """Bind the socket and start serving in background threads"""
+        if os.path.exists(self.socket_path):
+            if _socket_in_use(self.socket_path):
+                raise Exception(f"Another daemon is already serving on {self.socket_path}")
+            os.unlink(self.socket_path)
+        self._server = _Server(self.socket_path, _Handler)
+        self._server.speck_daemon = self
+
+        self._running = True
+        self._batcher = threading.Thread(target=self._batch_loop, daemon=True)
+        self._batcher.start()
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        """Stop serving and remove the socket"""
+        self._running = False
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._batcher:
+            self._batcher.join()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    # ========================================================================
+    # Batching
+    # ========================================================================
+
+    def _collect(self):
+        """Block for one request, then gather more for up to `linger` seconds"""
+        try:
+            jobs = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+
+        blocks = len(jobs[0].data) // 8
+        deadline = time.perf_counter() + self.linger
+        while blocks < self.max_batch_blocks:
+            remaining = deadline - time.perf_counter()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            jobs.append(job)
+            blocks += len(job.data) // 8
+        return jobs
+
+    def _batch_loop(self):
+        while self._running:
+            jobs = self._collect()
+            if jobs:
+                self._run_batch(jobs)
+
+    def _run_batch(self, jobs):
+        # Group by key; the key already on the device goes first
+        groups = {}
+        for job in jobs:
+            groups.setdefault(job.key, []).append(job)
+        keys = sorted(groups, key=lambda k: k != self.current_key)
+
+        self.stats['batches'] += 1
+        for key in keys:
+            group = groups[key]
+            try:
+                if key != self.current_key:
+                    self.current_key = None
+                    self.crypto.load_key_bytes(key)
+                    self.current_key = key
+                    self.stats['key_loads'] += 1
+
+                for op in (b'E', b'D'):
+                    op_jobs = [j for j in group if j.op == op]
+                    if not op_jobs:
+                        continue
+                    out = self.crypto.process_blocks(
+                        op, b''.join(j.data for j in op_jobs), window=self.window)
+
+                    # Split the batch result back per request
+                    offset = 0
+                    for j in op_jobs:
+                        j.result = out[offset:offset + len(j.data)]
+                        offset += len(j.data)
+
+            except Exception as e:
+                # Device state is unknown after a failure; force a key reload
+                self.current_key = None
+                for j in group:
+                    if j.result is None:
+                        j.error = str(e)
+
+            for j in group:
+                self.stats['requests'] += 1
+                self.stats['blocks'] += len(j.data) // 8
+                j.done.set()
+
+
+class SPECKDaemonClient:
+    def __init__(self, socket_path=SOCKET_PATH):
+        """Connect to a running SPECKDaemon"""
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socket_path)
+
+    def close(self):
+        """Close the connection"""
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _request(self, op, key, data):
+        if len(key) != 16:
+            raise Exception(f"Key must be 16 bytes, got {len(key)}")
+        if len(data) % 8 != 0:
+            raise Exception(f"Data must be multiple of 8 bytes, got {len(data)}")
+
+        self.sock.sendall(REQUEST.pack(op, bytes(key), len(data) // 8) + bytes(data))
+
+        header = _recv_exact(self.sock, RESPONSE.size)
+        if header is None:
+            raise Exception("Daemon closed the connection")
+        status, length = RESPONSE.unpack(header)
+        payload = _recv_exact(self.sock, length) if length else b''
+        if payload is None:
+            raise Exception("Daemon closed the connection")
+
+        if status != STATUS_OK:
+            raise Exception(payload.decode('utf-8'))
+        return payload
+
+    def encrypt_blocks(self, key, data):
+        """Encrypt raw 8-byte blocks under a 16-byte key"""
+        return self._request(b'E', key, data)
+
+    def decrypt_blocks(self, key, data):
+        """Decrypt raw 8-byte blocks under a 16-byte key"""
+        return self._request(b'D', key, data)
+
+
+def main():
+    from speck_tool_final import SPECKCrypto
+
+    parser = argparse.ArgumentParser(description="SPECK64/128 FPGA crypto daemon")
+    parser.add_argument('--port', default="COM10", help="serial port of the FPGA")
+    parser.add_argument('--socket', default=SOCKET_PATH, help="Unix socket path")
+    parser.add_argument('--window', type=int, default=1,
+                        help="frames in flight (1 for the v3 bitstream)")
+    args = parser.parse_args()
+
+    print(f"  Connecting to FPGA on {args.port}...")
+    crypto = SPECKCrypto(args.port)
+    daemon = SPECKDaemon(crypto, args.socket, window=args.window)
+    try:
+        daemon.start()
+    except Exception as e:
+        crypto.close()
+        print(f"  ❌ {e}")
+        return
+    print(f"  ✓ Serving on {args.socket} (Ctrl+C to stop)")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+        crypto.close()
+        s = daemon.stats
+        print(f"\n  Requests: {s['requests']}  Blocks: {s['blocks']}  "
+              f"Batches: {s['batches']}  Key loads: {s['key_loads']}")
+        print("  ✓ Daemon stopped\n")
+
+
+if __name__ == "__main__":
+    main()
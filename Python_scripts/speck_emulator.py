@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+SPECK64/128 FPGA Emulator
+Speaks the speck_uart_controller_v3 protocol on a pseudo-terminal so the
+host tools can be exercised without a Basys 3 board (Linux/macOS only).
+block_size=16 emulates the SPECK128/128 build (W=64, ROUNDS=32)
+"""
+
+import os
+import pty
+import select
+import threading
+import time
+import tty
+from collections import deque
+
+import speck_model
+import speck_stats
+
+USB_PACKET = 62  # FTDI full-speed payload per bulk packet (64 minus 2 status bytes)
+
+
+class SPECKEmulator:
+    def __init__(self, baud=None, latency_timer=None, block_size=8):
+        """Create the pty pair and start the emulated controller
+
+        baud:          if set, bytes are consumed no faster than a real 8N1
+                       UART at this rate (10 bit times per byte), and each
+                       response reaches the host only after its own wire
+                       time on the TX line
+        latency_timer: if set (seconds), model the FTDI bridge: responses are
+                       held until a 62-byte USB packet fills or the timer
+                       expires (the FT2232 default is 0.016)
+        block_size:    'E'/'D' frame payload, 8 (SPECK64) or 16 (SPECK128)
+        """
+        if block_size not in speck_model.VARIANTS:
+            raise Exception(f"Block size must be 8 or 16 bytes, got {block_size}")
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.slave)
+        os.set_blocking(self.master, False)
+        self.port = os.ttyname(self.slave)
+        self.baud = baud
+        self.latency_timer = latency_timer
+        self.block_size = block_size
+
+        # Controller state (mirrors speck_uart_controller_v3)
+        self.command = None
+        self.rx_buffer = bytearray()
+        self.round_keys = None
+        self.shadow_keys = None  # Prefetched with 'P', swapped in by 'S'
+        self.tx_pending = bytearray()
+        self._tx_since = None  # When the oldest unsent response byte arrived
+        self._tx_wire = deque()  # (time fully sent, bytes) still on the TX line
+        self._tx_line = 0.0      # When the TX line is next free
+
+        # Counters
+        self.key_loads = 0
+        self.key_prefetches = 0
+        self.key_swaps = 0
+        self.blocks_encrypted = 0
+        self.blocks_decrypted = 0
+        self.unknown_commands = 0
+
+        # Performance counters for 'Q'. Event counts are exact; state cycles
+        # are wall time at CLK_FREQ split between IDLE and RX_BYTES, minus
+        # the fixed per-command costs the RTL spends in the other states.
+        self.state_cycles = [0] * len(speck_stats.STATE_NAMES)
+        self._perf_clock = time.perf_counter()  # Wall time accounted up to here
+        self._perf_debt = 0                     # Modeled cycles still to take out of it
+        self._perf_base = [0] * speck_stats.NUM_COUNTERS  # Counters at the last 'R'
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop the emulator and release the pty"""
+        self._running = False
+        self._thread.join()
+        os.close(self.master)
+        os.close(self.slave)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ========================================================================
+    # Protocol
+    # ========================================================================
+
+    def _rx_byte(self, b, t=None):
+        """Feed one received byte into the controller state machine
+        (t: when its stop bit ended, for the cycle counters; default now)"""
+        self._account(t)
+        if self.command is None:
+            self._spend('RX_COMMAND', 1)
+            if b == 0x52:  # 'R' - UART reset
+                self.round_keys = None
+                self.shadow_keys = None
+                self.state_cycles = [0] * len(self.state_cycles)
+                self._perf_debt = 0
+                self._perf_base = self._counters()
+            elif b == 0x53 and self.shadow_keys is not None:  # 'S' - swap
+                self.round_keys = self.shadow_keys
+                self.shadow_keys = None
+                self.key_swaps += 1
+                self._spend('DONE_STATE', 1)
+            elif b == 0x51:  # 'Q' - performance counters
+                current = speck_stats.DeviceStats(self._counters())
+                self._send((current - speck_stats.DeviceStats(self._perf_base)).to_bytes())
+                self._spend_tx(speck_stats.RECORD_SIZE)
+            elif b in (0x4B, 0x50) or (b in (0x45, 0x44) and self.round_keys is not None):
+                self.command = b
+                self.rx_buffer.clear()
+            else:
+                # Unknown command, or E/D before a key: controller drops it
+                self.unknown_commands += 1
+                self._spend('DONE_STATE', 1)
+            return
+
+        self.rx_buffer.append(b)
+        target = 16 if self.command in (0x4B, 0x50) else self.block_size
+        if len(self.rx_buffer) < target:
+            return
+
+        data = bytes(self.rx_buffer)
+        if self.command == 0x4B:
+            self.round_keys = speck_model.key_schedule(data, self.block_size)
+            self.shadow_keys = None
+            self.key_loads += 1
+            self._spend('KEY_SCHEDULE', 1)
+            self._spend('WAIT_KEY', len(self.round_keys) + 1)
+        elif self.command == 0x50:
+            self.shadow_keys = speck_model.key_schedule(data, self.block_size)
+            self.key_prefetches += 1
+            self._spend('PREFETCH', 1)
+        elif self.command == 0x45:
+            self._send(self._result(
+                'E', data, speck_model.encrypt_block(data, self.round_keys)))
+            self.blocks_encrypted += 1
+            self._spend_crypto()
+        else:
+            self._send(self._result(
+                'D', data, speck_model.decrypt_block(data, self.round_keys)))
+            self.blocks_decrypted += 1
+            self._spend_crypto()
+        self._spend('DONE_STATE', 1)
+        self.command = None
+
+    # ========================================================================
+    # Performance counters
+    # ========================================================================
+
+    def _counters(self):
+        """Raw counters in 'Q' record order"""
+        return self.state_cycles + [
+            self.blocks_encrypted, self.blocks_decrypted, self.key_loads,
+            self.key_prefetches, self.key_swaps, self.unknown_commands, 0]
+
+    def _account(self, now=None):
+        """Charge wall time since the last byte to IDLE or RX_BYTES"""
+        if now is None:
+            now = time.perf_counter()
+        cycles = max(0, int((now - self._perf_clock) * speck_stats.CLK_FREQ))
+        self._perf_clock += cycles / speck_stats.CLK_FREQ
+        taken = min(cycles, self._perf_debt)
+        self._perf_debt -= taken
+        state = 'IDLE' if self.command is None else 'RX_BYTES'
+        self.state_cycles[speck_stats.STATE_NAMES.index(state)] += cycles - taken
+
+    def _spend(self, state, cycles):
+        """Modeled cycles in a state the emulator passes through instantly"""
+        self.state_cycles[speck_stats.STATE_NAMES.index(state)] += cycles
+        self._perf_debt += cycles
+
+    def _spend_crypto(self):
+        # CRYPTO: load + wait for done to clear; WAIT_CRYPTO: ROUNDS + done
+        self._spend('CRYPTO', 2)
+        self._spend('WAIT_CRYPTO', len(self.round_keys) + 1)
+        self._spend_tx(self.block_size)
+
+    def _spend_tx(self, count):
+        """TX_BYTES waits out each byte on the wire (at `baud` if set, else
+        a pty that never backs up), WAIT_TX is the busy handshake"""
+        per_byte = 10 * speck_stats.CLK_FREQ // self.baud if self.baud else 1
+        self._spend('TX_BYTES', count * (per_byte + 1))
+        self._spend('WAIT_TX', count)
+
+    def _send(self, data):
+        """Queue response bytes for the host (after their wire time if baud
+        is set)"""
+        now = time.perf_counter()
+        if self.baud:
+            self._tx_line = max(self._tx_line, now) + len(data) * 10 / self.baud
+            self._tx_wire.append((self._tx_line, bytes(data)))
+        else:
+            self._release(data, now)
+
+    def _release(self, data, now):
+        """Response bytes have left the UART and reach the USB bridge"""
+        if not self.tx_pending:
+            self._tx_since = now
+        self.tx_pending += data
+
+    def _result(self, op, block, result):
+        """Hook for subclasses to alter the block sent back"""
+        return result
+
+    def _run(self):
+        rx_clock = time.perf_counter()
+        while self._running:
+            timeout = 0.05
+            now = time.perf_counter()
+            while self._tx_wire and self._tx_wire[0][0] <= now:
+                self._release(self._tx_wire.popleft()[1], now)
+            if self._tx_wire:
+                timeout = min(timeout, self._tx_wire[0][0] - now)
+
+            flush = bool(self.tx_pending)
+            if flush and self.latency_timer:
+                held = time.perf_counter() - self._tx_since
+                if len(self.tx_pending) < USB_PACKET and held < self.latency_timer:
+                    flush = False
+                    timeout = min(timeout, self.latency_timer - held)
+
+            wlist = [self.master] if flush else []
+            readable, writable, _ = select.select([self.master], wlist, [], timeout)
+
+            if writable:
+                try:
+                    n = os.write(self.master, self.tx_pending)
+                    del self.tx_pending[:n]
+                    self._tx_since = time.perf_counter()
+                except BlockingIOError:
+                    pass
+
+            if readable:
+                try:
+                    data = os.read(self.master, 64 if self.baud else 4096)
+                except (BlockingIOError, OSError):
+                    continue
+
+                # Throttle to the wire rate of a real UART
+                if self.baud:
+                    byte_time = 10 / self.baud
+                    first = max(rx_clock, time.perf_counter())
+                    rx_clock = first + len(data) * byte_time
+                    delay = rx_clock - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    for i, b in enumerate(data):
+                        self._rx_byte(b, first + (i + 1) * byte_time)
+                else:
+                    for b in data:
+                        self._rx_byte(b)
@@ -5,13 +5,109 @@ Clean, stable, everything visible
 """
 
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
+from tkinter import ttk, scrolledtext, messagebox, filedialog
 import sys
 import os
 
 # Import the crypto backend
 sys.path.insert(0, os.path.dirname(__file__))
-from speck_tool_final import SPECKCrypto
+from speck_tool_final import SPECKCrypto, pkcs7_pad, pkcs7_unpad
+from speck_hexview import ResultBuffer
+
+CHUNK_BLOCKS = 256  # Blocks per device pass between result pane refreshes
+
+
+class ResultView:
+    """Result pane that draws only the visible rows of a ResultBuffer, so
+    refreshing it costs the same for 8 bytes or 8 MB"""
+
+    def __init__(self, parent, rows, colors, **text_options):
+        self.rows = rows
+        self.colors = colors
+        self.buffer = None
+        self.first = 0       # Top visible line
+        self.follow = True   # Keep the newest lines in view while appending
+
+        self.frame = tk.Frame(parent, bg=text_options.get('bg'))
+        self.scrollbar = tk.Scrollbar(self.frame, command=self._on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text = tk.Text(self.frame, height=rows, wrap=tk.NONE, **text_options)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.text.tag_config("center", justify='center')
+        self.text.bind("<MouseWheel>", self._on_wheel)
+        self.text.bind("<Button-4>", self._on_wheel)
+        self.text.bind("<Button-5>", self._on_wheel)
+
+        self.info = tk.Label(parent, text="", font=('Segoe UI', 8, 'italic'),
+                             bg=parent.cget('bg'), fg=colors['success'])
+
+    def pack(self, **options):
+        self.frame.pack(**options)
+        self.info.pack()
+
+    def show_message(self, message, fg, bg='#f1f5f9'):
+        """Show a fixed message (placeholder, progress, error)"""
+        self.buffer = None
+        self.info.config(text="")
+        self._draw(message, fg, bg)
+        self.scrollbar.set(0, 1)
+
+    def show(self, buffer):
+        """Display `buffer`, following its end as it grows"""
+        self.buffer = buffer
+        self.first = 0
+        self.follow = True
+        self.info.config(text="")
+        self.refresh()
+
+    def set_info(self, message, fg):
+        self.info.config(text=message, fg=fg)
+
+    def refresh(self):
+        """Redraw the visible rows (call after appending to the buffer)"""
+        if self.buffer is None:
+            return
+        total = self.buffer.num_lines
+        if self.follow:
+            self.first = max(0, total - self.rows)
+        self._draw('\n'.join(self.buffer.lines(self.first, self.rows)),
+                   self.colors['text_dark'])
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.rows) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_to(self, first):
+        if self.buffer is None:
+            return
+        last_page = max(0, self.buffer.num_lines - self.rows)
+        self.first = max(0, min(first, last_page))
+        self.follow = self.first == last_page
+        self.refresh()
+
+    def _draw(self, content, fg, bg=None):
+        self.text.config(state=tk.NORMAL, fg=fg)
+        if bg:
+            self.text.config(bg=bg)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", content, "center")
+        self.text.config(state=tk.DISABLED)
+
+    def _on_scroll(self, action, amount, unit=None):
+        if self.buffer is None:
+            return
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * self.buffer.num_lines))
+        else:
+            step = self.rows if unit == 'pages' else 1
+            self.scroll_to(self.first + int(amount) * step)
+
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self.scroll_to(self.first - 3)
+        else:
+            self.scroll_to(self.first + 3)
+        return "break"
 
 
 class ModernCryptoGUI:
@@ -45,11 +141,11 @@ class ModernCryptoGUI:
             self.connected = False
             self.error_msg = str(e)
         
+        # Store raw result (whole output, rendered on demand by the view)
+        self.result = None
+        
         # Create UI
         self.create_ui()
-        
-        # Store raw result
-        self.raw_result = ""
     
     def create_ui(self):
         """Create UI with perfect spacing"""
@@ -233,25 +329,25 @@ class ModernCryptoGUI:
                 fg=self.colors['text_dark'],
                 bg='white').pack(anchor=tk.W, padx=15, pady=(8, 5))
         
-        self.output_text = scrolledtext.ScrolledText(output_card,
-                                                     height=6,  # Reasonable size
-                                                     font=('Consolas', 9),
-                                                     bg='#f1f5f9',
-                                                     fg=self.colors['text_dark'],
-                                                     relief=tk.FLAT,
-                                                     padx=12,
-                                                     pady=10,
-                                                     wrap=tk.WORD)
-        self.output_text.pack(fill=tk.X, padx=15, pady=(0, 8))
+        self.output_view = ResultView(output_card,
+                                      rows=6,  # Reasonable size
+                                      colors=self.colors,
+                                      font=('Consolas', 9),
+                                      bg='#f1f5f9',
+                                      relief=tk.FLAT,
+                                      padx=12,
+                                      pady=10)
+        self.output_view.pack(fill=tk.X, padx=15, pady=(0, 4))
         
         # Placeholder
-        self.output_text.insert("1.0", "Results will appear here...\n\n✨ Ready for encryption")
-        self.output_text.tag_add("center", "1.0", tk.END)
-        self.output_text.tag_config("center", justify='center', foreground=self.colors['text_light'])
-        self.output_text.config(state=tk.DISABLED)
+        self.output_view.show_message("Results will appear here...\n\n✨ Ready for encryption",
+                                      self.colors['text_light'])
+        
+        # Copy / Save Buttons (inside output card)
+        result_buttons = tk.Frame(output_card, bg='white')
+        result_buttons.pack(pady=(0, 10))
         
-        # Copy Button (inside output card)
-        self.copy_button = tk.Button(output_card,
+        self.copy_button = tk.Button(result_buttons,
                                      text="📋 Copy Result",
                                      command=self.copy_result,
                                      font=('Segoe UI', 9, 'bold'),
@@ -263,7 +359,21 @@ class ModernCryptoGUI:
                                      pady=6,
                                      cursor='hand2',
                                      state=tk.DISABLED)
-        self.copy_button.pack(pady=(0, 10))
+        self.copy_button.pack(side=tk.LEFT, padx=5)
+        
+        self.save_button = tk.Button(result_buttons,
+                                     text="💾 Save Result",
+                                     command=self.save_result,
+                                     font=('Segoe UI', 9, 'bold'),
+                                     bg=self.colors['bg_main'],
+                                     fg=self.colors['text_dark'],
+                                     activebackground=self.colors['border'],
+                                     relief=tk.FLAT,
+                                     padx=15,
+                                     pady=6,
+                                     cursor='hand2',
+                                     state=tk.DISABLED)
+        self.save_button.pack(side=tk.LEFT, padx=5)
         
         # ====================================================================
         # TIP (40px)
@@ -306,23 +416,14 @@ class ModernCryptoGUI:
                                    font=('Segoe UI', 10))
             self.input_label.config(text="Enter ciphertext (hex format):")
     
-    def _format_hex(self, hex_string):
-        """Format hex for display"""
-        chunks = [hex_string[i:i+16] for i in range(0, len(hex_string), 16)]
-        formatted = []
-        for chunk in chunks:
-            spaced = ' '.join([chunk[i:i+2] for i in range(0, len(chunk), 2)])
-            formatted.append(spaced)
-        return '\n'.join(formatted)
-    
     def copy_result(self):
         """Copy result to clipboard"""
-        if not self.raw_result:
+        if not self.result:
             messagebox.showwarning("Nothing to Copy", "No result available!")
             return
         
         self.root.clipboard_clear()
-        self.root.clipboard_append(self.raw_result)
+        self.root.clipboard_append(self.result.copy_text())
         
         # Feedback
         self.copy_button.config(text="✓ Copied!", 
@@ -333,6 +434,27 @@ class ModernCryptoGUI:
             bg=self.colors['bg_main'],
             fg=self.colors['text_dark']))
     
+    def save_result(self):
+        """Save the raw result bytes to a file"""
+        if not self.result:
+            messagebox.showwarning("Nothing to Save", "No result available!")
+            return
+        
+        path = filedialog.asksaveasfilename(
+            title="Save Result",
+            defaultextension=".bin" if not self.result.text else ".txt")
+        if path:
+            self.result.save(path)
+    
+    def _run_blocks(self, command, data):
+        """Run data through the FPGA in chunks, appending each chunk's
+        result to self.result and redrawing only the visible rows"""
+        chunk = CHUNK_BLOCKS * 8
+        for offset in range(0, len(data), chunk):
+            self.result.append(self.crypto.process_blocks(command, data[offset:offset + chunk]))
+            self.output_view.refresh()
+            self.root.update()
+    
     def execute(self):
         """Execute operation"""
         input_data = self.input_text.get("1.0", tk.END).strip()
@@ -351,14 +473,10 @@ class ModernCryptoGUI:
                                text="⏳ Processing...", 
                                bg=self.colors['text_light'])
         self.copy_button.config(state=tk.DISABLED, bg=self.colors['bg_main'])
-        self.raw_result = ""
-        
-        self.output_text.config(state=tk.NORMAL, bg='#f1f5f9')
-        self.output_text.delete("1.0", tk.END)
-        self.output_text.insert("1.0", "Processing...\nPlease wait...")
-        self.output_text.tag_add("center", "1.0", tk.END)
-        self.output_text.tag_config("center", justify='center')
-        self.output_text.config(state=tk.DISABLED)
+        self.save_button.config(state=tk.DISABLED)
+        self.result = None
+        
+        self.output_view.show_message("Processing...\nPlease wait...", self.colors['text_dark'])
         self.root.update()
         
         try:
@@ -367,71 +485,51 @@ class ModernCryptoGUI:
             
             # Execute
             if self.mode.get() == "encrypt":
-                result = self.crypto.encrypt(input_data)
-                self.raw_result = result
-                
-                self.output_text.config(state=tk.NORMAL, bg='#f1f5f9')
-                self.output_text.delete("1.0", tk.END)
+                padded = pkcs7_pad(input_data.encode('ascii'))
                 
-                formatted = self._format_hex(result)
-                self.output_text.insert("1.0", formatted)
+                self.result = ResultBuffer()
+                self.output_view.show(self.result)
+                self._run_blocks(b'E', padded)
                 
-                num_blocks = len(result) // 16
-                info = f"\n\n✓ {num_blocks} block{'s' if num_blocks > 1 else ''} encrypted"
-                self.output_text.insert(tk.END, info)
-                self.output_text.tag_add("info", f"end-{len(info)}c", tk.END)
-                self.output_text.tag_config("info", 
-                                           foreground=self.colors['success'],
-                                           font=('Segoe UI', 8, 'italic'),
-                                           justify='center')
-                
-                self.copy_button.config(state=tk.NORMAL, 
-                                       bg=self.colors['primary'],
-                                       fg='white')
+                num_blocks = len(padded) // 8
+                self.output_view.set_info(
+                    f"✓ {num_blocks} block{'s' if num_blocks > 1 else ''} encrypted",
+                    self.colors['success'])
             else:
-                result = self.crypto.decrypt(input_data)
-                self.raw_result = result
-                
-                self.output_text.config(state=tk.NORMAL, bg='#f1f5f9')
-                self.output_text.delete("1.0", tk.END)
+                ct_hex = input_data.replace(' ', '').replace('\n', '').replace('0x', '').strip()
+                if len(ct_hex) % 16 != 0:
+                    raise Exception(f"Ciphertext must be multiple of 16 hex chars")
+                ct = bytes.fromhex(ct_hex)
                 
-                self.output_text.insert("1.0", f'"{result}"')
+                self.result = ResultBuffer(text=True)
+                self.output_view.show(self.result)
+                self._run_blocks(b'D', ct)
                 
-                info = "\n\n✓ Decrypted successfully"
-                self.output_text.insert(tk.END, info)
-                self.output_text.tag_add("info", f"end-{len(info)}c", tk.END)
-                self.output_text.tag_config("info",
-                                           foreground=self.colors['success'],
-                                           font=('Segoe UI', 8, 'italic'),
-                                           justify='center')
+                # Remove PKCS#7 padding (checked on the last block only)
+                tail = pkcs7_unpad(self.result.buf[-8:])
+                self.result.truncate(len(self.result) - 8 + len(tail))
+                self.output_view.refresh()
                 
-                self.copy_button.config(state=tk.NORMAL,
-                                       bg=self.colors['primary'],
-                                       fg='white')
+                self.output_view.set_info("✓ Decrypted successfully", self.colors['success'])
             
-            self.output_text.tag_add("result", "1.0", "end-1c")
-            self.output_text.tag_config("result", 
-                                       justify='center',
-                                       foreground=self.colors['text_dark'])
+            self.copy_button.config(state=tk.NORMAL,
+                                   bg=self.colors['primary'],
+                                   fg='white')
+            self.save_button.config(state=tk.NORMAL)
             
         except Exception as e:
-            self.raw_result = ""
+            self.result = None
             self.copy_button.config(state=tk.DISABLED, bg=self.colors['bg_main'])
+            self.save_button.config(state=tk.DISABLED)
             
-            self.output_text.config(state=tk.NORMAL, bg='#fef2f2')
-            self.output_text.delete("1.0", tk.END)
-            self.output_text.insert("1.0", f"❌ Error\n\n{str(e)}")
-            self.output_text.tag_add("center", "1.0", tk.END)
-            self.output_text.tag_config("center", 
-                                       justify='center',
-                                       foreground=self.colors['danger'])
+            self.output_view.show_message(f"❌ Error\n\n{str(e)}", self.colors['danger'],
+                                          bg='#fef2f2')
             messagebox.showerror("Error", str(e))
         
         finally:
             self.exec_button.config(state=tk.NORMAL,
                                    text="🚀 Execute Operation",
                                    bg=self.colors['primary'])
-            self.output_text.config(state=tk.DISABLED)
     
     def cleanup(self):
         """Cleanup"""
@@ -0,0 +1,74 @@
+"""
+Result buffer for the GUI's virtualized output pane
+Keeps the whole result as one bytearray and renders display lines on
+demand, so the pane only ever formats the rows that are on screen:
+
+    result = ResultBuffer()            # hex, one 8-byte block per line
+    result.append(ciphertext_chunk)    # as blocks arrive
+    rows = result.lines(first, 6)      # just the visible window
+"""
+
+HEX_BYTES_PER_LINE = 8    # One SPECK block: "8b 02 4e 45 48 a5 6f 8c"
+TEXT_BYTES_PER_LINE = 48  # Fits the result pane in Consolas 9
+
+# Printable ASCII shown as-is, everything else as '.'
+_PRINTABLE = bytes(b if 0x20 <= b < 0x7f else 0x2e for b in range(256))
+
+
+class ResultBuffer:
+    def __init__(self, text=False):
+        """Empty result; text=True renders ASCII lines instead of hex"""
+        self.text = text
+        self.bytes_per_line = TEXT_BYTES_PER_LINE if text else HEX_BYTES_PER_LINE
+        self.buf = bytearray()
+
+    def __len__(self):
+        return len(self.buf)
+
+    def append(self, data):
+        """Add result bytes at the end"""
+        self.buf += data
+
+    def truncate(self, length):
+        """Drop everything after `length` bytes (e.g. PKCS#7 padding)"""
+        del self.buf[length:]
+
+    def clear(self):
+        self.buf.clear()
+
+    @property
+    def num_lines(self):
+        return -(-len(self.buf) // self.bytes_per_line)
+
+    def line(self, i):
+        """Display string for line i"""
+        n = self.bytes_per_line
+        chunk = self.buf[i*n:(i+1)*n]
+        if self.text:
+            return chunk.translate(_PRINTABLE).decode('ascii')
+        return chunk.hex(' ')
+
+    def lines(self, first, count):
+        """Display strings for lines first .. first+count-1 (clipped)"""
+        last = min(first + count, self.num_lines)
+        return [self.line(i) for i in range(max(0, first), last)]
+
+    def hex(self):
+        return self.buf.hex()
+
+    def tobytes(self):
+        return bytes(self.buf)
+
+    def copy_text(self):
+        """What 'Copy Result' puts on the clipboard: hex, or the plaintext"""
+        if not self.text:
+            return self.buf.hex()
+        try:
+            return self.buf.decode('ascii')
+        except UnicodeDecodeError:
+            return f"<non-ASCII: {self.buf.hex()}>"
+
+    def save(self, path):
+        """Write the raw result bytes to path"""
+        with open(path, 'wb') as f:
+            f.write(self.buf)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+SPECK Software Reference Model
+Bit-exact with the FPGA datapath (same key and block byte order)
+SPECK64/128 by default; pass block_size=16 to key_schedule for SPECK128/128
+(the W=64, ROUNDS=32 build). Block functions pick the variant from the
+round key count. The *_array functions are vectorized with NumPy when it
+is installed
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+W = 32
+ROUNDS = 27
+MASK = (1 << W) - 1
+
+# Block size in bytes -> (word bits, rounds), all with a 128-bit key
+VARIANTS = {8: (32, 27), 16: (64, 32)}
+
+
+def _variant(rk):
+    """(word bits, word bytes, mask) for a round key list"""
+    w = 64 if len(rk) == VARIANTS[16][1] else 32
+    return w, w // 8, (1 << w) - 1
+
+
+def _rotr(v, sh, w=W):
+    return ((v >> sh) | (v << (w - sh))) & ((1 << w) - 1)
+
+
+def _rotl(v, sh, w=W):
+    return ((v << sh) | (v >> (w - sh))) & ((1 << w) - 1)
+
+
+def key_schedule(key_bytes, block_size=8):
+    """Expand a 16-byte key into the list of round keys (speck_key_schedule.v)"""
+    if len(key_bytes) != 16:
+        raise Exception(f"Key must be 16 bytes, got {len(key_bytes)}")
+    if block_size not in VARIANTS:
+        raise Exception(f"Block size must be 8 or 16 bytes, got {block_size}")
+    w, rounds = VARIANTS[block_size]
+    wb = w // 8
+    mask = (1 << w) - 1
+
+    # Key words little-endian, same packing as SPECKCrypto.load_key
+    # (K0..K3 for SPECK64, K0..K1 for SPECK128)
+    k = int.from_bytes(key_bytes[0:wb], 'little')
+    l = [int.from_bytes(key_bytes[i:i+wb], 'little') for i in range(wb, 16, wb)]
+    m = len(l)
+
+    rk = [k]
+    for i in range(rounds - 1):
+        l.append(((_rotr(l[i], 8, w) + k) & mask) ^ i)
+        k = _rotl(k, 3, w) ^ l[i + m]
+        rk.append(k)
+    return rk
+
+
+def encrypt_block(block, rk):
+    """Encrypt one block (first half = y, second half = x)"""
+    w, wb, mask = _variant(rk)
+    y = int.from_bytes(block[0:wb], 'little')
+    x = int.from_bytes(block[wb:2*wb], 'little')
+    for k in rk:
+        x = ((_rotr(x, 8, w) + y) & mask) ^ k
+        y = _rotl(y, 3, w) ^ x
+    return y.to_bytes(wb, 'little') + x.to_bytes(wb, 'little')
+
+
+def decrypt_block(block, rk):
+    """Decrypt one block (first half = y, second half = x)"""
+    w, wb, mask = _variant(rk)
+    y = int.from_bytes(block[0:wb], 'little')
+    x = int.from_bytes(block[wb:2*wb], 'little')
+    for k in reversed(rk):
+        y = _rotr(y ^ x, 3, w)
+        x = _rotl(((x ^ k) - y) & mask, 8, w)
+    return y.to_bytes(wb, 'little') + x.to_bytes(wb, 'little')
+
+
+def encrypt_blocks(data, rk):
+    """Encrypt whole blocks one by one (ECB, like the FPGA)"""
+    n = _variant(rk)[1] * 2
+    return b''.join(encrypt_block(data[i:i+n], rk) for i in range(0, len(data), n))
+
+
+def decrypt_blocks(data, rk):
+    """Decrypt whole blocks one by one (ECB, like the FPGA)"""
+    n = _variant(rk)[1] * 2
+    return b''.join(decrypt_block(data[i:i+n], rk) for i in range(0, len(data), n))
+
+
+# ============================================================================
+# Vectorized model (whole buffers at once)
+# ============================================================================
+
+def _to_words(data, wb=4):
+    dtype = f'<u{wb}'
+    words = np.frombuffer(bytes(data), dtype=dtype).reshape(-1, 2)
+    return words[:, 1].astype(dtype[1:]), words[:, 0].astype(dtype[1:])  # x, y
+
+
+def _from_words(x, y, wb=4):
+    return np.stack([y, x], axis=1).astype(f'<u{wb}').tobytes()
+
+
+def encrypt_array(data, rk):
+    """Encrypt whole blocks; vectorized across blocks with NumPy"""
+    if np is None:
+        return encrypt_blocks(data, rk)
+    w, wb, _ = _variant(rk)
+    x, y = _to_words(data, wb)
+    kt = x.dtype.type
+    for k in rk:
+        x = ((x >> kt(8)) | (x << kt(w - 8))) + y
+        x ^= kt(k)
+        y = ((y << kt(3)) | (y >> kt(w - 3))) ^ x
+    return _from_words(x, y, wb)
+
+
+def decrypt_array(data, rk):
+    """Decrypt whole blocks; vectorized across blocks with NumPy"""
+    if np is None:
+        return decrypt_blocks(data, rk)
+    w, wb, _ = _variant(rk)
+    x, y = _to_words(data, wb)
+    kt = x.dtype.type
+    for k in reversed(rk):
+        y ^= x
+        y = (y >> kt(3)) | (y << kt(w - 3))
+        x = (x ^ kt(k)) - y
+        x = (x << kt(8)) | (x >> kt(w - 8))
+    return _from_words(x, y, wb)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+SPECK64/128 Message Packing
+Encrypts a batch of short messages with one 'K' and two pipelined device
+passes over the whole batch, instead of a 'K' and a call per message. Each
+message is terminated with a single 0x80 byte (zero-filled up to 8 bytes if
+it is shorter than that) and encrypted with ECB ciphertext stealing, so its
+ciphertext is exactly message length + 1 bytes - 1 byte of overhead instead
+of PKCS#7's 1-8. Every ciphertext is self-contained and decrypts on its own.
+
+On the UART link a stolen tail still travels as a whole 8-byte frame, so
+the block count matches PKCS#7; the link saving is the per-message 'K'.
+Stealing makes a message's last block depend on the block before it, so
+the batch goes out as two passes: every whole block, then every message's
+merged final block.
+
+    python speck_pack.py                 # 10k messages, pty emulator
+    python speck_pack.py --port COM10    # real board
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+
+def frame(message):
+    """Message + 0x80 terminator, zero-filled to at least one block"""
+    body = bytes(message) + b'\x80'
+    return body + bytes(max(0, 8 - len(body)))
+
+
+def unframe(data):
+    """Message inside one decrypted frame"""
+    body = bytes(data).rstrip(b'\0')
+    if not body or body[-1] != 0x80 or (len(data) > 8 and len(body) != len(data)):
+        raise Exception("Invalid message frame")
+    return body[:-1]
+
+
+def framed_size(length):
+    """Ciphertext bytes for a message of `length` bytes"""
+    return max(8, length + 1)
+
+
+def _as_bytes(message):
+    return message.encode('ascii') if isinstance(message, str) else bytes(message)
+
+
+def _run(crypto, command, pieces, window):
+    """One process_into pass over all pieces; returns each piece's result"""
+    if getattr(crypto, 'block_size', 8) != 8:
+        raise Exception(f"Message packing supports 8-byte SPECK64/128 blocks only, "
+                        f"got a {crypto.block_size}-byte SPECKCrypto")
+    data = b''.join(pieces)
+    out = bytearray(len(data))
+    if data:
+        crypto.process_into(command, data, out, window)
+    results = []
+    offset = 0
+    for piece in pieces:
+        results.append(bytes(out[offset:offset + len(piece)]))
+        offset += len(piece)
+    return results
+
+
+def _steal(crypto, command, texts, window):
+    """ECB with ciphertext stealing on each text (>= 8 bytes), batch-wide.
+    The same construction inverts itself with 'D' when given ciphertexts.
+
+    For a text with a d-byte tail (0 < d < 8) after block P[m-2]:
+      E: C' = E(P[m-2]); out = ... + E(tail + C'[d:]) + C'[:d]
+      D: T = D(X);        out = ... + D(tail + T[d:]) + T[:d]
+    which is the same shape, so one routine serves both directions.
+    """
+    # Pass 1: every whole block (for stolen texts, up to and including the
+    # block whose output donates its last 8-d bytes)
+    firsts = []
+    for t in texts:
+        whole = len(t) - len(t) % 8
+        firsts.append(t[:whole])
+    heads = _run(crypto, command, firsts, window)
+
+    # Pass 2: each stolen text's tail, filled out with the donated bytes
+    seconds = []
+    for t, head in zip(texts, heads):
+        d = len(t) % 8
+        if d:
+            seconds.append(t[len(t) - d:] + head[len(head) - 8 + d:])
+    merged = iter(_run(crypto, command, seconds, window))
+
+    results = []
+    for t, head in zip(texts, heads):
+        d = len(t) % 8
+        if d:
+            results.append(head[:-8] + next(merged) + head[-8:-8 + d])
+        else:
+            results.append(head)
+    return results
+
+
+def encrypt_messages(crypto, messages, window=1):
+    """Encrypt many short messages (str or bytes) under the loaded key;
+    returns one ciphertext per message (message length + 1, minimum 8)"""
+    return _steal(crypto, b'E', [frame(_as_bytes(m)) for m in messages], window)
+
+
+def decrypt_messages(crypto, ciphertexts, window=1):
+    """Decrypt ciphertexts from encrypt_messages (in any grouping or order);
+    returns the messages as bytes"""
+    for i, ct in enumerate(ciphertexts):
+        if len(ct) < 8:
+            raise Exception(f"Ciphertext {i} is {len(ct)} bytes, expected at least 8")
+    return [unframe(pt) for pt in _steal(crypto, b'D', [bytes(c) for c in ciphertexts], window)]
+
+
+# ============================================================================
+# Goodput benchmark
+# ============================================================================
+
+def pkcs7_size(length):
+    """Ciphertext bytes for a message under SPECKCrypto.encrypt"""
+    return length + 8 - length % 8
+
+
+def link_rate(baud, frames):
+    """Link-bound frames/s: 10 bits per byte, 9 bytes out and 8 back per
+    'E' frame, 17 bytes out per 'K'"""
+    return baud / 10 / frames
+
+
+def sample_messages(count, seed=1):
+    """Short ASCII strings like the ones in the test scripts (16-48 chars)"""
+    rng = random.Random(seed)
+    words = ["Hello", "FPGA", "SPECK", "test", "message", "block", "cipher",
+             "UART", "round", "key", "Basys3", "data", "from", "the", "host"]
+    messages = []
+    for _ in range(count):
+        text = ""
+        target = rng.randint(16, 48)
+        while len(text) < target:
+            text += rng.choice(words) + " "
+        messages.append(text[:target])
+    return messages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SPECK64/128 message packing goodput")
+    parser.add_argument('--port', help="serial port of the board (default: pty emulator)")
+    parser.add_argument('--count', type=int, default=10000, help="messages per batch")
+    parser.add_argument('--baud', type=int, default=115200)
+    parser.add_argument('--window', type=int, default=1,
+                        help="frames in flight (1 on the v3 bitstream)")
+    args = parser.parse_args(argv)
+
+    from speck_tool_final import SPECKCrypto, pkcs7_pad
+
+    messages = sample_messages(args.count)
+    payload = sum(len(m) for m in messages)
+    packed = sum(framed_size(len(m)) for m in messages)
+    padded = sum(pkcs7_size(len(m)) for m in messages)
+    # Blocks on the wire: a stolen tail rides in a whole block
+    packed_blocks = sum((framed_size(len(m)) + 7) // 8 for m in messages)
+    padded_blocks = padded // 8
+
+    print("="*70)
+    print(f"SPECK64/128 Message Packing - {args.count} messages, "
+          f"{payload / args.count:.1f} chars average")
+    print("="*70)
+
+    emulator = None
+    port = args.port
+    if port is None:
+        from speck_emulator import SPECKEmulator
+        emulator = SPECKEmulator()
+        port = emulator.port
+    crypto = SPECKCrypto(port, args.baud, verbose=False)
+    try:
+        crypto.load_key_bytes(os.urandom(16))
+
+        # Baseline, as in the test scripts: load the key, then one PKCS#7
+        # call per message
+        key = os.urandom(16)
+        start = time.perf_counter()
+        singles = []
+        for m in messages:
+            crypto.load_key_bytes(key)
+            singles.append(crypto.process_blocks(b'E', pkcs7_pad(m.encode('ascii')),
+                                                 args.window))
+        single_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        crypto.load_key_bytes(key)
+        cts = encrypt_messages(crypto, messages, args.window)
+        pack_time = time.perf_counter() - start
+
+        back = decrypt_messages(crypto, cts, args.window)
+        ok = back == [m.encode('ascii') for m in messages] and len(singles) == len(cts)
+    finally:
+        crypto.close()
+        if emulator:
+            emulator.close()
+
+    # Goodput at the link rate, counting 'K' frames (17 bytes = one 'E'
+    # frame's 9 + 8) as one frame each
+    single_link = link_rate(args.baud, (padded_blocks + args.count) * 17) * args.count
+    packed_link = link_rate(args.baud, (packed_blocks + 1) * 17) * args.count
+
+    print(f"\n  {'':<24}{'ct bytes':>10}{'overhead':>10}{'msgs/s':>10}{'msgs/s @ link':>15}")
+    print(f"  {'K + PKCS#7 per message':<24}{padded:>10}{padded/payload - 1:>10.1%}"
+          f"{args.count/single_time:>10.0f}{single_link:>15.1f}")
+    print(f"  {'packed batch':<24}{packed:>10}{packed/payload - 1:>10.1%}"
+          f"{args.count/pack_time:>10.0f}{packed_link:>15.1f}")
+    print(f"\n  Goodput gain at {args.baud} baud: {packed_link / single_link:.2f}x "
+          f"({padded_blocks} vs {packed_blocks} blocks, {args.count} vs 1 key loads)")
+    print()
+    if ok:
+        print("  ✅ PASS - Every message decrypts on its own")
+    else:
+        print("  ❌ FAIL - Packed messages did not round-trip")
+    print("="*70)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+SPECK64/128 Round-Trip Integrity Check
+Encrypts and decrypts the same data in one pipelined stream and reports the
+byte offsets of blocks where D(E(block)) != block. 'D' for block i is issued
+while 'E' for block i+lag is already on the link, and blocks are compared as
+their plaintext comes back, so nothing waits for the whole corpus:
+
+    python speck_roundtrip.py corpus/*.bin --port COM10 --key-file key.bin
+
+Window 1 is the only safe setting on the v3 bitstream; the multi-lane
+bitstream (speck_uart_top_lanes.v) takes up to LANES.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+
+CHUNK_BYTES = 1 << 20  # Corpus files are streamed in chunks of this size
+
+
+class RoundTripVerifier:
+    def __init__(self, crypto, window=1, lag=4, on_mismatch=None):
+        """Round-trip blocks through `crypto` (a SPECKCrypto with a key loaded)
+
+        window:      frames in flight on the link ('E' and 'D' together)
+        lag:         'D' for block i goes out once 'E' for block i+lag has
+        on_mismatch: optional callback(offset), called as soon as a block fails
+        """
+        if getattr(crypto, 'block_size', 8) != 8:
+            raise Exception(f"RoundTripVerifier supports 8-byte SPECK64/128 blocks only, "
+                            f"got a {crypto.block_size}-byte SPECKCrypto")
+        self.crypto = crypto
+        self.window = max(1, window)
+        self.lag = max(1, lag)
+        self.on_mismatch = on_mismatch
+
+        self.mismatches = []    # Byte offsets of failed blocks, in order
+        self.blocks_checked = 0
+        self.bytes_checked = 0
+
+    def run(self, data, base_offset=0):
+        """Round-trip whole 8-byte blocks of data; returns this call's
+        mismatched offsets (counted from base_offset)"""
+        if len(data) % 8 != 0:
+            raise Exception(f"Data must be multiple of 8 bytes, got {len(data)}")
+
+        ser = self.crypto.ser
+        src = memoryview(data)
+        num_blocks = len(data) // 8
+        window = self.window
+        failed = []
+
+        ct = bytearray(len(data))      # Ciphertext, kept until its 'D' is sent
+        frames = bytearray(9 * window)
+        rx = bytearray(8 * window)
+        rx_view = memoryview(rx)
+        have = 0                       # Unparsed result bytes in rx
+
+        inflight = deque()  # (command, block index) per frame on the link
+        ready = deque()     # Blocks whose ciphertext is back, awaiting 'D'
+        next_e = 0
+        checked = 0
+
+        while checked < num_blocks:
+            # Top up the pipeline: 'D' once 'E' is lag blocks ahead (or done)
+            count = 0
+            while len(inflight) < window:
+                if ready and (next_e == num_blocks or next_e - ready[0] >= self.lag):
+                    i = ready.popleft()
+                    frames[count*9] = 0x44  # 'D'
+                    frames[count*9+1:count*9+9] = ct[i*8:(i+1)*8]
+                    inflight.append((0x44, i))
+                elif next_e < num_blocks:
+                    i = next_e
+                    next_e += 1
+                    frames[count*9] = 0x45  # 'E'
+                    frames[count*9+1:count*9+9] = src[i*8:(i+1)*8]
+                    inflight.append((0x45, i))
+                else:
+                    break
+                count += 1
+            if count:
+                ser.write(memoryview(frames)[:count*9])
+
+            # Read up to half a window, then handle every complete result
+            want = len(inflight) * 8 - have
+            want = min(want, max(8, (window // 2) * 8))
+            n = ser.readinto(rx_view[have:have + want])
+            if n == 0:
+                raise Exception(f"Timed out with {len(inflight)} frames in flight "
+                                f"after {checked} of {num_blocks} blocks")
+            have += n
+
+            done = have // 8
+            for j in range(done):
+                command, i = inflight.popleft()
+                result = rx_view[j*8:(j+1)*8]
+                if command == 0x45:
+                    ct[i*8:(i+1)*8] = result
+                    ready.append(i)
+                else:
+                    checked += 1
+                    if result != src[i*8:(i+1)*8]:
+                        offset = base_offset + i * 8
+                        failed.append(offset)
+                        if self.on_mismatch:
+                            self.on_mismatch(offset)
+            rx[:have - done*8] = rx[done*8:have]
+            have -= done * 8
+
+        self.mismatches.extend(failed)
+        self.blocks_checked += num_blocks
+        self.bytes_checked += len(data)
+        return failed
+
+    def run_file(self, path, chunk_bytes=CHUNK_BYTES):
+        """Round-trip a file in chunks; a partial last block is zero-padded.
+        Returns the mismatched offsets within the file."""
+        chunk_bytes -= chunk_bytes % 8
+        failed = []
+        offset = 0
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_bytes)
+                if not chunk:
+                    break
+                if len(chunk) % 8:
+                    chunk += bytes(8 - len(chunk) % 8)
+                failed += self.run(chunk, base_offset=offset)
+                offset += len(chunk)
+        return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SPECK64/128 FPGA round-trip integrity check")
+    parser.add_argument('files', nargs='+', help="corpus files to round-trip")
+    parser.add_argument('--port', default=os.environ.get('SPECK_PORT', 'COM10'))
+    parser.add_argument('--key-file', help="16-byte key (default: 00 01 .. 0f)")
+    parser.add_argument('--window', type=int, default=1,
+                        help="frames in flight (1 for v3, up to LANES for the multi-lane bitstream)")
+    parser.add_argument('--lag', type=int, default=4, help="blocks 'E' runs ahead of 'D'")
+    args = parser.parse_args(argv)
+
+    from speck_cli import read_key
+    from speck_tool_final import SPECKCrypto
+
+    key = read_key(args.key_file) if args.key_file else bytes(range(16))
+    crypto = SPECKCrypto(args.port)
+    crypto.load_key_bytes(key)
+    verifier = RoundTripVerifier(crypto, window=args.window, lag=args.lag)
+
+    start = time.perf_counter()
+    failed_files = 0
+    try:
+        for path in args.files:
+            failed = verifier.run_file(path)
+            if failed:
+                failed_files += 1
+                shown = ", ".join(f"0x{off:x}" for off in failed[:10])
+                more = f" (+{len(failed) - 10} more)" if len(failed) > 10 else ""
+                print(f"  ❌ {path}: {len(failed)} bad blocks at {shown}{more}")
+            else:
+                print(f"  ✓ {path}")
+    finally:
+        crypto.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"\n  {verifier.blocks_checked} blocks in {elapsed:.1f} s "
+          f"({verifier.blocks_checked / elapsed:.0f} blocks/s), "
+          f"{len(verifier.mismatches)} mismatches in {failed_files} files")
+    return 1 if verifier.mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
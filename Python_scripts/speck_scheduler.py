@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+SPECK64/128 Key-Aware Request Scheduler
+Queues requests in front of a SPECKCrypto and reorders them so requests
+under the same key run together, minimizing 'K' reloads under key churn.
+A latency budget bounds how long any request waits. Scheduling aims
+`margin` short of it, to absorb the lag of the measured link rate and
+thread wake-ups: a request that close to its budget is served next, and no
+batch runs longer than what is left of the budget of the oldest request it
+holds back (at the measured link rate). While the link keeps up, queue
+delay stays within the budget; once offered load exceeds the link every
+request is over budget and they are served oldest key first.
+"""
+
+import collections
+import threading
+import time
+from concurrent.futures import Future
+
+
+class _Request:
+    def __init__(self, op, key, data):
+        self.op = op
+        self.key = key
+        self.data = data
+        self.blocks = len(data) // 8
+        self.submitted = time.perf_counter()
+        self.future = Future()
+
+
+class KeyScheduler:
+    def __init__(self, crypto, latency_budget=0.05, window=1, max_batch_blocks=4096,
+                 prefetch=False, link_rate=None, margin=0.1):
+        """Schedule requests onto `crypto` (a connected SPECKCrypto)
+
+        latency_budget:   seconds a request may wait in the queue; batches
+                          are sized to end before a waiting request runs out
+        window:           frames in flight per device pass (see process_blocks)
+        max_batch_blocks: cap on blocks run per key switch
+        prefetch:         schedule the next key ('P') while a batch runs, so
+                          the switch is a 1-byte 'S' (shadow-key bitstream only)
+        link_rate:        starting blocks/s estimate for sizing batches
+                          (default: the port's baud rate, 17 wire bytes per
+                          block); replaced by measured batch rates
+        margin:           fraction of the budget held back when sizing batches
+        """
+        if getattr(crypto, 'block_size', 8) != 8:
+            raise Exception(f"KeyScheduler supports 8-byte SPECK64/128 blocks only, "
+                            f"got a {crypto.block_size}-byte SPECKCrypto")
+        self.crypto = crypto
+        self.latency_budget = latency_budget
+        self.margin = margin
+        self.window = window
+        self.max_batch_blocks = max_batch_blocks
+        self.prefetch = prefetch
+        if link_rate is None:
+            link_rate = getattr(crypto.ser, 'baudrate', 115200) / 10 / 17
+        self.link_rate = link_rate  # Blocks/s, smoothed over batches
+
+        self.current_key = None
+        self._pending = collections.OrderedDict()  # key -> deque of _Request
+        self._cond = threading.Condition()
+        self._running = True
+
+        # Counters
+        self._requests = 0
+        self._blocks = 0
+        self._key_switches = 0
+        self._batches = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Finish queued work and stop the scheduler thread"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, op, key, data):
+        """Queue raw blocks for 'E' or 'D' under a 16-byte key; returns a Future"""
+        if op not in (b'E', b'D'):
+            raise Exception(f"Unknown operation {op!r}")
+        if len(key) != 16:
+            raise Exception(f"Key must be 16 bytes, got {len(key)}")
+        if len(data) % 8 != 0:
+            raise Exception(f"Data must be multiple of 8 bytes, got {len(data)}")
+
+        req = _Request(op, bytes(key), bytes(data))
+        with self._cond:
+            if not self._running:
+                raise Exception("Scheduler is closed")
+            self._pending.setdefault(req.key, collections.deque()).append(req)
+            self._cond.notify()
+        return req.future
+
+    def encrypt_blocks(self, key, data):
+        """Encrypt raw 8-byte blocks, blocking until the result is ready"""
+        return self.submit(b'E', key, data).result()
+
+    def decrypt_blocks(self, key, data):
+        """Decrypt raw 8-byte blocks, blocking until the result is ready"""
+        return self.submit(b'D', key, data).result()
+
+    def stats(self):
+        """Key-switch rate and queueing delay added by the scheduler"""
+        with self._cond:
+            n = self._requests
+            return {
+                'requests': n,
+                'blocks': self._blocks,
+                'key_switches': self._key_switches,
+                'key_switch_rate': self._key_switches / n if n else 0.0,
+                'batches': self._batches,
+                'link_rate': self.link_rate,
+                'avg_queue_delay': self._total_wait / n if n else 0.0,
+                'max_queue_delay': self._max_wait,
+                'queued': sum(len(q) for q in self._pending.values()),
+            }
+
+    # ========================================================================
+    # Scheduling
+    # ========================================================================
+
+    def _target(self):
+        """Queue delay to plan for: the budget less the margin"""
+        return self.latency_budget * (1 - self.margin)
+
+    def _pick_key(self, now):
+        """Oldest request if it is at its budget (less the margin), else
+        stay on the loaded key, else switch to the key with the most queued
+        work"""
+        oldest_key = min(self._pending, key=lambda k: self._pending[k][0].submitted)
+        if now - self._pending[oldest_key][0].submitted >= self._target():
+            return oldest_key
+        if self.current_key in self._pending:
+            return self.current_key
+        return max(self._pending, key=lambda k: sum(len(r.data) for r in self._pending[k]))
+
+    def _take_batch(self, key, now):
+        """Pop queued requests for `key`, oldest first, up to max_batch_blocks
+        and no more than fits in the tightest remaining budget: that of the
+        oldest request under another key, or a full budget for ones that have
+        not arrived yet. If that request is already over budget (overload),
+        take only what is older than it, so requests run in arrival order."""
+        oldest = min((self._pending[k][0].submitted for k in self._pending if k != key),
+                     default=now)
+        slack = self._target() - (now - oldest)
+        if key != self.current_key:
+            slack -= 1 / self.link_rate  # The 'K' frame costs about one block
+        limit = slack * self.link_rate
+
+        q = self._pending[key]
+        batch = [q.popleft()]
+        blocks = batch[0].blocks
+        while q and blocks + q[0].blocks <= self.max_batch_blocks:
+            if slack > 0 and blocks + q[0].blocks > limit:
+                break
+            if slack <= 0 and q[0].submitted > oldest:
+                break
+            req = q.popleft()
+            batch.append(req)
+            blocks += req.blocks
+        if not q:
+            del self._pending[key]
+        return batch
+
+    def _next_key(self, key):
+        """Key likely to be served after `key`: the oldest waiting one"""
+        with self._cond:
+            others = [k for k in self._pending if k != key]
+            if not others:
+                return None
+            return min(others, key=lambda k: self._pending[k][0].submitted)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._pending:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                now = time.perf_counter()
+                key = self._pick_key(now)
+                batch = self._take_batch(key, now)
+                self._batches += 1
+                for req in batch:
+                    wait = now - req.submitted
+                    self._total_wait += wait
+                    self._max_wait = max(self._max_wait, wait)
+                    self._requests += 1
+                    self._blocks += req.blocks
+
+            self._execute(key, batch)
+
+    def _execute(self, key, batch):
+        start = time.perf_counter()
+        try:
+            if key != self.current_key:
+                self.current_key = None
+                self.crypto.load_key_bytes(key)
+                self.current_key = key
+                with self._cond:
+                    self._key_switches += 1
+
+            if self.prefetch:
+                upcoming = self._next_key(key)
+                if upcoming is not None and upcoming != self.crypto.prefetched:
+                    self.crypto.prefetch_key_bytes(upcoming)
+
+            for op in (b'E', b'D'):
+                reqs = [r for r in batch if r.op == op]
+                if not reqs:
+                    continue
+                out = self.crypto.process_blocks(
+                    op, b''.join(r.data for r in reqs), window=self.window)
+                offset = 0
+                for r in reqs:
+                    r.future.set_result(out[offset:offset + len(r.data)])
+                    offset += len(r.data)
+
+            # Smoothed link rate, key load included, for sizing batches
+            elapsed = time.perf_counter() - start
+            if elapsed > 0:
+                rate = sum(r.blocks for r in batch) / elapsed
+                first = self._batches == 1
+                self.link_rate = rate if first else self.link_rate + 0.2 * (rate - self.link_rate)
+
+        except Exception as e:
+            # Device state is unknown after a failure; force a key reload
+            self.current_key = None
+            self.crypto.prefetched = None
+            for r in batch:
+                if not r.future.done():
+                    r.future.set_exception(e)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+SPECK64/128 On-Device Performance Counters
+Reads the controller's free-running counters with 'Q' and turns two
+snapshots into a utilization and bottleneck report next to host timings:
+
+    with profile(crypto) as p:
+        crypto.process_blocks(b'E', data)
+    print(p.report())
+
+    python speck_stats.py                          # bulk run on the pty emulator
+    python speck_stats.py --port COM10             # real board
+    python speck_stats.py --port COM10 --snapshot  # raw counters only
+
+Record (little-endian): 'Q' + counter count (u8) + that many u32 counters,
+in speck_uart_controller_v3.v order: cycles in each state IDLE .. PREFETCH,
+then blocks encrypted/decrypted, key loads, prefetches, swaps, rejected
+commands and RX overruns. Counters wrap at 2^32 (about 43 s of cycles at
+100 MHz), so diff snapshots taken less than that apart.
+"""
+
+import argparse
+import os
+import struct
+import sys
+import time
+
+STATS_COMMAND = b'Q'
+CLK_FREQ = 100_000_000
+
+STATE_NAMES = ('IDLE', 'RX_COMMAND', 'RX_BYTES', 'KEY_SCHEDULE', 'WAIT_KEY', 'CRYPTO',
+               'WAIT_CRYPTO', 'TX_BYTES', 'WAIT_TX', 'DONE_STATE', 'PREFETCH')
+EVENT_NAMES = ('encrypted', 'decrypted', 'key_loads', 'prefetches', 'swaps',
+               'rejected', 'rx_overruns')
+NUM_COUNTERS = len(STATE_NAMES) + len(EVENT_NAMES)
+RECORD_SIZE = 2 + 4 * NUM_COUNTERS
+WRAP = 1 << 32
+
+# Where the cycles went, grouped by what the controller was waiting on
+PHASES = (
+    ('host',         ('IDLE',),
+     "idle between commands - host turnaround or the USB latency timer; "
+     "keep more frames in flight (FIFO bitstream, window > 1)"),
+    ('uart_rx',      ('RX_BYTES',),
+     "receiving frame bytes - the RX link is the limit; raise the baud rate "
+     "or send 16-byte SPECK128 frames"),
+    ('uart_tx',      ('TX_BYTES', 'WAIT_TX'),
+     "sending results - the TX link is the limit; the FIFO top overlaps it "
+     "with the next frame's RX"),
+    ('core',         ('CRYPTO', 'WAIT_CRYPTO'),
+     "cipher cores busy - add lanes (speck_uart_top_lanes)"),
+    ('key_schedule', ('KEY_SCHEDULE', 'WAIT_KEY', 'PREFETCH'),
+     "running the key schedule - reuse keys, or prefetch them with 'P'"),
+    ('control',      ('RX_COMMAND', 'DONE_STATE'),
+     "command decode and bookkeeping"),
+)
+
+
+class DeviceStats:
+    def __init__(self, counters):
+        """Counters in record order (see STATE_NAMES, EVENT_NAMES)"""
+        if len(counters) != NUM_COUNTERS:
+            raise Exception(f"Expected {NUM_COUNTERS} counters, got {len(counters)}")
+        self.counters = list(counters)
+        self.state_cycles = dict(zip(STATE_NAMES, self.counters))
+        self.events = dict(zip(EVENT_NAMES, self.counters[len(STATE_NAMES):]))
+
+    @classmethod
+    def from_bytes(cls, record):
+        """Parse one 'Q' record"""
+        if len(record) != RECORD_SIZE or record[0:1] != STATS_COMMAND or record[1] != NUM_COUNTERS:
+            raise Exception(f"Invalid stats record ({len(record)} bytes, "
+                            f"header {bytes(record[:2]).hex()})")
+        return cls(struct.unpack_from(f'<{NUM_COUNTERS}I', record, 2))
+
+    def to_bytes(self):
+        return (STATS_COMMAND + bytes([NUM_COUNTERS])
+                + struct.pack(f'<{NUM_COUNTERS}I', *(c % WRAP for c in self.counters)))
+
+    def __sub__(self, earlier):
+        """Counts between two snapshots (wrap-safe)"""
+        return DeviceStats([(a - b) % WRAP for a, b in zip(self.counters, earlier.counters)])
+
+    def __repr__(self):
+        return (f"DeviceStats({self.total_cycles} cycles, {self.blocks} blocks, "
+                f"{self.events['key_loads']} key loads, {self.events['rx_overruns']} overruns)")
+
+    @property
+    def total_cycles(self):
+        return sum(self.state_cycles.values())
+
+    @property
+    def blocks(self):
+        return self.events['encrypted'] + self.events['decrypted']
+
+    def utilization(self):
+        """Fraction of cycles per phase (PHASES order)"""
+        total = self.total_cycles or 1
+        return {name: sum(self.state_cycles[s] for s in states) / total
+                for name, states, _ in PHASES}
+
+    def bottleneck(self):
+        """(phase, explanation) with the most cycles, ignoring bookkeeping"""
+        usage = self.utilization()
+        name, _, why = max((p for p in PHASES if p[0] != 'control'), key=lambda p: usage[p[0]])
+        return name, why
+
+
+class Profile:
+    """Device counters and host wall time over the same stretch of work"""
+
+    def __init__(self, crypto, clk_freq=CLK_FREQ):
+        self.crypto = crypto
+        self.clk_freq = clk_freq
+        self.start = None
+        self.end = None
+        self.elapsed = 0.0  # Host wall seconds between the two snapshots
+
+    def __enter__(self):
+        self.start = self.crypto.read_stats()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.elapsed = time.perf_counter() - self._t0
+        if exc_type is None:
+            self.end = self.crypto.read_stats()
+
+    @property
+    def delta(self):
+        return self.end - self.start
+
+    def report(self):
+        """Multi-line utilization and bottleneck report"""
+        d = self.delta
+        device_s = d.total_cycles / self.clk_freq
+        busy = d.total_cycles - d.state_cycles['IDLE']
+        rate = d.blocks / self.elapsed if self.elapsed else 0.0
+        coverage = device_s / self.elapsed if self.elapsed else 0.0
+
+        lines = [f"  Host:    {self.elapsed:.3f} s wall, {d.blocks} blocks, {rate:.0f} blocks/s",
+                 f"  Device:  {device_s:.3f} s of cycles ({coverage:.1%} of wall), "
+                 f"{d.events['encrypted']} E / {d.events['decrypted']} D, "
+                 f"{d.events['key_loads']} K, {d.events['prefetches']} P, {d.events['swaps']} S"]
+        if d.blocks:
+            lines.append(f"  Per block: host {self.elapsed / d.blocks * 1e3:.3f} ms, "
+                         f"device busy {busy / d.blocks / self.clk_freq * 1e3:.3f} ms")
+
+        lines.append("  Utilization:")
+        usage = d.utilization()
+        for name, states, _ in PHASES:
+            cycles = sum(d.state_cycles[s] for s in states)
+            lines.append(f"    {name:<13}{usage[name]:>7.1%}  {cycles:>12} cycles  ({', '.join(states)})")
+
+        name, why = d.bottleneck()
+        lines.append(f"  Bottleneck: {name} - {why}")
+        if d.events['rx_overruns']:
+            lines.append(f"  ⚠ {d.events['rx_overruns']} RX overruns: bytes were dropped, "
+                         f"responses will be missing")
+        if d.events['rejected']:
+            lines.append(f"  ⚠ {d.events['rejected']} rejected commands (unknown, or E/D before a key)")
+        lines.append(f"  (the first snapshot's {RECORD_SIZE}-byte record is counted under uart_tx)")
+        return "\n".join(lines)
+
+
+def profile(crypto, clk_freq=CLK_FREQ):
+    """Context manager: snapshot the counters around a block of host code"""
+    return Profile(crypto, clk_freq)
+
+
+# ============================================================================
+# Command line
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SPECK64/128 device performance counters")
+    parser.add_argument('--port', help="serial port of the board (default: pty emulator)")
+    parser.add_argument('--baud', type=int, default=115200)
+    parser.add_argument('--blocks', type=int, default=500, help="blocks in the profiled run")
+    parser.add_argument('--window', type=int, default=1,
+                        help="frames in flight (1 on the v3 bitstream)")
+    parser.add_argument('--snapshot', action='store_true',
+                        help="print the raw counters and exit")
+    args = parser.parse_args(argv)
+
+    from speck_tool_final import SPECKCrypto
+
+    emulator = None
+    port = args.port
+    if port is None:
+        from speck_emulator import SPECKEmulator
+        emulator = SPECKEmulator(baud=args.baud)
+        port = emulator.port
+    crypto = SPECKCrypto(port, args.baud, verbose=False)
+    try:
+        if args.snapshot:
+            stats = crypto.read_stats()
+            for name, value in zip(STATE_NAMES + EVENT_NAMES, stats.counters):
+                print(f"  {name:<13}{value:>12}")
+            return 0
+
+        print("="*70)
+        print(f"SPECK64/128 Device Profile - {args.blocks} blocks, window {args.window}, "
+              f"{'emulator' if emulator else port}")
+        print("="*70)
+        data = os.urandom(8 * args.blocks)
+        with profile(crypto) as p:
+            crypto.load_key_bytes(bytes(range(16)))
+            crypto.process_blocks(b'E', data, args.window)
+        print(p.report())
+        print("="*70)
+    finally:
+        crypto.close()
+        if emulator:
+            emulator.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,21 +4,102 @@ SPECK64/128 FPGA Crypto Tool - Final Version
 No connection resets - just clean, simple communication
 """
 
-import serial
+import hashlib
 import time
 
+from speck_buffer import BlockBuffer
+from speck_stats import RECORD_SIZE, STATS_COMMAND, DeviceStats
+
+def key_text_to_bytes(key_text):
+    """Pad or truncate an ASCII key to the 16 bytes sent with 'K'"""
+    return key_text.ljust(16, '\0')[:16].encode('ascii')
+
+def key_id(key_bytes):
+    """Short non-reversible fingerprint of a key, safe to log"""
+    return hashlib.sha256(bytes(key_bytes)).hexdigest()[:8]
+
+def pkcs7_pad(data, block_size=8):
+    """Pad bytes to a multiple of block_size (always adds 1-block_size bytes)"""
+    padding_needed = block_size - (len(data) % block_size)
+    return bytes(data) + bytes([padding_needed] * padding_needed)
+
+def pkcs7_unpad(data, block_size=8):
+    """Strip PKCS#7 padding, raising if it is malformed"""
+    if not data or len(data) % block_size != 0:
+        raise Exception(f"Padded data must be a non-empty multiple of {block_size} bytes")
+    padding_length = data[-1]
+    if not 0 < padding_length <= block_size or data[-padding_length:] != bytes([padding_length]) * padding_length:
+        raise Exception("Invalid PKCS#7 padding")
+    return bytes(data[:-padding_length])
+
 class SPECKCrypto:
-    def __init__(self, port, baud=115200):
-        """Initialize connection to FPGA"""
-        self.ser = serial.Serial(port, baud, timeout=2)
-        time.sleep(0.2)
+    def __init__(self, port, baud=115200, settle=0.2, verbose=True, block_size=8, window=1):
+        """Initialize connection to FPGA
+
+        port:       serial port name, or an already open serial.Serial-like
+                    object (write, readinto, read, reset_*_buffer)
+        settle:     seconds to wait after opening the port
+        verbose:    print the connection message
+        block_size: 8 for the SPECK64/128 bitstream, 16 for SPECK128/128
+                    (controller built with W=64, ROUNDS=32)
+        window:     frames in flight for encrypt()/decrypt(). Keep 1 on the
+                    v3 bitstream; the FIFO and lanes tops take a whole
+                    message, making each call a single write.
+        """
+        if block_size not in (8, 16):
+            raise Exception(f"Block size must be 8 or 16 bytes, got {block_size}")
+        if isinstance(port, str):
+            import serial  # Deferred so tools that only use the daemon start fast
+            self.ser = serial.Serial(port, baud, timeout=2)
+        else:
+            self.ser = port
+        if settle:
+            time.sleep(settle)
         self.ser.reset_input_buffer()
         self.ser.reset_output_buffer()
-        print(f"  ✓ Connected to {port}")
+        self.block_size = block_size
+        self.window = window
+        self.key_bytes = None  # Key currently loaded in the FPGA
+        self.prefetched = None # Key scheduled into the shadow round keys ('P')
+        self.verifier = None   # Optional OutputVerifier (speck_verifier.py)
+        self.cache = None      # Optional BlockCache (speck_cache.py)
+        self.recorder = None   # Optional TraceRecorder (speck_trace.py)
+        if verbose:
+            print(f"  ✓ Connected to {port}")
     
     def close(self):
         """Close serial connection"""
         self.ser.close()
+
+    def set_latency_timer(self, ms=1):
+        """Shorten the FTDI USB latency timer (default 16 ms).
+
+        The FT2232 on the Basys 3 holds a short response (like one 8-byte
+        block) until the timer expires, so with window=1 the timer, not the
+        baud rate, caps throughput. Linux only and usually needs write
+        access to sysfs; on Windows set Device Manager > Port Settings >
+        Advanced > Latency Timer instead. Returns True if applied.
+        """
+        import os
+
+        applied = False
+        name = os.path.basename(self.ser.port)
+        path = f"/sys/bus/usb-serial/devices/{name}/latency_timer"
+        try:
+            with open(path, 'w') as f:
+                f.write(str(int(ms)))
+            applied = True
+        except OSError:
+            pass
+
+        # ASYNC_LOW_LATENCY, for drivers that honour it instead
+        if hasattr(self.ser, 'set_low_latency_mode'):
+            try:
+                self.ser.set_low_latency_mode(True)
+                applied = True
+            except (OSError, ValueError):
+                pass
+        return applied
     
     def load_key(self, key_text):
         """Load key from ASCII string"""
@@ -26,56 +107,161 @@ class SPECKCrypto:
         key_text = key_text.ljust(16, '\0')[:16]
         key_bytes = key_text.encode('ascii')
         
-        # Pack as four 32-bit words (little-endian)
-        k0 = int.from_bytes(key_bytes[0:4], 'little')
-        k1 = int.from_bytes(key_bytes[4:8], 'little')
-        k2 = int.from_bytes(key_bytes[8:12], 'little')
-        k3 = int.from_bytes(key_bytes[12:16], 'little')
-        
-        # Send 'K' command
-        self.ser.write(b'K')
-        time.sleep(0.1)
-        
-        # Send 16 key bytes
-        for k in [k0, k1, k2, k3]:
-            self.ser.write(k.to_bytes(4, 'little'))
+        # 'K' + 16 key bytes (K0..K3 little-endian) in a single write
+        self.load_key_bytes(key_bytes)
         
         # Wait for key schedule
         time.sleep(0.1)
-    
+
+    def load_key_bytes(self, key_bytes):
+        """Load a raw 16-byte key in one write (no settle delays)"""
+        if len(key_bytes) != 16:
+            raise Exception(f"Key must be 16 bytes, got {len(key_bytes)}")
+
+        # Key schedule takes ~30 cycles, far less than one byte time on the
+        # wire, so the next command can follow immediately
+        start = time.perf_counter()
+        if self.prefetched is not None and bytes(key_bytes) == self.prefetched:
+            self.ser.write(b'S')  # Already scheduled: swap it in
+        else:
+            self.ser.write(b'K' + bytes(key_bytes))
+        self.prefetched = None
+        self.key_bytes = bytes(key_bytes)
+        if self.cache is not None:
+            self.cache.set_key(self.key_bytes)  # Wipes results of the old key
+        if self.recorder:
+            self.recorder.record(b'K', self.key_bytes, 16, start, time.perf_counter() - start)
+
+    def prefetch_key_bytes(self, key_bytes):
+        """Schedule the next key in the background ('P'); blocks keep using
+        the current key until load_key_bytes swaps it in with a 1-byte 'S'.
+        Needs a bitstream with shadow round keys - older controllers would
+        read the key bytes as commands."""
+        if len(key_bytes) != 16:
+            raise Exception(f"Key must be 16 bytes, got {len(key_bytes)}")
+        self.ser.write(b'P' + bytes(key_bytes))
+        self.prefetched = bytes(key_bytes)
+
+    def read_stats(self):
+        """Snapshot of the controller's performance counters ('Q', see
+        speck_stats.py). Needs a bitstream with counters - older
+        controllers drop the command and this times out."""
+        self.ser.write(STATS_COMMAND)
+        record = self.ser.read(RECORD_SIZE)
+        if len(record) != RECORD_SIZE:
+            raise Exception(f"Expected {RECORD_SIZE}-byte stats record, got {len(record)}")
+        return DeviceStats.from_bytes(record)
+
+    def process_blocks(self, command, data, window=1):
+        """Run raw blocks through the FPGA, keeping up to `window`
+        'E'/'D' frames in flight. Returns the result bytes in order.
+
+        The v3 controller drops bytes while it is transmitting, so window=1
+        is the only safe setting on that bitstream.
+        """
+        out = bytearray(len(data))
+        self.process_into(command, data, out, window)
+        return bytes(out)
+
+    def process_into(self, command, data, out, window=1):
+        """Like process_blocks, but reads each response straight into its
+        block slot of `out` (a bytearray, BlockBuffer.buf, or other writable
+        buffer the same size as data). No per-block objects are kept.
+
+        Syscalls per top-up: one write for all new frames, one readinto for
+        up to half a window of results. With a cache attached only distinct
+        uncached blocks go to the device.
+        """
+        if len(data) % self.block_size != 0:
+            raise Exception(f"Data must be multiple of {self.block_size} bytes, got {len(data)}")
+        if len(out) != len(data):
+            raise Exception(f"Output buffer is {len(out)} bytes, expected {len(data)}")
+
+        start = time.perf_counter()
+        if self.cache is not None and self.key_bytes is not None:
+            self._process_cached(command, data, out, window)
+        else:
+            self._transfer(command, data, out, window)
+        if self.recorder:
+            self.recorder.record(command, self.key_bytes, len(data), start,
+                                 time.perf_counter() - start)
+
+        if self.verifier:
+            self.verifier.submit(command, self.key_bytes, data, out, self.block_size)
+
+    def _process_cached(self, command, data, out, window):
+        """Fill cache hits locally, send each distinct miss once"""
+        self.cache.set_key(self.key_bytes)
+        src = memoryview(data)
+        dst = memoryview(out)
+        bs = self.block_size
+
+        misses = {}  # block -> offsets waiting for its result
+        for offset in range(0, len(data), bs):
+            block = bytes(src[offset:offset+bs])
+            if block in misses:
+                misses[block].append(offset)
+                self.cache.hits += 1  # Repeat within this batch: sent once
+            elif not self.cache.fill(command, block, dst[offset:offset+bs]):
+                misses[block] = [offset]
+
+        if not misses:
+            return
+        results = bytearray(len(misses) * bs)
+        self._transfer(command, b''.join(misses), results, window)
+        for i, (block, offsets) in enumerate(misses.items()):
+            result = results[i*bs:(i+1)*bs]
+            self.cache.put(command, block, result)
+            for offset in offsets:
+                dst[offset:offset+bs] = result
+
+    def _transfer(self, command, data, out, window):
+        """Pipelined wire transfer of whole blocks (see process_into)"""
+        src = memoryview(data)
+        dst = memoryview(out)
+        bs = self.block_size
+        fs = bs + 1  # Command byte + block
+        num_blocks = len(data) // bs
+        window = max(1, min(window, num_blocks))
+
+        # One contiguous buffer for up to `window` frames, so each top-up
+        # of the pipeline is a single write() (one USB transfer)
+        frames = bytearray(fs * window)
+        frames[0::fs] = command * window
+        fview = memoryview(frames)
+
+        sent = 0      # blocks written
+        received = 0  # result bytes read
+        while received < len(data):
+            # Top up the pipeline
+            count = min(num_blocks, received // bs + window) - sent
+            if count > 0:
+                for i in range(count):
+                    fview[i*fs+1:(i+1)*fs] = src[(sent+i)*bs:(sent+i+1)*bs]
+                self.ser.write(fview[:count*fs])
+                sent += count
+
+            # Drain results straight into their slots. Reading at most half
+            # a window lets the next top-up overlap with device work.
+            want = min(sent*bs - received, max(1, window // 2) * bs)
+            n = self.ser.readinto(dst[received:received + want])
+            if n == 0:
+                raise Exception(f"Timed out after {received} of {len(data)} result bytes")
+            received += n
+
     def encrypt(self, plaintext):
         """Encrypt ASCII plaintext of any length"""
         # Convert to bytes
         pt_bytes = plaintext.encode('ascii')
-        original_length = len(pt_bytes)
+        if self.block_size != 8:
+            return self.process_blocks(b'E', pkcs7_pad(pt_bytes, self.block_size), self.window).hex()
         
         # Add PKCS#7 padding
-        padding_needed = (8 - (original_length % 8)) % 8
-        if padding_needed == 0:
-            padding_needed = 8
-        padded_bytes = pt_bytes + bytes([padding_needed] * padding_needed)
-        num_blocks = len(padded_bytes) // 8
+        padded = BlockBuffer.padded(pt_bytes)
         
-        # Encrypt each block
-        ciphertext = bytearray()
-        for i in range(num_blocks):
-            block = padded_bytes[i*8:(i+1)*8]
-            
-            # Send 'E' command
-            self.ser.write(b'E')
-            time.sleep(0.01)
-            
-            # Send 8 plaintext bytes
-            self.ser.write(block)
-            
-            # Wait and receive 8 ciphertext bytes
-            time.sleep(0.1)
-            ct_block = self.ser.read(8)
-            
-            if len(ct_block) != 8:
-                raise Exception(f"Expected 8 bytes, got {len(ct_block)}")
-            
-            ciphertext.extend(ct_block)
+        # Encrypt every block in one pass, straight into its slot
+        ciphertext = BlockBuffer(padded.num_blocks)
+        self.process_into(b'E', padded.buf, ciphertext.buf, self.window)
         
         return ciphertext.hex()
     
@@ -84,42 +270,33 @@ class SPECKCrypto:
         # Remove spaces and convert to bytes
         ct_hex = ct_hex.replace(' ', '').replace('0x', '').strip()
         
-        if len(ct_hex) % 16 != 0:
-            raise Exception(f"Ciphertext must be multiple of 16 hex chars")
+        if len(ct_hex) % (2 * self.block_size) != 0:
+            raise Exception(f"Ciphertext must be multiple of {2 * self.block_size} hex chars")
+        if self.block_size != 8:
+            # BlockBuffer is SPECK64-sized; SPECK128 goes through one pass.
+            # Invalid padding is left in place, as on the SPECK64 path.
+            plaintext = self.process_blocks(b'D', bytes.fromhex(ct_hex), self.window)
+            padding_length = plaintext[-1] if plaintext else 0
+            if 0 < padding_length <= self.block_size and \
+                    plaintext[-padding_length:] == bytes([padding_length]) * padding_length:
+                plaintext = plaintext[:-padding_length]
+            try:
+                return str(plaintext, 'ascii')
+            except UnicodeDecodeError:
+                return f"<non-ASCII: {plaintext.hex()}>"
         
-        ct_bytes = bytes.fromhex(ct_hex)
-        num_blocks = len(ct_bytes) // 8
+        ct = BlockBuffer.from_bytes(bytes.fromhex(ct_hex))
         
-        # Decrypt each block
-        plaintext = bytearray()
-        for i in range(num_blocks):
-            block = ct_bytes[i*8:(i+1)*8]
-            
-            # Send 'D' command
-            self.ser.write(b'D')
-            time.sleep(0.01)
-            
-            # Send 8 ciphertext bytes
-            self.ser.write(block)
-            
-            # Wait and receive 8 plaintext bytes
-            time.sleep(0.1)
-            pt_block = self.ser.read(8)
-            
-            if len(pt_block) != 8:
-                raise Exception(f"Expected 8 bytes, got {len(pt_block)}")
-            
-            plaintext.extend(pt_block)
+        # Decrypt every block in one pass, straight into its slot
+        plaintext = BlockBuffer(ct.num_blocks)
+        self.process_into(b'D', ct.buf, plaintext.buf, self.window)
         
-        # Remove PKCS#7 padding
-        padding_length = plaintext[-1]
-        if padding_length > 0 and padding_length <= 8:
-            if all(b == padding_length for b in plaintext[-padding_length:]):
-                plaintext = plaintext[:-padding_length]
+        # Remove PKCS#7 padding (single slice compare, no per-byte loop)
+        plaintext = plaintext.unpadded()
         
         # Convert to ASCII
         try:
-            return plaintext.decode('ascii')
+            return str(plaintext, 'ascii')
         except:
             # If contains non-ASCII, show hex
             return f"<non-ASCII: {plaintext.hex()}>"
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+SPECK64/128 Workload Trace Capture and Replay
+Records what a client did - when, which key, how many bytes, which
+direction, how long it took - but never the data or the key itself:
+
+    crypto.recorder = TraceRecorder("prod.trace")
+
+and re-drives that traffic shape against the board, the daemon or the pty
+emulator, reporting latency percentiles and throughput:
+
+    python speck_trace.py replay prod.trace --emulator --speed 10
+    python speck_trace.py replay prod.trace --port COM10
+    python speck_trace.py replay prod.trace --socket /tmp/speck_fpga.sock
+    python speck_trace.py summary prod.trace
+
+Trace format (little-endian): header 'SPKT' + version (u16) + start time
+(f64, epoch seconds), then one 21-byte record per operation:
+  t (u64, us since start) + op 'K'/'E'/'D' (1) + key id (4) +
+  size (u32, bytes on the wire) + elapsed (u32, us)
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import struct
+import sys
+import threading
+import time
+
+MAGIC = b'SPKT'
+VERSION = 1
+HEADER = struct.Struct('<4sHd')
+RECORD = struct.Struct('<Qc4sII')
+
+
+class TraceRecord:
+    def __init__(self, t, op, key_id, size, elapsed):
+        self.t = t              # Seconds since the trace started
+        self.op = op            # b'K', b'E' or b'D'
+        self.key_id = key_id    # 8 hex chars (speck_tool_final.key_id)
+        self.size = size        # Bytes (16 for 'K', a multiple of 8 otherwise)
+        self.elapsed = elapsed  # Seconds the original call took
+
+    def __repr__(self):
+        return (f"TraceRecord(t={self.t:.6f}, op={self.op.decode()}, key={self.key_id}, "
+                f"size={self.size}, elapsed={self.elapsed*1e3:.3f} ms)")
+
+
+class TraceRecorder:
+    def __init__(self, path):
+        """Start a new trace file at path (overwritten)"""
+        self.path = path
+        self.records = 0
+        self._start = time.perf_counter()
+        self._key_ids = {}
+        self._lock = threading.Lock()
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, time.time()))
+
+    def record(self, op, key_bytes, size, start, elapsed):
+        """Log one operation; start is a time.perf_counter() value"""
+        key = b'\0' * 4
+        if key_bytes is not None:
+            key = self._key_ids.get(key_bytes)
+            if key is None:
+                # Same fingerprint as key_id(), stored as 4 raw bytes
+                key = hashlib.sha256(bytes(key_bytes)).digest()[:4]
+                self._key_ids[key_bytes] = key
+        t = max(0, int((start - self._start) * 1e6))
+        packed = RECORD.pack(t, op, key, size, min(int(elapsed * 1e6), 0xffffffff))
+        with self._lock:
+            self._file.write(packed)
+            self.records += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_trace(path):
+    """All records of a trace file, in order"""
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise Exception(f"{path}: not a SPECK trace (too short)")
+        magic, version, _ = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise Exception(f"{path}: not a SPECK trace v{VERSION}")
+        body = f.read()
+    usable = len(body) - len(body) % RECORD.size  # Tolerate a torn last record
+    return [TraceRecord(t / 1e6, op, key.hex(), size, elapsed / 1e6)
+            for t, op, key, size, elapsed in RECORD.iter_unpack(body[:usable])]
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of values (0 if empty)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
+
+
+# ============================================================================
+# Replay
+# ============================================================================
+
+def replay_key(key_id):
+    """Stand-in 16-byte key for a recorded key id (same id -> same key)"""
+    return hashlib.sha256(b'speck-replay' + bytes.fromhex(key_id)).digest()[:16]
+
+
+class ReplayReport:
+    def __init__(self):
+        self.ops = 0
+        self.blocks = 0
+        self.key_loads = 0
+        self.elapsed = 0.0
+        self.latencies = []  # Seconds from scheduled start to completion
+        self.recorded = []   # The original elapsed times, for comparison
+
+    def summary(self):
+        def ms(values, p):
+            return percentile(values, p) * 1e3
+        lines = [f"  {self.ops} ops, {self.blocks} blocks, {self.key_loads} key loads "
+                 f"in {self.elapsed:.2f} s",
+                 f"  Throughput: {self.ops / self.elapsed if self.elapsed else 0:.1f} ops/s, "
+                 f"{self.blocks / self.elapsed if self.elapsed else 0:.0f} blocks/s"]
+        for name, values in (("replay", self.latencies), ("recorded", self.recorded)):
+            if values:
+                lines.append(f"  Latency {name:<8} p50 {ms(values, 50):8.2f} ms   "
+                             f"p90 {ms(values, 90):8.2f} ms   p99 {ms(values, 99):8.2f} ms   "
+                             f"max {max(values)*1e3:8.2f} ms")
+        return "\n".join(lines)
+
+
+def replay(records, target, speed=1.0):
+    """Re-drive records against target at `speed` x original pace (0 = as
+    fast as possible). target is a SPECKCrypto, or anything with
+    encrypt_blocks(key, data) / decrypt_blocks(key, data) such as
+    SPECKDaemonClient or KeyScheduler. Data is random, sized as recorded."""
+    report = ReplayReport()
+    per_key = hasattr(target, 'encrypt_blocks')
+    current = None
+    start = time.perf_counter()
+
+    for rec in records:
+        due = start + rec.t / speed if speed else time.perf_counter()
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+        key = replay_key(rec.key_id)
+        if rec.op == b'K':
+            if not per_key:
+                target.load_key_bytes(key)
+                current = key
+                report.key_loads += 1
+            continue
+
+        data = os.urandom(rec.size)
+        if per_key:
+            if rec.op == b'E':
+                target.encrypt_blocks(key, data)
+            else:
+                target.decrypt_blocks(key, data)
+        else:
+            if key != current:
+                target.load_key_bytes(key)
+                current = key
+                report.key_loads += 1
+            target.process_blocks(rec.op, data)
+
+        report.latencies.append(time.perf_counter() - due)
+        report.recorded.append(rec.elapsed)
+        report.ops += 1
+        report.blocks += rec.size // 8
+
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+# ============================================================================
+# Command line
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SPECK64/128 trace summary and replay")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('summary', help="print what a trace contains")
+    p.add_argument('trace')
+
+    p = sub.add_parser('replay', help="re-drive a trace and report latency")
+    p.add_argument('trace')
+    p.add_argument('--speed', type=float, default=1.0,
+                   help="pace multiplier (2 = twice as fast, 0 = no pacing)")
+    target = p.add_mutually_exclusive_group(required=True)
+    target.add_argument('--port', help="serial port of the board")
+    target.add_argument('--socket', help="speck_daemon.py socket")
+    target.add_argument('--emulator', action='store_true', help="pty emulator")
+    args = parser.parse_args(argv)
+
+    records = read_trace(args.trace)
+
+    if args.command == 'summary':
+        ops = [r for r in records if r.op != b'K']
+        span = records[-1].t if records else 0.0
+        print(f"  {len(records)} records over {span:.2f} s, "
+              f"{len({r.key_id for r in records})} keys")
+        for op in (b'K', b'E', b'D'):
+            n = sum(1 for r in records if r.op == op)
+            print(f"    {op.decode()}: {n}")
+        if ops:
+            sizes = [r.size for r in ops]
+            print(f"  Size p50 {percentile(sizes, 50)} B, p99 {percentile(sizes, 99)} B, "
+                  f"max {max(sizes)} B")
+        return 0
+
+    emulator = None
+    if args.socket:
+        from speck_daemon import SPECKDaemonClient
+        target = SPECKDaemonClient(args.socket)
+        name = f"daemon {args.socket}"
+    else:
+        from speck_tool_final import SPECKCrypto
+        port = args.port
+        if args.emulator:
+            from speck_emulator import SPECKEmulator
+            emulator = SPECKEmulator()
+            port = emulator.port
+        target = SPECKCrypto(port, verbose=False)
+        name = "emulator" if args.emulator else port
+
+    print(f"  Replaying {len(records)} records against {name} at "
+          f"{'max' if not args.speed else f'{args.speed:g}x'} speed...")
+    try:
+        report = replay(records, target, args.speed)
+    finally:
+        target.close()
+        if emulator:
+            emulator.close()
+    print(report.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+SPECK64/128 Hardware Output Verifier
+Re-computes a sampled fraction of FPGA results with the software model on a
+background thread and flags mismatches. The sample is drawn when a pass is
+handed over and only those blocks are copied, so the hot path costs about
+sample_rate of a pass copy. Opt-in:
+
+    crypto.verifier = OutputVerifier(sample_rate=0.05)
+"""
+
+import queue
+import random
+import threading
+
+import speck_model
+from speck_tool_final import key_id
+
+
+class Mismatch:
+    def __init__(self, block_index, key_id, op, block, expected, got):
+        self.block_index = block_index  # running block count since verifier start (any size)
+        self.key_id = key_id
+        self.op = op
+        self.block = block
+        self.expected = expected
+        self.got = got
+
+    def __repr__(self):
+        return (f"Mismatch(block={self.block_index}, key={self.key_id}, "
+                f"op={self.op.decode()}, in={self.block.hex()}, "
+                f"expected={self.expected.hex()}, got={self.got.hex()})")
+
+
+class OutputVerifier:
+    def __init__(self, sample_rate=0.01, on_mismatch=None, max_queue=1024, seed=None):
+        """Check roughly `sample_rate` of all blocks against the software model
+
+        on_mismatch: optional callback(Mismatch), run on the verifier thread
+        max_queue:   pending batches kept; beyond that batches are skipped so
+                     the hot path never blocks
+        """
+        self.sample_rate = sample_rate
+        self.on_mismatch = on_mismatch
+        self.mismatches = []
+        self.errors = []  # Exceptions raised while checking (batch skipped)
+
+        self.blocks_seen = 0
+        self.blocks_checked = 0
+        self.batches_skipped = 0
+
+        self._rng = random.Random(seed)
+        self._round_keys = {}
+        self._queue = queue.Queue(max_queue)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, op, key, data, result, block_size=8):
+        """Hand over one device pass (hot path: copies only the sampled
+        blocks, no crypto). data and result may be reused once this
+        returns. block_size 16 checks against SPECK128/128."""
+        bs = block_size
+        num_blocks = len(data) // bs
+        base = self.blocks_seen
+        self.blocks_seen += num_blocks
+        indices = self._sample(num_blocks)
+        if not indices:
+            return
+        sampled_in = b''.join(data[i*bs:(i+1)*bs] for i in indices)
+        sampled_out = b''.join(result[i*bs:(i+1)*bs] for i in indices)
+        try:
+            self._queue.put_nowait((op, key, indices, sampled_in, sampled_out, base, bs))
+        except queue.Full:
+            self.batches_skipped += 1
+
+    def flush(self):
+        """Wait until every submitted batch has been checked"""
+        self._queue.join()
+
+    def close(self):
+        """Check what is queued and stop the thread"""
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+
+    # ========================================================================
+    # Background checking
+    # ========================================================================
+
+    def _sample(self, num_blocks):
+        """Pick block indices to check (Bernoulli sample at sample_rate)"""
+        if self.sample_rate >= 1:
+            return list(range(num_blocks))
+        # Round the fractional pick at random so 1-block passes are
+        # still sampled at sample_rate on average
+        count = int(num_blocks * self.sample_rate)
+        if self._rng.random() < num_blocks * self.sample_rate - count:
+            count += 1
+        return sorted(self._rng.sample(range(num_blocks), min(count, num_blocks)))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            try:
+                self._check(*item)
+            except Exception as e:
+                # Keep the thread alive, or every later flush() would hang
+                self.errors.append(e)
+            finally:
+                self._queue.task_done()
+
+    def _check(self, op, key, indices, sampled_in, sampled_out, base, bs):
+        rk = self._round_keys.get((key, bs))
+        if rk is None:
+            if len(self._round_keys) >= 64:
+                self._round_keys.clear()
+            rk = self._round_keys[(key, bs)] = speck_model.key_schedule(key, bs)
+
+        model = speck_model.encrypt_array if op == b'E' else speck_model.decrypt_array
+        expected = model(sampled_in, rk)
+        self.blocks_checked += len(indices)
+
+        for n, i in enumerate(indices):
+            exp = expected[n*bs:(n+1)*bs]
+            got = sampled_out[n*bs:(n+1)*bs]
+            if exp != got:
+                m = Mismatch(base + i, key_id(key), op, sampled_in[n*bs:(n+1)*bs], exp, got)
+                self.mismatches.append(m)
+                if self.on_mismatch:
+                    self.on_mismatch(m)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Emulator Test: 64 Threads Sharing One FPGA
+Compares a lock around SPECKCrypto (one request per device pass) with
+SPECKClient (one I/O thread coalescing every queued request)
+"""
+
+import random
+import threading
+import time
+
+import speck_model
+from speck_client import SPECKClient
+from speck_emulator import SPECKEmulator
+from speck_tool_final import SPECKCrypto
+
+NUM_THREADS = 64
+REQUESTS_PER_THREAD = 10
+BAUD_RATE = 115200
+KEY = bytes.fromhex("00010203 08090a0b 10111213 18191a1b")
+
+
+class LockedClient:
+    """Baseline: every thread takes a lock and drives the port itself"""
+
+    def __init__(self, crypto):
+        self.crypto = crypto
+        self.lock = threading.Lock()
+
+    def encrypt_blocks(self, key, data):
+        with self.lock:
+            if self.crypto.key_bytes != key:
+                self.crypto.load_key_bytes(key)
+            return self.crypto.process_blocks(b'E', data)
+
+
+def run_threads(client):
+    """Each thread encrypts its own 1-block requests; returns (seconds, errors)"""
+    rk = speck_model.key_schedule(KEY)
+    errors = []
+    barrier = threading.Barrier(NUM_THREADS + 1)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        barrier.wait()
+        for _ in range(REQUESTS_PER_THREAD):
+            block = rng.randbytes(8)
+            if client.encrypt_blocks(KEY, block) != speck_model.encrypt_block(block, rk):
+                errors.append(seed)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(NUM_THREADS)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, len(errors)
+
+
+def main():
+    print("="*60)
+    print(f"SPECK64/128 Client Test - Emulated FPGA, {NUM_THREADS} Threads")
+    print("="*60)
+
+    total = NUM_THREADS * REQUESTS_PER_THREAD
+
+    with SPECKEmulator(baud=BAUD_RATE) as emu:
+        crypto = SPECKCrypto(emu.port, BAUD_RATE)
+
+        locked_time, locked_errors = run_threads(LockedClient(crypto))
+
+        with SPECKClient(crypto) as client:
+            queued_time, queued_errors = run_threads(client)
+            s = client.stats()
+
+        crypto.close()
+
+    print(f"\n  Locked:  {total/locked_time:7.0f} blocks/s   {total} device passes")
+    print(f"  Queued:  {total/queued_time:7.0f} blocks/s   {s['device_passes']} device passes "
+          f"({s['requests_per_pass']:.1f} requests/pass)")
+    print(f"  Speedup: {locked_time/queued_time:.2f}x")
+
+    print()
+    errors = locked_errors + queued_errors
+    if not errors and s['requests'] == total:
+        print("  ✅ PASS - Every thread got its own results")
+    else:
+        print(f"  ❌ FAIL - {errors} mismatches")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Emulator Test: Hardware Output Verifier
+Measures what sampled verification costs in throughput (fault injection is
+covered by tests/test_verifier.py)
+"""
+
+import os
+import sys
+import time
+
+from speck_emulator import SPECKEmulator
+from speck_tool_final import SPECKCrypto
+from speck_verifier import OutputVerifier
+
+NUM_BLOCKS = 1000
+PASS_BLOCKS = 50
+BAUD_RATE = 115200
+SAMPLE_RATE = 0.05
+KEY = bytes(range(16))
+
+
+def run(emu, data, verifier=None):
+    """Encrypt `data` through the emulator; returns (seconds, verifier)"""
+    crypto = SPECKCrypto(emu.port, BAUD_RATE)
+    crypto.verifier = verifier
+    crypto.load_key_bytes(KEY)
+    start = time.perf_counter()
+    # Passes of PASS_BLOCKS so checking overlaps with device I/O
+    for i in range(0, len(data), PASS_BLOCKS * 8):
+        crypto.process_blocks(b'E', data[i:i + PASS_BLOCKS * 8])
+    elapsed = time.perf_counter() - start
+    if verifier:
+        verifier.close()
+    crypto.close()
+    return elapsed
+
+
+def main():
+    print("="*60)
+    print("SPECK64/128 Verifier Test - Emulated FPGA, Sampling Cost")
+    print("="*60)
+
+    data = os.urandom(NUM_BLOCKS * 8)
+
+    with SPECKEmulator(baud=BAUD_RATE) as emu:
+        base_time = run(emu, data)
+    with SPECKEmulator(baud=BAUD_RATE) as emu:
+        sampled = OutputVerifier(sample_rate=SAMPLE_RATE)
+        sampled_time = run(emu, data, sampled)
+    cost = (sampled_time - base_time) / base_time
+
+    print(f"\n  Without verifier: {NUM_BLOCKS/base_time:.0f} blocks/s")
+    print(f"  Sampling {SAMPLE_RATE:.0%}:    {NUM_BLOCKS/sampled_time:.0f} blocks/s "
+          f"({sampled.blocks_checked} checked, cost {cost:+.1%})")
+
+    print()
+    ok = not sampled.mismatches and not sampled.errors and cost < 0.05
+    if ok:
+        print("  ✅ PASS - No mismatches, cost under 5%")
+    else:
+        print("  ❌ FAIL - Unexpected mismatches or cost too much")
+    print("="*60)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
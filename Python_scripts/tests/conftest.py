@@ -0,0 +1,34 @@
+"""
+Shared fixtures: pty emulator of the FPGA and a SPECKCrypto connected to it
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# NSA SPECK64/128 test vector, in the byte order the FPGA uses
+NSA_KEY = bytes([0x00, 0x01, 0x02, 0x03, 0x08, 0x09, 0x0a, 0x0b,
+                 0x10, 0x11, 0x12, 0x13, 0x18, 0x19, 0x1a, 0x1b])
+NSA_PT = bytes([0x2d, 0x43, 0x75, 0x74, 0x74, 0x65, 0x72, 0x3b])
+NSA_CT = bytes([0x8b, 0x02, 0x4e, 0x45, 0x48, 0xa5, 0x6f, 0x8c])
+
+
+@pytest.fixture
+def emulator():
+    if sys.platform == 'win32':
+        pytest.skip("pty emulator needs Linux/macOS")
+    from speck_emulator import SPECKEmulator
+    with SPECKEmulator() as emu:
+        yield emu
+
+
+@pytest.fixture
+def crypto(emulator):
+    pytest.importorskip("serial")
+    from speck_tool_final import SPECKCrypto
+    c = SPECKCrypto(emulator.port)
+    yield c
+    c.close()
@@ -0,0 +1,144 @@
+"""
+Client admission control: queue limits, deadlines, shedding under overload
+"""
+
+import threading
+from concurrent.futures import wait
+
+import pytest
+
+from conftest import NSA_CT, NSA_KEY, NSA_PT
+from speck_client import SPECKClient
+from speck_emulator import SPECKEmulator
+from speck_tool_final import SPECKCrypto
+
+BAUD = 115200
+
+
+@pytest.fixture
+def link_crypto():
+    """SPECKCrypto on an emulator that paces both directions at 115200 baud"""
+    with SPECKEmulator(baud=BAUD) as emu:
+        crypto = SPECKCrypto(emu.port, BAUD, verbose=False)
+        yield crypto
+        crypto.close()
+
+
+def test_queue_limit_rejects(link_crypto):
+    with SPECKClient(link_crypto, max_queue_blocks=64) as client:
+        client.load_key_bytes(NSA_KEY)
+        futures = [client.submit(b'E', NSA_PT * 32) for _ in range(2)]
+        with pytest.raises(Exception, match="Rejected: queue full"):
+            client.submit(b'E', NSA_PT * 32)
+        wait(futures)
+        assert all(f.exception() is None for f in futures)
+        s = client.stats()
+        assert s['rejected'] == 1 and s['peak_queue_blocks'] <= 64
+        assert s['queue_blocks'] == 0 and s['queue_bytes'] == 0
+
+
+def test_byte_limit(crypto):
+    with SPECKClient(crypto, max_queue_bytes=64) as client:
+        client.load_key_bytes(NSA_KEY)
+        with pytest.raises(Exception, match="64 bytes"):
+            client.submit(b'E', NSA_PT * 9)
+        assert len(client.process_blocks(b'E', NSA_PT * 8)) == 64
+
+
+def test_unmeetable_deadline_rejected_at_submit(crypto):
+    with SPECKClient(crypto, deadline=1, link_rate=1000) as client:
+        client.load_key_bytes(NSA_KEY)
+        with pytest.raises(Exception, match="exceeds the 50 ms deadline less its 25% margin"):
+            client.submit(b'E', NSA_PT * 100, deadline=0.05)
+        assert len(client.process_blocks(b'E', NSA_PT * 10, deadline=0.05)) == 80
+        assert client.stats()['rejected'] == 1
+
+
+def test_late_request_shed_before_sending(link_crypto):
+    # An optimistic rate admits both; the small one (a separate pass) then
+    # waits behind the big one and is shed instead of sent after its deadline
+    with SPECKClient(link_crypto, link_rate=1e6) as client:
+        client.load_key_bytes(NSA_KEY)
+        big = client.submit(b'E', NSA_PT * 200)
+        small = client.submit(b'D', NSA_PT, deadline=0.02)
+        assert len(big.result()) == 1600
+        with pytest.raises(Exception, match="Shed"):
+            small.result()
+        s = client.stats()
+        assert s['shed'] == 1 and s['shed_rate'] == 0.5
+        assert s['queue_blocks'] == 0
+
+
+def test_late_result_fails(link_crypto):
+    # An optimistic rate sends 100 blocks (~0.2 s on the wire) against a
+    # 50 ms deadline: the deadline passes mid-pass and the result is dropped
+    with SPECKClient(link_crypto, link_rate=1e6, margin=0) as client:
+        client.load_key_bytes(NSA_KEY)
+        with pytest.raises(Exception, match="Late"):
+            client.process_blocks(b'E', NSA_PT * 100, deadline=0.05)
+        assert client.process_blocks(b'E', NSA_PT) == NSA_CT
+        s = client.stats()
+        assert s['late'] == 1 and s['shed_rate'] == 0.5
+
+
+def test_no_admission_lock_without_limits(crypto):
+    class NoLock:
+        def __enter__(self):
+            raise AssertionError("submit took the admission lock")
+
+    with SPECKClient(crypto) as client:
+        client._admit_lock = NoLock()
+        client.load_key_bytes(NSA_KEY)
+        futures = [client.submit(b'E', NSA_PT) for _ in range(10)]
+        futures.append(client.submit(b'E', NSA_PT, deadline=10))
+        assert [f.result() for f in futures] == [NSA_CT] * 11
+
+
+def test_link_rate_measured(link_crypto):
+    with SPECKClient(link_crypto, link_rate=1e6) as client:
+        client.load_key_bytes(NSA_KEY)
+        for _ in range(10):
+            client.process_blocks(b'E', NSA_PT * 50)
+        # 17 wire bytes per block at 115200 baud: 678 blocks/s at best
+        assert 200 < client.stats()['link_rate'] < 700
+
+
+def test_overload_keeps_latency_bounded(link_crypto):
+    """16 threads offering ~4x the link rate with a 100 ms deadline: the
+    excess is turned away and everything that completes meets the deadline"""
+    deadline = 0.1
+    refused = []
+    done = []
+    lock = threading.Lock()
+
+    with SPECKClient(link_crypto, deadline=deadline) as client:
+        client.load_key_bytes(NSA_KEY)
+        barrier = threading.Barrier(16)
+
+        def worker():
+            barrier.wait()
+            for _ in range(20):
+                try:
+                    client.process_blocks(b'E', NSA_PT * 8)
+                    outcome = done
+                except Exception as e:
+                    assert str(e).startswith(("Rejected", "Shed", "Late"))
+                    outcome = refused
+                with lock:
+                    outcome.append(1)
+
+        threads = [threading.Thread(target=worker) for _ in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        s = client.stats()
+
+    assert len(done) + len(refused) == 320
+    assert done and refused
+    assert s['rejected'] + s['shed'] + s['late'] == len(refused)
+    assert s['latency_p99'] <= deadline
+    # The margin keeps late results rare: most refusals cost no link time
+    assert s['late'] <= len(refused) // 10
+    # Never more queued than the deadline's worth at the best-case wire rate
+    assert s['peak_queue_blocks'] <= deadline * BAUD / 10 / 17
@@ -0,0 +1,145 @@
+"""
+BlockBuffer: padding, word views and allocation-free result collection
+"""
+
+import os
+import tracemalloc
+
+import pytest
+
+import speck_model
+from speck_buffer import BlockBuffer
+from speck_tool_final import SPECKCrypto, pkcs7_pad
+
+
+class InstantSerial:
+    """In-process stand-in for the port: answers every 'E'/'D' frame in a
+    write with its payload bytes (and swallows 'K', 'P', 'S'), so only
+    host-side allocations are measured"""
+
+    FRAME_SIZES = {ord('E'): 9, ord('D'): 9, ord('K'): 17, ord('P'): 17, ord('S'): 1}
+
+    def __init__(self):
+        self.pending = bytearray()
+
+    def write(self, data):
+        i = 0
+        while i < len(data):
+            size = self.FRAME_SIZES[data[i]]
+            if data[i] in (ord('E'), ord('D')):
+                self.pending += data[i + 1:i + size]
+            i += size
+        return len(data)
+
+    def readinto(self, b):
+        n = min(len(b), len(self.pending))
+        b[:n] = self.pending[:n]
+        del self.pending[:n]
+        return n
+
+    def read(self, n):
+        out = bytes(self.pending[:n])
+        del self.pending[:n]
+        return out
+
+    def reset_input_buffer(self):
+        self.pending.clear()
+
+    def reset_output_buffer(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def instant_crypto():
+    return SPECKCrypto(InstantSerial(), settle=0, verbose=False)
+
+
+@pytest.mark.parametrize("length", range(0, 18))
+def test_padded_matches_pkcs7(length):
+    data = os.urandom(length)
+    bb = BlockBuffer.padded(data)
+    assert bb.tobytes() == pkcs7_pad(data)
+    assert bytes(bb.unpadded()) == data
+
+
+def test_unpadded_leaves_invalid_padding():
+    bb = BlockBuffer.from_bytes(b"abcdefg\x03")
+    assert bb.padding_length() == 0
+    assert bytes(bb.unpadded()) == b"abcdefg\x03"
+
+
+def test_empty_buffer():
+    bb = BlockBuffer(0)
+    assert len(bb) == 0
+    assert bytes(bb.unpadded()) == b''
+
+
+def test_from_bytes_rejects_partial_block():
+    with pytest.raises(Exception):
+        BlockBuffer.from_bytes(bytes(9))
+
+
+def test_word_views_match_model_convention():
+    pytest.importorskip("numpy")
+    bb = BlockBuffer.from_bytes(bytes([0x2d, 0x43, 0x75, 0x74, 0x74, 0x65, 0x72, 0x3b]))
+    assert int(bb.y[0]) == 0x7475432d
+    assert int(bb.x[0]) == 0x3b726574
+
+
+def test_word_views_are_writable_views():
+    pytest.importorskip("numpy")
+    bb = BlockBuffer(2)
+    bb.x[1] = 0x01020304
+    assert bb.block(1).tobytes() == bytes([0, 0, 0, 0, 4, 3, 2, 1])
+
+
+def test_block_views_write_through():
+    bb = BlockBuffer(3)
+    bb.block(1)[:] = b"ABCDEFGH"
+    assert bb.tobytes() == bytes(8) + b"ABCDEFGH" + bytes(8)
+
+
+def test_process_into_emulator(crypto):
+    key = os.urandom(16)
+    data = os.urandom(8 * 200)
+    out = BlockBuffer(200)
+    crypto.load_key_bytes(key)
+    crypto.process_into(b'E', data, out.buf)
+    assert out.tobytes() == speck_model.encrypt_blocks(data, speck_model.key_schedule(key))
+
+
+def test_process_into_rejects_wrong_size(crypto):
+    with pytest.raises(Exception):
+        crypto.process_into(b'E', bytes(16), bytearray(8))
+
+
+@pytest.mark.parametrize("window", [1, 8])
+def test_instant_serial_echoes_packed_frames(window):
+    crypto = instant_crypto()
+    crypto.load_key_bytes(bytes(16))
+    data = os.urandom(8 * 100)
+    out = BlockBuffer(100)
+    crypto.process_into(b'E', data, out.buf, window)
+    assert out.tobytes() == data
+
+
+def peak_alloc(num_blocks):
+    """Peak traced memory while collecting num_blocks results, minus the
+    input and output buffers themselves"""
+    crypto = instant_crypto()
+    data = bytes(num_blocks * 8)
+    out = BlockBuffer(num_blocks)
+    tracemalloc.start()
+    crypto.process_into(b'E', data, out.buf)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def test_hot_loop_memory_does_not_grow_with_blocks():
+    small = peak_alloc(1_000)
+    large = peak_alloc(100_000)
+    # Per-block objects would add >= 3 MB here (100k x 33-byte bytes)
+    assert large - small < 64 * 1024
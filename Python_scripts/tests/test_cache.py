@@ -0,0 +1,91 @@
+"""
+BlockCache: hits answered locally, both directions, LRU bound, key rotation
+"""
+
+import random
+
+import speck_model
+from conftest import NSA_CT, NSA_KEY, NSA_PT
+from speck_cache import ENTRY_BYTES, BlockCache
+
+
+def cached_crypto(crypto, max_bytes=1 << 20):
+    crypto.cache = BlockCache(max_bytes)
+    crypto.load_key_bytes(NSA_KEY)
+    return crypto
+
+
+def test_repeated_blocks_sent_once(crypto, emulator):
+    cached_crypto(crypto)
+    header = bytes(range(8))
+    data = header * 50 + NSA_PT + header * 50
+
+    result = crypto.process_blocks(b'E', data)
+
+    rk = speck_model.key_schedule(NSA_KEY)
+    assert result == speck_model.encrypt_blocks(data, rk)
+    assert emulator.blocks_encrypted == 2
+    assert crypto.cache.hits == 99
+    assert crypto.cache.misses == 2
+
+
+def test_hits_skip_the_device(crypto, emulator):
+    cached_crypto(crypto)
+    crypto.process_blocks(b'E', NSA_PT)
+    for _ in range(10):
+        assert crypto.process_blocks(b'E', NSA_PT) == NSA_CT
+    assert emulator.blocks_encrypted == 1
+    assert crypto.cache.hit_rate == 10 / 11
+
+
+def test_encrypt_result_serves_decrypt(crypto, emulator):
+    cached_crypto(crypto)
+    crypto.process_blocks(b'E', NSA_PT)
+    assert crypto.process_blocks(b'D', NSA_CT) == NSA_PT
+    assert emulator.blocks_decrypted == 0
+
+
+def test_key_rotation_wipes(crypto, emulator):
+    cached_crypto(crypto)
+    crypto.process_blocks(b'E', NSA_PT)
+    crypto.load_key_bytes(NSA_KEY)  # same key again: entries kept
+    assert len(crypto.cache) == 2
+
+    other = bytes(16)
+    crypto.load_key_bytes(other)
+    assert len(crypto.cache) == 0
+    assert crypto.cache.wipes == 1
+    expected = speck_model.encrypt_block(NSA_PT, speck_model.key_schedule(other))
+    assert crypto.process_blocks(b'E', NSA_PT) == expected
+    assert emulator.blocks_encrypted == 2
+
+
+def test_memory_bound(crypto):
+    cached_crypto(crypto, max_bytes=100 * ENTRY_BYTES)
+    data = random.Random(0).randbytes(8 * 300)
+    crypto.process_blocks(b'E', data)
+    stats = crypto.cache.stats()
+    assert stats['entries'] == 100
+    assert stats['bytes'] <= 100 * ENTRY_BYTES
+    assert stats['evictions'] == 500
+
+
+def test_least_recently_used_evicted_first():
+    cache = BlockCache(max_bytes=4 * ENTRY_BYTES)
+    cache.set_key(NSA_KEY)
+    cache.put(b'E', b'a' * 8, b'A' * 8)
+    cache.put(b'E', b'b' * 8, b'B' * 8)
+    assert cache.get(b'E', b'a' * 8) == b'A' * 8  # a is now most recent
+    cache.put(b'E', b'c' * 8, b'C' * 8)
+    assert cache.get(b'E', b'b' * 8) is None
+    assert cache.get(b'E', b'a' * 8) == b'A' * 8
+    assert cache.get(b'D', b'C' * 8) == b'c' * 8
+
+
+def test_legacy_encrypt_uses_cache(crypto, emulator):
+    cached_crypto(crypto)
+    ct_hex = crypto.encrypt("ABCDEFG")  # one block incl. padding
+    assert crypto.encrypt("ABCDEFG") == ct_hex
+    assert crypto.decrypt(ct_hex) == "ABCDEFG"
+    assert emulator.blocks_encrypted == 1
+    assert emulator.blocks_decrypted == 0
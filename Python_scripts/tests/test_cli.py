@@ -0,0 +1,142 @@
+"""
+One-shot CLI: round trips via the daemon and direct port, exit codes
+"""
+
+import os
+import socket
+import subprocess
+import sys
+
+import pytest
+
+import speck_cli
+from conftest import NSA_CT, NSA_KEY, NSA_PT
+
+
+@pytest.fixture
+def files(tmp_path):
+    key_file = tmp_path / "key.bin"
+    key_file.write_bytes(NSA_KEY)
+    return tmp_path, str(key_file)
+
+
+@pytest.fixture
+def daemon(crypto, tmp_path):
+    from speck_daemon import SPECKDaemon
+    d = SPECKDaemon(crypto, str(tmp_path / "speck.sock"))
+    d.start()
+    yield d
+    d.stop()
+
+
+def round_trip(tmp_path, key_file, extra, message):
+    (tmp_path / "msg.txt").write_bytes(message)
+    enc = ['enc', '--key-file', key_file, '--in', str(tmp_path / "msg.txt"),
+           '--out', str(tmp_path / "msg.enc")] + extra
+    dec = ['dec', '--key-file', key_file, '--in', str(tmp_path / "msg.enc"),
+           '--out', str(tmp_path / "msg.out")] + extra
+    assert speck_cli.main(enc) == speck_cli.EXIT_OK
+    assert speck_cli.main(dec) == speck_cli.EXIT_OK
+    return (tmp_path / "msg.enc").read_bytes(), (tmp_path / "msg.out").read_bytes()
+
+
+@pytest.mark.parametrize("message", [b"", b"short", b"exactly8", "naïve ✓".encode()])
+def test_round_trip_direct(emulator, files, message):
+    tmp_path, key_file = files
+    extra = ['--port', emulator.port, '--settle', '0']
+    ct, out = round_trip(tmp_path, key_file, extra, message)
+    assert len(ct) == (len(message) // 8 + 1) * 8
+    assert out == message
+
+
+def test_round_trip_via_daemon(daemon, files):
+    tmp_path, key_file = files
+    ct, out = round_trip(tmp_path, key_file, ['--socket', daemon.socket_path], b"via daemon")
+    assert out == b"via daemon"
+    assert daemon.stats['requests'] == 2
+
+
+def stale_socket(path):
+    """Socket file with no daemon behind it, as left by a crash"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    sock.close()
+    return path
+
+
+def test_stale_default_socket_falls_back(emulator, files, monkeypatch):
+    tmp_path, key_file = files
+    monkeypatch.setenv('SPECK_SOCKET', stale_socket(str(tmp_path / "dead.sock")))
+    monkeypatch.setenv('SPECK_PORT', emulator.port)
+    ct, out = round_trip(tmp_path, key_file, ['--settle', '0'], b"no daemon")
+    assert out == b"no daemon"
+    assert emulator.key_loads == 2
+
+
+def test_stale_explicit_socket_is_an_error(files):
+    tmp_path, key_file = files
+    path = stale_socket(str(tmp_path / "dead.sock"))
+    (tmp_path / "msg.txt").write_bytes(b"x")
+    rc = speck_cli.main(['enc', '--key-file', key_file, '--in', str(tmp_path / "msg.txt"),
+                         '--out', str(tmp_path / "msg.enc"), '--socket', path])
+    assert rc == speck_cli.EXIT_DEVICE
+
+
+def test_decrypt_hex_input(crypto, emulator, files, capsys):
+    tmp_path, key_file = files
+    crypto.load_key_bytes(NSA_KEY)
+    padded_ct = crypto.process_blocks(b'E', NSA_PT + bytes([8] * 8))
+    assert padded_ct[:8] == NSA_CT
+    (tmp_path / "ct.hex").write_text(padded_ct.hex() + "\n")
+
+    rc = speck_cli.main(['dec', '--key-file', key_file, '--in', str(tmp_path / "ct.hex"),
+                         '--hex', '--port', emulator.port, '--settle', '0'])
+    assert rc == speck_cli.EXIT_OK
+    assert capsys.readouterr().out.encode('latin-1') == NSA_PT
+
+
+def test_ascii_key_file_matches_load_key(tmp_path):
+    key_file = tmp_path / "key.txt"
+    key_file.write_bytes(b"MySecretKey\n")
+    assert speck_cli.read_key(str(key_file)) == b"MySecretKey\0\0\0\0\0"
+
+
+def test_wrong_key_reports_bad_padding(emulator, files):
+    tmp_path, key_file = files
+    extra = ['--port', emulator.port, '--settle', '0']
+    (tmp_path / "msg.txt").write_bytes(b"secret")
+    speck_cli.main(['enc', '--key-file', key_file, '--in', str(tmp_path / "msg.txt"),
+                    '--out', str(tmp_path / "msg.enc")] + extra)
+    other = tmp_path / "other.bin"
+    # Fixed, not random: a random key leaves valid padding 1 time in ~256
+    other.write_bytes(bytes(range(16, 32)))
+    rc = speck_cli.main(['dec', '--key-file', str(other), '--in', str(tmp_path / "msg.enc"),
+                         '--out', str(tmp_path / "msg.out")] + extra)
+    assert rc == speck_cli.EXIT_BAD_PADDING
+
+
+def test_missing_key_file(tmp_path):
+    rc = speck_cli.main(['enc', '--key-file', str(tmp_path / "nope"), '--in', '-'])
+    assert rc == speck_cli.EXIT_ERROR
+
+
+def test_truncated_ciphertext(files):
+    tmp_path, key_file = files
+    (tmp_path / "bad.enc").write_bytes(b"1234567")
+    rc = speck_cli.main(['dec', '--key-file', key_file, '--in', str(tmp_path / "bad.enc")])
+    assert rc == speck_cli.EXIT_ERROR
+
+
+def test_unreachable_device(files, tmp_path):
+    _, key_file = files
+    (tmp_path / "msg.txt").write_bytes(b"x")
+    rc = speck_cli.main(['enc', '--key-file', key_file, '--in', str(tmp_path / "msg.txt"),
+                         '--port', str(tmp_path / "no-such-port"), '--settle', '0'])
+    assert rc == speck_cli.EXIT_DEVICE
+
+
+def test_startup_imports_stay_lean():
+    code = "import speck_cli, sys; print('tkinter' in sys.modules, 'serial' in sys.modules)"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                         cwd=os.path.dirname(speck_cli.__file__)).stdout
+    assert out.split() == ['False', 'False']
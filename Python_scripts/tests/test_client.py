@@ -0,0 +1,144 @@
+"""
+Thread-safe client: many submitting threads, one I/O thread, in-order futures
+"""
+
+import random
+import threading
+import time
+
+import pytest
+
+import speck_model
+from conftest import NSA_CT, NSA_KEY, NSA_PT
+from speck_client import _STOP, SPECKClient
+
+NUM_THREADS = 64
+REQUESTS_PER_THREAD = 20
+
+
+@pytest.fixture
+def client(crypto):
+    with SPECKClient(crypto) as c:
+        yield c
+
+
+def test_nsa_vector(client):
+    client.load_key_bytes(NSA_KEY)
+    assert client.process_blocks(b'E', NSA_PT) == NSA_CT
+    assert client.process_blocks(b'D', NSA_CT) == NSA_PT
+
+
+def test_text_round_trip(client):
+    client.load_key_bytes(NSA_KEY)
+    assert client.decrypt(client.encrypt("Hello from many threads")) == "Hello from many threads"
+
+
+def test_requires_key(client):
+    with pytest.raises(Exception, match="No 16-byte key"):
+        client.submit(b'E', NSA_PT)
+
+
+def test_futures_complete_in_submission_order(client):
+    client.load_key_bytes(NSA_KEY)
+    done = []
+    futures = [client.submit(b'E' if i % 3 else b'D', bytes([i]) * 8) for i in range(30)]
+    for i, f in enumerate(futures):
+        f.add_done_callback(lambda _, i=i: done.append(i))
+    for f in futures:
+        f.result()
+    assert done == list(range(30))
+
+
+def test_stress_many_threads(crypto, emulator):
+    """64 threads, mixed keys, ops and sizes; every result must be its own"""
+    keys = [NSA_KEY, bytes(range(16, 32)), bytes(range(100, 116))]
+    round_keys = {k: speck_model.key_schedule(k) for k in keys}
+    errors = []
+    barrier = threading.Barrier(NUM_THREADS + 1)
+
+    with SPECKClient(crypto) as client:
+        def worker(seed):
+            rng = random.Random(seed)
+            barrier.wait()
+            for _ in range(REQUESTS_PER_THREAD):
+                key = rng.choice(keys)
+                data = rng.randbytes(8 * rng.randint(1, 4))
+                if rng.random() < 0.5:
+                    got = client.encrypt_blocks(key, data)
+                    want = speck_model.encrypt_blocks(data, round_keys[key])
+                else:
+                    got = client.decrypt_blocks(key, data)
+                    want = speck_model.decrypt_blocks(data, round_keys[key])
+                if got != want:
+                    errors.append(seed)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(NUM_THREADS)]
+        for t in threads:
+            t.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        stats = client.stats()
+
+    assert errors == []
+    assert stats['requests'] == NUM_THREADS * REQUESTS_PER_THREAD
+    assert stats['blocks'] == emulator.blocks_encrypted + emulator.blocks_decrypted
+    # Concurrent submissions are coalesced into shared device passes
+    assert stats['requests_per_pass'] > 1
+    print(f"\n  {NUM_THREADS} threads: {stats['blocks'] / elapsed:.0f} blocks/s aggregate, "
+          f"{stats['requests_per_pass']:.1f} requests/pass")
+
+
+def test_device_error_fails_only_that_pass(client, crypto):
+    client.load_key_bytes(NSA_KEY)
+    write = crypto.ser.write
+    calls = []
+
+    def flaky(data):
+        calls.append(len(data))
+        if len(calls) == 3:  # K, E, then this E
+            raise Exception("link down")
+        return write(data)
+
+    crypto.ser.write = flaky
+    assert client.process_blocks(b'E', NSA_PT) == NSA_CT
+    with pytest.raises(Exception, match="link down"):
+        client.process_blocks(b'E', NSA_PT)
+    assert client.process_blocks(b'E', NSA_PT) == NSA_CT   # Key reloaded
+    assert crypto.key_bytes == NSA_KEY
+
+
+def test_closed_client_rejects_work(crypto):
+    client = SPECKClient(crypto)
+    client.load_key_bytes(NSA_KEY)
+    client.close()
+    with pytest.raises(Exception, match="closed"):
+        client.submit(b'E', NSA_PT)
+
+
+def test_submit_racing_close_fails_instead_of_hanging(crypto):
+    """close() runs between submit's closed check and its put: the request
+    lands behind the stop sentinel and must still be resolved"""
+    client = SPECKClient(crypto)
+    client.load_key_bytes(NSA_KEY)
+
+    class RacingQueue:
+        def __init__(self, inner):
+            self.inner = inner
+            self.raced = False
+
+        def put(self, item):
+            if item is not _STOP and not self.raced:
+                self.raced = True
+                client.close()
+            self.inner.put(item)
+
+        def __getattr__(self, name):
+            return getattr(self.inner, name)
+
+    client._queue = RacingQueue(client._queue)
+    future = client.submit(b'E', NSA_PT)
+    with pytest.raises(Exception, match="Client is closed"):
+        future.result(timeout=2)
@@ -0,0 +1,78 @@
+"""
+Cycle-level datapath model: edge counts from the RTL and the testbenches
+"""
+
+import pytest
+
+from speck_cyclesim import Design, bulk_trace, lanes_engine_cycles, simulate
+
+CLK = 100_000_000
+TB_BIT_TIME = 8680  # tb_uart_top_10blocks_v3: 1_000_000_000 / 115200 ns
+TB_HOST_BAUD = 1e9 / TB_BIT_TIME
+
+
+def test_lanes_engine_one_lane():
+    # tb_speck_lanes, LANES=1: dispatch, 29 edges to FULL, collect, free,
+    # next dispatch -> one block every 31 cycles
+    assert lanes_engine_cycles(1, 256) == 31 * 256
+
+
+@pytest.mark.parametrize("lanes", [2, 4, 8])
+def test_lanes_engine_scales_with_lanes(lanes):
+    cycles = lanes_engine_cycles(lanes, 256)
+    assert 256 / cycles == pytest.approx(lanes / 31, rel=0.02)
+
+
+def test_lanes_engine_saturates_at_one_block_per_cycle():
+    assert lanes_engine_cycles(64, 10000) == pytest.approx(10000, rel=0.01)
+
+
+def test_single_block_edges_match_rtl():
+    """One 'E' frame into an idle v3 top, timed like tb_uart_top_10blocks_v3
+
+    The last payload byte starts 8 byte times (8 * 8680 cycles) in. uart_rx
+    sees it at the next edge and raises data_valid 434 + 1 + 9 * 868 edges
+    later, seen one edge after that. Then CRYPTO +1, core start +1, 27
+    rounds, WAIT_CRYPTO +1, TX_BYTES +1, uart_tx start +1. Eight bytes go
+    out 8683 edges apart; the last stop bit ends 1 + 10 * 868 edges after
+    the last start.
+    """
+    design = Design(host_baud=TB_HOST_BAUD)
+    r = simulate(design, [(0.0, 'K'), (1e-3 * 2, 'E')])
+    submit = int(0.002 * CLK)
+    last_rx = submit + 8 * 10 * 868 + 1 + 434 + 2 + 9 * 868
+    first_tx = last_rx + 32
+    done = first_tx + 7 * 8683 + 1 + 8680
+    assert r.latencies[0] * CLK == pytest.approx(done - submit, abs=1)
+
+
+def test_v3_window_one_is_wire_bound():
+    # 9 bytes out, 8 bytes back, strictly alternating
+    r = simulate(Design(), bulk_trace(500), window=1)
+    assert r.dropped_bytes == 0
+    assert r.blocks_per_s == pytest.approx(115200 / 10 / 17, rel=0.01)
+
+
+def test_v3_drops_bytes_when_pipelined():
+    r = simulate(Design(), bulk_trace(100), window=2)
+    assert r.dropped_bytes > 0
+    assert r.timeouts > 0
+
+
+def test_fifo_top_streams_at_rx_rate():
+    r = simulate(Design(fifo_depth=2048), bulk_trace(500), window=16)
+    assert r.dropped_bytes == 0
+    assert not r.overflow
+    assert r.blocks_per_s == pytest.approx(115200 / 10 / 9, rel=0.01)
+
+
+def test_lanes_take_a_window_of_lanes():
+    r = simulate(Design(lanes=4), bulk_trace(500), window=4)
+    assert r.dropped_bytes == 0
+    assert r.blocks_per_s == pytest.approx(115200 / 10 / 9, rel=0.01)
+
+
+def test_key_load_then_block_latency_scales_with_baud():
+    slow = simulate(Design(), bulk_trace(1)).latencies[0]
+    fast = simulate(Design(baud=921600), bulk_trace(1)).latencies[0]
+    assert slow / fast == pytest.approx(8, rel=0.01)
@@ -0,0 +1,75 @@
+"""
+Crypto daemon: socket protocol, request limits, socket ownership
+"""
+
+import os
+import socket
+
+import pytest
+
+from conftest import NSA_CT, NSA_KEY, NSA_PT
+from speck_daemon import (REQUEST, RESPONSE, STATUS_ERROR, SPECKDaemon, SPECKDaemonClient,
+                          _recv_exact)
+
+
+@pytest.fixture
+def daemon(crypto, tmp_path):
+    d = SPECKDaemon(crypto, str(tmp_path / "speck.sock"), max_request_blocks=64)
+    d.start()
+    yield d
+    d.stop()
+
+
+def test_nsa_vector(daemon):
+    with SPECKDaemonClient(daemon.socket_path) as client:
+        assert client.encrypt_blocks(NSA_KEY, NSA_PT) == NSA_CT
+        assert client.decrypt_blocks(NSA_KEY, NSA_CT) == NSA_PT
+    assert daemon.stats['requests'] == 2 and daemon.stats['key_loads'] == 1
+
+
+def test_unknown_operation(daemon):
+    with SPECKDaemonClient(daemon.socket_path) as client:
+        with pytest.raises(Exception, match="Unknown operation"):
+            client._request(b'X', NSA_KEY, NSA_PT)
+        assert client.encrypt_blocks(NSA_KEY, NSA_PT) == NSA_CT
+
+
+def test_oversized_request_refused_without_allocating(daemon):
+    """A header claiming 2^32-1 blocks gets an error, not a 32 GiB buffer"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(daemon.socket_path)
+    try:
+        sock.sendall(REQUEST.pack(b'E', NSA_KEY, 0xffffffff))
+        status, length = RESPONSE.unpack(_recv_exact(sock, RESPONSE.size))
+        assert status == STATUS_ERROR
+        assert b"exceeds the 64-block limit" in _recv_exact(sock, length)
+        assert sock.recv(1) == b''  # Connection closed
+    finally:
+        sock.close()
+
+    with SPECKDaemonClient(daemon.socket_path) as client:
+        assert len(client.encrypt_blocks(NSA_KEY, NSA_PT * 64)) == 512
+
+
+def test_live_socket_not_taken_over(daemon, crypto):
+    second = SPECKDaemon(crypto, daemon.socket_path)
+    with pytest.raises(Exception, match="already serving"):
+        second.start()
+    with SPECKDaemonClient(daemon.socket_path) as client:
+        assert client.encrypt_blocks(NSA_KEY, NSA_PT) == NSA_CT
+
+
+def test_stale_socket_replaced(crypto, tmp_path):
+    path = str(tmp_path / "speck.sock")
+    dead = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    dead.bind(path)  # Bound but never listening, like a crashed daemon's file
+    dead.close()
+    assert os.path.exists(path)
+
+    d = SPECKDaemon(crypto, path)
+    d.start()
+    try:
+        with SPECKDaemonClient(path) as client:
+            assert client.encrypt_blocks(NSA_KEY, NSA_PT) == NSA_CT
+    finally:
+        d.stop()
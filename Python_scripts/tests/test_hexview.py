@@ -0,0 +1,58 @@
+"""
+GUI result buffer: on-demand line rendering, copy text, padding trim
+"""
+
+import time
+
+from speck_hexview import ResultBuffer
+
+
+def test_hex_lines_match_old_format():
+    result = ResultBuffer()
+    result.append(bytes.fromhex("8b024e4548a56f8c"))
+    result.append(bytes.fromhex("2d4375747465723b"))
+    assert result.num_lines == 2
+    assert result.lines(0, 6) == ["8b 02 4e 45 48 a5 6f 8c", "2d 43 75 74 74 65 72 3b"]
+    assert result.copy_text() == "8b024e4548a56f8c2d4375747465723b"
+
+
+def test_window_is_clipped():
+    result = ResultBuffer()
+    result.append(bytes(8 * 10))
+    assert len(result.lines(8, 6)) == 2
+    assert result.lines(10, 6) == []
+
+
+def test_text_lines_and_trim():
+    result = ResultBuffer(text=True)
+    result.append(b"Hello\x01 FPGA" + bytes([3, 3, 3]))
+    result.truncate(11)
+    assert result.lines(0, 1) == ["Hello. FPGA"]
+    assert result.copy_text() == "Hello\x01 FPGA"
+
+
+def test_non_ascii_copy_falls_back_to_hex():
+    result = ResultBuffer(text=True)
+    result.append(b"\xff\x00")
+    assert result.copy_text() == "<non-ASCII: ff00>"
+
+
+def test_save_writes_raw_bytes(tmp_path):
+    result = ResultBuffer()
+    result.append(b"\x00\x01\x02\x03\x04\x05\x06\x07")
+    result.save(tmp_path / "out.bin")
+    assert (tmp_path / "out.bin").read_bytes() == bytes(range(8))
+
+
+def test_window_cost_independent_of_size():
+    small, large = ResultBuffer(), ResultBuffer()
+    small.append(bytes(8 * 100))
+    large.append(bytes(8 * 1_000_000))
+
+    def cost(result):
+        start = time.perf_counter()
+        for _ in range(200):
+            result.lines(result.num_lines - 6, 6)
+        return time.perf_counter() - start
+
+    assert cost(large) < cost(small) * 5 + 0.01
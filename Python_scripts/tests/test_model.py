@@ -0,0 +1,56 @@
+"""
+Software reference model: NSA vector and randomized self-consistency
+"""
+
+import random
+
+import pytest
+
+import speck_model
+from conftest import NSA_CT, NSA_KEY, NSA_PT
+
+NUM_RANDOM = 2000
+
+
+def test_nsa_vector_encrypt():
+    rk = speck_model.key_schedule(NSA_KEY)
+    assert speck_model.encrypt_block(NSA_PT, rk) == NSA_CT
+
+
+def test_nsa_vector_decrypt():
+    rk = speck_model.key_schedule(NSA_KEY)
+    assert speck_model.decrypt_block(NSA_CT, rk) == NSA_PT
+
+
+def test_round_key_count():
+    assert len(speck_model.key_schedule(NSA_KEY)) == speck_model.ROUNDS
+
+
+@pytest.mark.parametrize("length", [0, 8, 15, 17])
+def test_key_schedule_rejects_bad_key_length(length):
+    with pytest.raises(Exception):
+        speck_model.key_schedule(bytes(length))
+
+
+def test_random_round_trip():
+    rng = random.Random(2024)
+    for _ in range(NUM_RANDOM):
+        rk = speck_model.key_schedule(rng.randbytes(16))
+        pt = rng.randbytes(8)
+        assert speck_model.decrypt_block(speck_model.encrypt_block(pt, rk), rk) == pt
+
+
+def test_vectorized_matches_scalar():
+    rng = random.Random(7)
+    for _ in range(20):
+        rk = speck_model.key_schedule(rng.randbytes(16))
+        data = rng.randbytes(8 * 100)
+        ct = speck_model.encrypt_array(data, rk)
+        assert ct == speck_model.encrypt_blocks(data, rk)
+        assert speck_model.decrypt_array(ct, rk) == data
+
+
+def test_vectorized_empty_input():
+    rk = speck_model.key_schedule(NSA_KEY)
+    assert speck_model.encrypt_array(b'', rk) == b''
+    assert speck_model.decrypt_array(b'', rk) == b''
@@ -0,0 +1,84 @@
+"""
+Message packing: framing, ciphertext stealing, batch passes on the emulator
+"""
+
+import random
+
+import pytest
+
+import speck_model
+from conftest import NSA_KEY
+from speck_pack import (decrypt_messages, encrypt_messages, frame, framed_size,
+                        sample_messages, unframe)
+
+
+@pytest.mark.parametrize("length", [0, 1, 6, 7, 8, 15, 16, 17, 100])
+def test_frame_round_trip(length):
+    message = bytes(range(1, length + 1))
+    framed = frame(message)
+    assert len(framed) == framed_size(length)
+    assert unframe(framed) == message
+
+
+def test_frame_keeps_trailing_zeros():
+    assert unframe(frame(b'abc\0\0')) == b'abc\0\0'
+    assert unframe(frame(bytes(12))) == bytes(12)
+
+
+def test_unframe_rejects_garbage():
+    with pytest.raises(Exception, match="Invalid message frame"):
+        unframe(bytes(8))
+    with pytest.raises(Exception, match="Invalid message frame"):
+        unframe(b'0123456789')
+
+
+def test_ciphertext_is_one_byte_longer(crypto):
+    crypto.load_key_bytes(NSA_KEY)
+    messages = [b'', b'x', b'1234567', b'12345678', b'a' * 31, b'b' * 32]
+    cts = encrypt_messages(crypto, messages)
+    assert [len(c) for c in cts] == [8, 8, 8, 9, 32, 33]
+
+
+def test_stealing_matches_model(crypto):
+    """C' = E(P[m-2]); ct = E(tail + C'[3:]) + C'[:3] for an 11-byte frame"""
+    crypto.load_key_bytes(NSA_KEY)
+    rk = speck_model.key_schedule(NSA_KEY)
+    message = b'0123456789'
+    p = frame(message)
+    c_prime = speck_model.encrypt_block(p[:8], rk)
+    expected = speck_model.encrypt_block(p[8:] + c_prime[3:], rk) + c_prime[:3]
+    assert encrypt_messages(crypto, [message]) == [expected]
+
+
+def test_batch_round_trip_in_two_passes(crypto, emulator):
+    crypto.load_key_bytes(NSA_KEY)
+    messages = sample_messages(500)
+    passes = []
+    process_into = crypto.process_into
+    crypto.process_into = lambda *args: passes.append(args[0]) or process_into(*args)
+
+    cts = encrypt_messages(crypto, messages)
+    assert passes == [b'E', b'E']
+    blocks = sum(-(-framed_size(len(m)) // 8) for m in messages)
+    assert emulator.blocks_encrypted == blocks
+    assert decrypt_messages(crypto, cts) == [m.encode('ascii') for m in messages]
+    assert passes == [b'E', b'E', b'D', b'D']
+    assert emulator.key_loads == 1
+
+
+def test_each_ciphertext_decrypts_alone(crypto):
+    crypto.load_key_bytes(NSA_KEY)
+    rng = random.Random(5)
+    messages = [rng.randbytes(rng.randint(0, 40)) for _ in range(50)]
+    cts = encrypt_messages(crypto, messages)
+    for i in rng.sample(range(50), 10):
+        assert decrypt_messages(crypto, [cts[i]]) == [messages[i]]
+    order = list(range(50))
+    rng.shuffle(order)
+    assert decrypt_messages(crypto, [cts[i] for i in order]) == [messages[i] for i in order]
+
+
+def test_short_ciphertext_rejected(crypto):
+    crypto.load_key_bytes(NSA_KEY)
+    with pytest.raises(Exception, match="expected at least 8"):
+        decrypt_messages(crypto, [b'1234567'])
@@ -0,0 +1,47 @@
+"""
+SPECKCrypto text API: PKCS#7 padding edge cases through the emulator
+"""
+
+import pytest
+
+
+@pytest.mark.parametrize("text", [
+    "",                      # empty: one full padding block
+    "A",
+    "1234567",               # one short of a block
+    "12345678",              # exact multiple of 8: extra padding block
+    "123456789",
+    "0123456789abcdef",      # two exact blocks
+    "tail\x08\x08",          # looks like padding but is not a full run
+])
+def test_round_trip(crypto, text):
+    crypto.load_key("MySecretKey12345")
+    ct_hex = crypto.encrypt(text)
+    assert len(ct_hex) == (len(text) // 8 + 1) * 16
+    assert crypto.decrypt(ct_hex) == text
+
+
+def test_non_ascii_plaintext_is_rejected(crypto):
+    crypto.load_key("MySecretKey12345")
+    with pytest.raises(UnicodeEncodeError):
+        crypto.encrypt("grüße")
+
+
+def test_non_ascii_result_is_shown_as_hex(crypto):
+    crypto.load_key("MySecretKey12345")
+    # Decrypting arbitrary bytes gives non-ASCII plaintext
+    result = crypto.decrypt("ff" * 8)
+    assert result.startswith("<non-ASCII: ")
+
+
+def test_ciphertext_must_be_whole_blocks(crypto):
+    crypto.load_key("MySecretKey12345")
+    with pytest.raises(Exception):
+        crypto.decrypt("abcd")
+
+
+def test_ciphertext_spaces_and_prefix_are_ignored(crypto):
+    crypto.load_key("MySecretKey12345")
+    ct_hex = crypto.encrypt("hello")
+    spaced = ' '.join(ct_hex[i:i+2] for i in range(0, len(ct_hex), 2))
+    assert crypto.decrypt(spaced) == "hello"
@@ -0,0 +1,54 @@
+"""
+Shadow round keys: 'P' prefetch, 'S' swap, scheduler prefetching
+"""
+
+import random
+
+import speck_model
+from conftest import NSA_CT, NSA_KEY, NSA_PT
+from speck_scheduler import KeyScheduler
+
+KEY_B = bytes(range(0x20, 0x30))
+CT_B = bytes.fromhex("1ca85ae16dce0184")  # Also used by tb_key_prefetch.v
+
+
+def test_old_key_until_swap(crypto, emulator):
+    crypto.load_key_bytes(NSA_KEY)
+    crypto.prefetch_key_bytes(KEY_B)
+    assert crypto.process_blocks(b'E', NSA_PT) == NSA_CT
+    assert crypto.key_bytes == NSA_KEY
+
+    writes = []
+    write = crypto.ser.write
+    crypto.ser.write = lambda data: writes.append(bytes(data)) or write(data)
+    crypto.load_key_bytes(KEY_B)
+    assert writes == [b'S']
+    assert crypto.process_blocks(b'E', NSA_PT) == CT_B
+    assert emulator.key_loads == 1
+    assert emulator.key_prefetches == 1
+    assert emulator.key_swaps == 1
+
+
+def test_other_key_after_prefetch_is_a_full_load(crypto, emulator):
+    crypto.load_key_bytes(KEY_B)
+    crypto.prefetch_key_bytes(bytes(16))
+    crypto.load_key_bytes(NSA_KEY)
+    assert crypto.process_blocks(b'E', NSA_PT) == NSA_CT
+    assert crypto.prefetched is None
+    assert emulator.key_loads == 2
+    assert emulator.key_swaps == 0
+
+
+def test_scheduler_prefetches_next_key(crypto, emulator):
+    rng = random.Random(3)
+    keys = [rng.randbytes(16) for _ in range(4)]
+    blocks = [rng.randbytes(8) for _ in range(40)]
+    with KeyScheduler(crypto, latency_budget=0, prefetch=True) as sched:
+        futures = [sched.submit(b'E', keys[i % 4], b) for i, b in enumerate(blocks)]
+        results = [f.result() for f in futures]
+        switches = sched.stats()['key_switches']
+
+    for i, (block, got) in enumerate(zip(blocks, results)):
+        assert got == speck_model.encrypt_block(block, speck_model.key_schedule(keys[i % 4]))
+    assert emulator.key_swaps > 0
+    assert emulator.key_loads + emulator.key_swaps == switches
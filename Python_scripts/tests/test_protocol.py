@@ -0,0 +1,86 @@
+"""
+Controller protocol conformance through the pty emulator
+('K' + 16 bytes, 'E'/'D' + 8 bytes, 'R' reset, unknown commands dropped)
+"""
+
+import random
+import time
+
+import pytest
+
+import speck_model
+from conftest import NSA_CT, NSA_KEY, NSA_PT
+
+NUM_RANDOM_PAIRS = 2000
+
+
+def assert_no_response(crypto):
+    time.sleep(0.1)
+    assert crypto.ser.in_waiting == 0
+
+
+def test_nsa_vector_encrypt(crypto):
+    crypto.load_key_bytes(NSA_KEY)
+    assert crypto.process_blocks(b'E', NSA_PT) == NSA_CT
+
+
+def test_nsa_vector_decrypt(crypto):
+    crypto.load_key_bytes(NSA_KEY)
+    assert crypto.process_blocks(b'D', NSA_CT) == NSA_PT
+
+
+def test_random_key_plaintext_pairs(crypto):
+    rng = random.Random(1)
+    for _ in range(NUM_RANDOM_PAIRS):
+        key = rng.randbytes(16)
+        pt = rng.randbytes(8)
+        expected = speck_model.encrypt_block(pt, speck_model.key_schedule(key))
+
+        crypto.load_key_bytes(key)
+        assert crypto.process_blocks(b'E', pt) == expected
+        assert crypto.process_blocks(b'D', expected) == pt
+
+
+@pytest.mark.parametrize("window", [1, 8])
+def test_multiblock_pass(crypto, window):
+    rng = random.Random(window)
+    key = rng.randbytes(16)
+    data = rng.randbytes(8 * 500)
+    rk = speck_model.key_schedule(key)
+
+    crypto.load_key_bytes(key)
+    ct = crypto.process_blocks(b'E', data, window=window)
+    assert ct == speck_model.encrypt_blocks(data, rk)
+    assert crypto.process_blocks(b'D', ct, window=window) == data
+
+
+def test_key_persists_across_commands(crypto):
+    crypto.load_key_bytes(NSA_KEY)
+    for _ in range(10):
+        assert crypto.process_blocks(b'E', NSA_PT) == NSA_CT
+        assert crypto.process_blocks(b'D', NSA_CT) == NSA_PT
+
+
+def test_encrypt_before_key_is_dropped(crypto):
+    crypto.ser.write(b'E' + NSA_PT)
+    assert_no_response(crypto)
+
+
+def test_reset_clears_key(crypto):
+    crypto.load_key_bytes(NSA_KEY)
+    crypto.ser.write(b'R')
+    crypto.ser.write(b'E' + NSA_PT)
+    assert_no_response(crypto)
+
+
+def test_unknown_command_is_ignored(crypto, emulator):
+    crypto.load_key_bytes(NSA_KEY)
+    crypto.ser.write(b'Z')
+    assert crypto.process_blocks(b'E', NSA_PT) == NSA_CT
+    assert emulator.unknown_commands == 1
+
+
+def test_process_blocks_rejects_partial_block(crypto):
+    crypto.load_key_bytes(NSA_KEY)
+    with pytest.raises(Exception):
+        crypto.process_blocks(b'E', bytes(7))
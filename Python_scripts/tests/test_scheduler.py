@@ -0,0 +1,96 @@
+"""
+Key-aware scheduler: grouping by key, bounded queue delay
+"""
+
+import random
+import time
+
+import pytest
+
+import speck_model
+from conftest import NSA_KEY
+from speck_emulator import SPECKEmulator
+from speck_scheduler import KeyScheduler
+from speck_tool_final import SPECKCrypto
+
+BAUD = 115200
+OTHER_KEY = bytes(range(16, 32))
+
+
+@pytest.fixture
+def link_crypto():
+    """SPECKCrypto on an emulator that paces both directions at 115200 baud"""
+    with SPECKEmulator(baud=BAUD) as emu:
+        crypto = SPECKCrypto(emu.port, BAUD, verbose=False)
+        yield crypto
+        crypto.close()
+
+
+def expected(key, block):
+    return speck_model.encrypt_block(block, speck_model.key_schedule(key))
+
+
+def test_interleaved_keys_grouped(crypto, emulator):
+    rng = random.Random(3)
+    blocks = [rng.randbytes(8) for _ in range(40)]
+    keys = [NSA_KEY, OTHER_KEY] * 20
+    with KeyScheduler(crypto, latency_budget=10) as sched:
+        with sched._cond:  # Queue everything before the first pick
+            futures = [sched.submit(b'E', k, b) for k, b in zip(keys, blocks)]
+        assert [f.result() for f in futures] == [expected(k, b) for k, b in zip(keys, blocks)]
+        s = sched.stats()
+    assert s['key_switches'] == 2 and emulator.key_loads == 2
+    assert s['requests'] == 40 and s['queued'] == 0
+
+
+def test_loaded_key_served_first(crypto):
+    with KeyScheduler(crypto, latency_budget=10) as sched:
+        sched.encrypt_blocks(NSA_KEY, bytes(8))
+        order = []
+        with sched._cond:
+            for key in (OTHER_KEY, NSA_KEY):
+                sched.submit(b'E', key, bytes(8)).add_done_callback(
+                    lambda f, key=key: order.append(key))
+        time.sleep(0.2)
+    assert order == [NSA_KEY, OTHER_KEY]
+
+
+def test_batch_cut_short_for_other_key(link_crypto):
+    """A 4-block request under another key, followed by 300 1-block requests
+    under the loaded key: it is served within the budget, not after the
+    loaded key's whole ~0.6 s queue"""
+    budget = 0.05
+    with KeyScheduler(link_crypto, latency_budget=budget) as sched:
+        sched.encrypt_blocks(NSA_KEY, bytes(8))  # Measure the link rate
+        with sched._cond:
+            start = time.perf_counter()
+            other = sched.submit(b'E', OTHER_KEY, bytes(8 * 4))
+            backlog = [sched.submit(b'E', NSA_KEY, bytes(8)) for _ in range(300)]
+        other.result()
+        latency = time.perf_counter() - start
+        assert not backlog[-1].done()
+        for f in backlog:
+            f.result()
+    # Budget, plus the 4 blocks and their key load (~10 ms at 115200 baud)
+    assert latency < budget + 0.02
+
+
+def test_queue_delay_within_budget(link_crypto):
+    """4 tenants at ~75% of the link rate (about 470 blocks/s one frame at a
+    time): batching keeps up and no request waits past the budget"""
+    budget = 0.05
+    rng = random.Random(9)
+    keys = [rng.randbytes(16) for _ in range(4)]
+    with KeyScheduler(link_crypto, latency_budget=budget) as sched:
+        start = time.perf_counter()
+        futures = []
+        for i in range(200):
+            delay = start + i / 360 - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(sched.submit(b'E', keys[i % 4], bytes(8)))
+        for f in futures:
+            f.result()
+        s = sched.stats()
+    assert s['key_switch_rate'] < 0.8
+    assert s['max_queue_delay'] <= budget
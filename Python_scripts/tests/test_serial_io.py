@@ -0,0 +1,116 @@
+"""
+Serial I/O coalescing: one write per pipeline top-up, batched reads,
+and the emulated USB latency timer
+"""
+
+import os
+import time
+
+import pytest
+
+import speck_model
+from conftest import NSA_KEY
+
+
+class CallCounter:
+    """Wraps the port's write/readinto to count calls"""
+
+    def __init__(self, ser):
+        self.writes = 0
+        self.reads = 0
+        write, readinto = ser.write, ser.readinto
+
+        def counted_write(data):
+            self.writes += 1
+            return write(data)
+
+        def counted_readinto(b):
+            self.reads += 1
+            return readinto(b)
+
+        ser.write = counted_write
+        ser.readinto = counted_readinto
+
+
+def test_load_key_is_one_write(crypto):
+    calls = CallCounter(crypto.ser)
+    crypto.load_key("MySecretKey12345")
+    assert calls.writes == 1
+
+
+@pytest.mark.parametrize("window", [1, 4, 16, 64])
+def test_writes_and_reads_per_window(crypto, window):
+    num_blocks = 256
+    data = os.urandom(num_blocks * 8)
+    crypto.load_key_bytes(NSA_KEY)
+
+    calls = CallCounter(crypto.ser)
+    out = crypto.process_blocks(b'E', data, window=window)
+
+    assert out == speck_model.encrypt_blocks(data, speck_model.key_schedule(NSA_KEY))
+    refill = max(1, window // 2)
+    assert calls.writes <= num_blocks // refill + 1
+    assert calls.reads <= num_blocks // refill + 1
+
+
+def test_window_larger_than_batch(crypto):
+    data = os.urandom(24)
+    crypto.load_key_bytes(NSA_KEY)
+    out = crypto.process_blocks(b'D', data, window=1000)
+    assert out == speck_model.decrypt_blocks(data, speck_model.key_schedule(NSA_KEY))
+
+
+def test_latency_timer_not_settable_on_pty(crypto):
+    assert crypto.set_latency_timer(1) is False
+
+
+def test_emulated_latency_timer_holds_short_responses():
+    from speck_emulator import SPECKEmulator
+    from speck_tool_final import SPECKCrypto
+
+    num_blocks = 5
+    with SPECKEmulator(latency_timer=0.02) as emu:
+        crypto = SPECKCrypto(emu.port, settle=0, verbose=False)
+        crypto.load_key_bytes(NSA_KEY)
+        start = time.perf_counter()
+        crypto.process_blocks(b'E', bytes(8 * num_blocks), window=1)
+        elapsed = time.perf_counter() - start
+        crypto.close()
+    # Every 8-byte response waits out the timer when only one is in flight
+    assert elapsed >= num_blocks * 0.02
+
+
+@pytest.mark.parametrize("num_blocks", [1, 8, 64])
+def test_text_api_frames_not_split(crypto, num_blocks):
+    """encrypt()/decrypt() at window 1: one write per block (command and
+    block in one frame), not two"""
+    crypto.load_key_bytes(NSA_KEY)
+    text = "x" * (num_blocks * 8 - 1)  # One padding byte: exactly N blocks
+
+    calls = CallCounter(crypto.ser)
+    ct_hex = crypto.encrypt(text)
+    assert len(ct_hex) == num_blocks * 16
+    assert calls.writes == num_blocks
+
+    calls = CallCounter(crypto.ser)
+    assert crypto.decrypt(ct_hex) == text
+    assert calls.writes == num_blocks
+
+
+@pytest.mark.parametrize("num_blocks", [1, 8, 64])
+def test_text_api_one_write_with_window(crypto, num_blocks):
+    """With a window covering the message, encrypt()/decrypt() of N blocks
+    is a single write and a bounded number of reads"""
+    crypto.window = 64
+    crypto.load_key_bytes(NSA_KEY)
+    text = "x" * (num_blocks * 8 - 1)
+
+    calls = CallCounter(crypto.ser)
+    ct_hex = crypto.encrypt(text)
+    assert ct_hex == speck_model.encrypt_blocks(
+        text.encode('ascii') + b'\x01', speck_model.key_schedule(NSA_KEY)).hex()
+    assert calls.writes == 1 and calls.reads <= 3
+
+    calls = CallCounter(crypto.ser)
+    assert crypto.decrypt(ct_hex) == text
+    assert calls.writes == 1 and calls.reads <= 3
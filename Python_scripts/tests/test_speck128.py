@@ -0,0 +1,123 @@
+"""
+SPECK128/128 mode: published vector, 16-byte frames on the emulator, link model
+"""
+
+import random
+import sys
+
+import pytest
+
+import speck_model
+from speck_cyclesim import Design, bulk_trace, simulate
+
+# Published SPECK128/128 vector (Beaulieu et al.), in the byte order the
+# FPGA uses: bytes 0-7 = y (low word first), bytes 8-15 = x
+KEY128 = bytes(range(16))
+PT128 = bytes.fromhex("206d616465206974 206571756976616c")
+CT128 = bytes.fromhex("180d575cdffe6078 6532787951985da6")
+
+
+@pytest.fixture
+def crypto128():
+    if sys.platform == 'win32':
+        pytest.skip("pty emulator needs Linux/macOS")
+    pytest.importorskip("serial")
+    from speck_emulator import SPECKEmulator
+    from speck_tool_final import SPECKCrypto
+    with SPECKEmulator(block_size=16) as emu:
+        c = SPECKCrypto(emu.port, block_size=16)
+        yield c
+        c.close()
+
+
+def test_published_vector():
+    rk = speck_model.key_schedule(KEY128, block_size=16)
+    assert len(rk) == 32
+    assert speck_model.encrypt_block(PT128, rk) == CT128
+    assert speck_model.decrypt_block(CT128, rk) == PT128
+
+
+def test_rejects_unknown_block_size():
+    with pytest.raises(Exception, match="Block size"):
+        speck_model.key_schedule(KEY128, block_size=12)
+
+
+def test_vectorized_matches_scalar():
+    rng = random.Random(11)
+    rk = speck_model.key_schedule(rng.randbytes(16), block_size=16)
+    data = rng.randbytes(16 * 100)
+    ct = speck_model.encrypt_array(data, rk)
+    assert ct == speck_model.encrypt_blocks(data, rk)
+    assert speck_model.decrypt_array(ct, rk) == data
+
+
+def test_device_vector(crypto128):
+    crypto128.load_key_bytes(KEY128)
+    assert crypto128.process_blocks(b'E', PT128 * 3) == CT128 * 3
+    assert crypto128.process_blocks(b'D', CT128) == PT128
+
+
+def test_rejects_half_blocks(crypto128):
+    crypto128.load_key_bytes(KEY128)
+    with pytest.raises(Exception, match="multiple of 16"):
+        crypto128.process_blocks(b'E', PT128[:8])
+
+
+@pytest.mark.parametrize("text", ["", "Hello", "Exactly 16 bytes", "x" * 40])
+def test_text_round_trip(crypto128, text):
+    crypto128.load_key_bytes(KEY128)
+    ct_hex = crypto128.encrypt(text)
+    assert len(ct_hex) % 32 == 0
+    assert crypto128.decrypt(ct_hex) == text
+
+
+def test_link_model_payload_gain():
+    """17 wire bytes per 8 payload vs 33 per 16 at window 1"""
+    r64 = simulate(Design(), bulk_trace(500), window=1)
+    r128 = simulate(Design(block_bytes=16), bulk_trace(250), window=1)
+    assert r128.blocks_per_s == pytest.approx(115200 / 10 / 33, rel=0.01)
+    assert r128.bytes_per_s / r64.bytes_per_s == pytest.approx(17 * 16 / (33 * 8), rel=0.01)
+
+
+def test_lanes_controller_is_speck64_only():
+    with pytest.raises(Exception, match="SPECK64"):
+        Design(lanes=4, block_bytes=16)
+
+
+def test_verifier_checks_speck128(crypto128):
+    from speck_verifier import OutputVerifier
+    verifier = OutputVerifier(sample_rate=1.0)
+    crypto128.verifier = verifier
+    crypto128.load_key_bytes(KEY128)
+    crypto128.process_blocks(b'E', PT128 * 4)
+    crypto128.process_blocks(b'D', CT128 * 4)
+    verifier.close()
+    assert verifier.blocks_seen == verifier.blocks_checked == 8
+    assert not verifier.mismatches and not verifier.errors
+
+
+def test_invalid_padding_left_in_place(crypto128):
+    """Same as the SPECK64 path: no valid padding, the data comes back whole"""
+    crypto128.load_key_bytes(KEY128)
+    assert crypto128.decrypt(CT128.hex()) == PT128.decode('ascii')
+
+
+@pytest.mark.parametrize("helper", ["daemon", "scheduler", "client", "roundtrip", "pack"])
+def test_speck64_helpers_refuse_16_byte_crypto(crypto128, helper, tmp_path):
+    with pytest.raises(Exception, match="8-byte SPECK64/128 blocks only"):
+        if helper == "daemon":
+            from speck_daemon import SPECKDaemon
+            SPECKDaemon(crypto128, str(tmp_path / "speck.sock"))
+        elif helper == "scheduler":
+            from speck_scheduler import KeyScheduler
+            KeyScheduler(crypto128)
+        elif helper == "client":
+            from speck_client import SPECKClient
+            SPECKClient(crypto128)
+        elif helper == "roundtrip":
+            from speck_roundtrip import RoundTripVerifier
+            RoundTripVerifier(crypto128)
+        else:
+            from speck_pack import encrypt_messages
+            crypto128.load_key_bytes(KEY128)
+            encrypt_messages(crypto128, [b"hello"])
@@ -0,0 +1,103 @@
+"""
+Performance counters: 'Q' record format, emulator counts, utilization report
+"""
+
+import sys
+import time
+
+import pytest
+
+from conftest import NSA_CT, NSA_KEY, NSA_PT
+from speck_stats import (NUM_COUNTERS, RECORD_SIZE, STATE_NAMES, DeviceStats, WRAP,
+                         profile)
+
+
+def stats_with(**counts):
+    """DeviceStats with the named state/event counters set"""
+    names = STATE_NAMES + ('encrypted', 'decrypted', 'key_loads', 'prefetches', 'swaps',
+                           'rejected', 'rx_overruns')
+    return DeviceStats([counts.get(n, 0) for n in names])
+
+
+def test_record_round_trip():
+    stats = DeviceStats(range(1, NUM_COUNTERS + 1))
+    record = stats.to_bytes()
+    assert len(record) == RECORD_SIZE == 74
+    assert record[:2] == b'Q\x12'
+    assert DeviceStats.from_bytes(record).counters == stats.counters
+
+
+def test_bad_record_rejected():
+    record = bytearray(DeviceStats([0] * NUM_COUNTERS).to_bytes())
+    record[1] = 11
+    with pytest.raises(Exception, match="Invalid stats record"):
+        DeviceStats.from_bytes(bytes(record))
+    with pytest.raises(Exception, match="Invalid stats record"):
+        DeviceStats.from_bytes(bytes(record[:40]))
+
+
+def test_difference_survives_wrap():
+    before = stats_with(IDLE=WRAP - 100, encrypted=WRAP - 1)
+    after = stats_with(IDLE=50, encrypted=2)
+    delta = after - before
+    assert delta.state_cycles['IDLE'] == 150
+    assert delta.events['encrypted'] == 3
+
+
+def test_bottleneck_ignores_bookkeeping():
+    stats = stats_with(IDLE=10, RX_BYTES=700, TX_BYTES=600, WAIT_CRYPTO=30, DONE_STATE=5000)
+    assert stats.bottleneck()[0] == 'uart_rx'
+    usage = stats.utilization()
+    assert sum(usage.values()) == pytest.approx(1.0)
+    assert usage['uart_tx'] == pytest.approx(600 / 6340)
+
+
+def test_emulator_event_counts(crypto, emulator):
+    crypto.load_key_bytes(NSA_KEY)
+    before = crypto.read_stats()
+    for _ in range(3):
+        assert crypto.process_blocks(b'E', NSA_PT) == NSA_CT
+    crypto.process_blocks(b'D', NSA_CT * 2)
+    crypto.ser.write(b'Z')
+    crypto.prefetch_key_bytes(bytes(range(16)))
+    crypto.load_key_bytes(bytes(range(16)))
+    d = crypto.read_stats() - before
+    assert d.events == {'encrypted': 3, 'decrypted': 2, 'key_loads': 0, 'prefetches': 1,
+                        'swaps': 1, 'rejected': 1, 'rx_overruns': 0}
+    assert d.state_cycles['WAIT_CRYPTO'] == 5 * 28
+
+
+def test_reset_clears_counters(crypto):
+    crypto.load_key_bytes(NSA_KEY)
+    crypto.process_blocks(b'E', NSA_PT)
+    crypto.ser.write(b'R')
+    stats = crypto.read_stats()
+    assert stats.blocks == 0 and stats.events['key_loads'] == 0
+
+
+def test_profile_with_rate_limited_link():
+    """At 115200 baud most device cycles go to moving bytes, and the
+    counters cover the host's wall time"""
+    if sys.platform == 'win32':
+        pytest.skip("pty emulator needs Linux/macOS")
+    pytest.importorskip("serial")
+    from speck_emulator import SPECKEmulator
+    from speck_tool_final import SPECKCrypto
+
+    with SPECKEmulator(baud=115200) as emu:
+        crypto = SPECKCrypto(emu.port, settle=0, verbose=False)
+        try:
+            crypto.load_key_bytes(NSA_KEY)
+            time.sleep(0.01)
+            with profile(crypto) as p:
+                crypto.process_blocks(b'E', NSA_PT * 60)
+        finally:
+            crypto.close()
+
+    d = p.delta
+    usage = d.utilization()
+    assert d.blocks == 60
+    assert usage['uart_rx'] + usage['uart_tx'] > 0.5
+    assert d.total_cycles / 100e6 == pytest.approx(p.elapsed, rel=0.25)
+    report = p.report()
+    assert "Bottleneck:" in report and "60 blocks" in report
@@ -0,0 +1,44 @@
+"""
+Throughput regression checks. Thresholds can be tuned per CI machine:
+
+    SPECK_MIN_BLOCKS_PER_S        host -> emulator path (default 2000)
+    SPECK_MIN_MODEL_BLOCKS_PER_S  vectorized software model (default 200000)
+"""
+
+import os
+import time
+
+import pytest
+
+import speck_model
+
+MIN_BLOCKS_PER_S = float(os.environ.get("SPECK_MIN_BLOCKS_PER_S", 2000))
+MIN_MODEL_BLOCKS_PER_S = float(os.environ.get("SPECK_MIN_MODEL_BLOCKS_PER_S", 200000))
+
+
+def test_emulator_link_throughput(crypto):
+    num_blocks = 2000
+    data = os.urandom(num_blocks * 8)
+    crypto.load_key_bytes(os.urandom(16))
+
+    start = time.perf_counter()
+    crypto.process_blocks(b'E', data)
+    rate = num_blocks / (time.perf_counter() - start)
+
+    print(f"\n  host -> emulator: {rate:.0f} blocks/s")
+    assert rate >= MIN_BLOCKS_PER_S
+
+
+def test_model_throughput():
+    if speck_model.np is None:
+        pytest.skip("NumPy not installed")
+    num_blocks = 100_000
+    data = os.urandom(num_blocks * 8)
+    rk = speck_model.key_schedule(os.urandom(16))
+
+    start = time.perf_counter()
+    speck_model.encrypt_array(data, rk)
+    rate = num_blocks / (time.perf_counter() - start)
+
+    print(f"\n  vectorized model: {rate:.0f} blocks/s")
+    assert rate >= MIN_MODEL_BLOCKS_PER_S
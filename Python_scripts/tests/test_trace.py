@@ -0,0 +1,105 @@
+"""
+Trace capture and replay: record layout, no payloads, replay on the emulator
+"""
+
+import os
+import time
+
+import pytest
+
+from conftest import NSA_KEY
+from speck_tool_final import key_id
+from speck_trace import HEADER, RECORD, TraceRecorder, percentile, read_trace, replay, replay_key
+
+OTHER_KEY = bytes(range(16, 32))
+
+
+def test_records_round_trip(tmp_path):
+    path = tmp_path / "t.trace"
+    with TraceRecorder(path) as rec:
+        start = time.perf_counter()
+        rec.record(b'K', NSA_KEY, 16, start, 0.0001)
+        rec.record(b'E', NSA_KEY, 64, start + 0.5, 0.25)
+        rec.record(b'D', OTHER_KEY, 8, start + 1.0, 0.001)
+    records = read_trace(path)
+    assert [r.op for r in records] == [b'K', b'E', b'D']
+    assert [r.size for r in records] == [16, 64, 8]
+    assert records[0].key_id == records[1].key_id == key_id(NSA_KEY)
+    assert records[2].key_id == key_id(OTHER_KEY)
+    assert records[1].t - records[0].t == pytest.approx(0.5, abs=1e-5)
+    assert records[1].elapsed == pytest.approx(0.25, abs=1e-5)
+
+
+def test_crypto_calls_are_recorded_without_payloads(tmp_path, crypto):
+    path = tmp_path / "t.trace"
+    secret = b"confidential-payload-bytes!!!!!!"  # 32 bytes, 4 blocks
+    crypto.recorder = TraceRecorder(path)
+    crypto.load_key_bytes(NSA_KEY)
+    result = crypto.process_blocks(b'E', secret)
+    crypto.process_blocks(b'D', result)
+    crypto.recorder.close()
+
+    raw = path.read_bytes()
+    assert len(raw) == HEADER.size + 3 * RECORD.size
+    for needle in (secret, result, NSA_KEY, secret[:8], result[:8]):
+        assert needle not in raw
+
+    records = read_trace(path)
+    assert [(r.op, r.size) for r in records] == [(b'K', 16), (b'E', 32), (b'D', 32)]
+    assert all(r.elapsed > 0 for r in records[1:])
+
+
+def test_torn_last_record_is_ignored(tmp_path):
+    path = tmp_path / "t.trace"
+    with TraceRecorder(path) as rec:
+        rec.record(b'E', NSA_KEY, 8, time.perf_counter(), 0.0)
+    with open(path, 'ab') as f:
+        f.write(b'\x01\x02\x03')
+    assert len(read_trace(path)) == 1
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "t.trace"
+    path.write_bytes(os.urandom(64))
+    with pytest.raises(Exception, match="not a SPECK trace"):
+        read_trace(path)
+
+
+def test_replay_reproduces_key_switches(tmp_path, crypto, emulator):
+    path = tmp_path / "t.trace"
+    with TraceRecorder(path) as rec:
+        t = time.perf_counter()
+        for i, key in enumerate([NSA_KEY, NSA_KEY, OTHER_KEY, NSA_KEY]):
+            rec.record(b'E' if i % 2 == 0 else b'D', key, 16, t + i * 0.01, 0.005)
+
+    report = replay(read_trace(path), crypto, speed=0)
+    assert report.ops == 4
+    assert report.blocks == 8
+    assert report.key_loads == 3
+    assert emulator.key_loads == 3
+    assert emulator.blocks_encrypted == 4
+    assert emulator.blocks_decrypted == 4
+    assert crypto.key_bytes == replay_key(key_id(NSA_KEY))
+
+
+def test_replay_keeps_accelerated_pace(tmp_path, crypto):
+    path = tmp_path / "t.trace"
+    with TraceRecorder(path) as rec:
+        t = time.perf_counter()
+        rec.record(b'K', NSA_KEY, 16, t, 0.0)
+        for i in range(5):
+            rec.record(b'E', NSA_KEY, 8, t + 0.2 * (i + 1), 0.0)
+
+    report = replay(read_trace(path), crypto, speed=4)
+    assert report.elapsed >= 1.0 / 4
+    assert report.elapsed < 1.0
+    assert len(report.latencies) == 5
+    assert "p99" in report.summary()
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([], 50) == 0.0
@@ -0,0 +1,111 @@
+"""
+Output verifier: injected faults are flagged, errors don't stop checking
+"""
+
+import os
+import sys
+
+import pytest
+
+from conftest import NSA_CT, NSA_KEY, NSA_PT
+from speck_tool_final import key_id
+from speck_verifier import OutputVerifier
+
+FAULT_BLOCKS = {17, 250, 901}
+
+
+@pytest.fixture
+def faulty_crypto():
+    """SPECKCrypto on an emulator that flips a bit in blocks FAULT_BLOCKS"""
+    if sys.platform == 'win32':
+        pytest.skip("pty emulator needs Linux/macOS")
+    pytest.importorskip("serial")
+    from speck_emulator import SPECKEmulator
+    from speck_tool_final import SPECKCrypto
+
+    class FaultyEmulator(SPECKEmulator):
+        results = 0
+
+        def _result(self, op, block, result):
+            index = self.results
+            self.results += 1
+            if index in FAULT_BLOCKS:
+                return bytes([result[0] ^ 0x01]) + result[1:]
+            return result
+
+    with FaultyEmulator() as emu:
+        crypto = SPECKCrypto(emu.port, verbose=False)
+        yield crypto
+        crypto.close()
+
+
+def test_injected_faults_flagged(faulty_crypto):
+    seen = []
+    verifier = OutputVerifier(sample_rate=1.0, on_mismatch=seen.append)
+    faulty_crypto.verifier = verifier
+    faulty_crypto.load_key_bytes(NSA_KEY)
+    data = os.urandom(1000 * 8)
+    for i in range(0, len(data), 50 * 8):
+        faulty_crypto.process_blocks(b'E', data[i:i + 50 * 8])
+    verifier.close()
+
+    assert {m.block_index for m in verifier.mismatches} == FAULT_BLOCKS
+    assert seen == verifier.mismatches
+    for m in verifier.mismatches:
+        assert m.key_id == key_id(NSA_KEY) and m.op == b'E'
+        assert m.block == data[m.block_index*8:(m.block_index+1)*8]
+        assert m.got != m.expected
+    assert verifier.blocks_checked == verifier.blocks_seen == 1000
+    assert not verifier.errors
+
+
+def test_sampling_checks_a_fraction(crypto):
+    verifier = OutputVerifier(sample_rate=0.1, seed=1)
+    crypto.verifier = verifier
+    crypto.load_key_bytes(NSA_KEY)
+    for _ in range(20):
+        crypto.process_blocks(b'E', NSA_PT * 50)
+    verifier.close()
+    assert 50 <= verifier.blocks_checked <= 150
+    assert not verifier.mismatches
+
+
+def test_check_error_recorded_and_thread_survives():
+    verifier = OutputVerifier(sample_rate=1.0)
+    verifier.submit(b'E', NSA_KEY[:5], NSA_PT, NSA_CT)  # Bad key: model raises
+    verifier.flush()
+    verifier.submit(b'E', NSA_KEY, NSA_PT, bytes(8))
+    verifier.close()  # Would hang if the first batch had killed the thread
+    assert len(verifier.errors) == 1
+    assert [m.block_index for m in verifier.mismatches] == [1]
+
+
+def test_callback_error_recorded():
+    def boom(m):
+        raise ValueError("callback failed")
+
+    verifier = OutputVerifier(sample_rate=1.0, on_mismatch=boom)
+    verifier.submit(b'D', NSA_KEY, NSA_CT, bytes(8))
+    verifier.submit(b'D', NSA_KEY, NSA_CT, NSA_PT)
+    verifier.close()
+    assert len(verifier.mismatches) == 1 and verifier.blocks_checked == 2
+    assert isinstance(verifier.errors[0], ValueError)
+
+
+def test_submit_snapshots_only_sampled_blocks():
+    """Buffers can be reused as soon as submit returns; unsampled passes
+    are never queued"""
+    verifier = OutputVerifier(sample_rate=1.0)
+    data = bytearray(NSA_PT * 4)
+    out = bytearray(NSA_CT * 4)
+    verifier.submit(b'E', NSA_KEY, memoryview(data), out)
+    data[:] = bytes(len(data))  # Reused for the next pass
+    out[:] = bytes(len(out))
+    verifier.close()
+    assert verifier.blocks_checked == 4 and not verifier.mismatches
+
+    verifier = OutputVerifier(sample_rate=0.0)
+    verifier.submit(b'E', NSA_KEY, NSA_PT * 100, bytes(800))
+    assert verifier._queue.qsize() == 0
+    verifier.close()
+    assert verifier.blocks_seen == 100 and verifier.blocks_checked == 0